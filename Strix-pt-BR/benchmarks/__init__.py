@@ -0,0 +1,8 @@
+# benchmarks/__init__.py
+"""
+Suíte de benchmarks do interpretador Strix.
+
+Uso (a partir do diretório Strix-pt-BR):
+    python strix.py bench [opções]
+    python -m benchmarks [opções]
+"""
@@ -0,0 +1,121 @@
+# benchmarks/corpus.py
+
+# Programas usados nos benchmarks. Cada um é gerado a partir de uma 'escala'
+# (1 = tamanho padrão), para que a suíte possa ser rodada rápida ou longa.
+
+TODOS_MOTORES = ('arvore', 'vm')
+
+
+class Programa:
+    """Um programa do corpus: nome, descrição, gerador do código e motores suportados."""
+    __slots__ = ('nome', 'descricao', 'gerar', 'motores')
+
+    def __init__(self, nome, descricao, gerar, motores=TODOS_MOTORES):
+        self.nome = nome
+        self.descricao = descricao
+        self.gerar = gerar
+        self.motores = motores
+
+
+def gerar_recursao(escala):
+    n = 16 + escala
+    return (
+        "func fib(n): se n < 2: retornar n senao: retornar fib(n - 1) + fib(n - 2)\n"
+        f"exibir(fib({n}))\n"
+    )
+
+
+def gerar_recursao_profunda(escala):
+    # Só roda no motor vm: o Interpreter usa a pilha do Python a cada chamada
+    return (
+        "func desce(n):\n"
+        "    se n == 0: retornar 0\n"
+        "    senao: retornar 1 + desce(n - 1)\n"
+        f"exibir(desce({50000 * escala}))\n"
+    )
+
+
+def gerar_aritmetica(escala):
+    linhas = ["a = 1", "b = 2.5", "c = 3"]
+    for i in range(3000 * escala):
+        linhas.append(f"a = (a * 7 + b) / 8 - c / 3 + {i % 10}")
+        linhas.append(f"b = a * 2 - (b + {i % 7}) / 4")
+        linhas.append("c = c + 1 - a / 100")
+    linhas.append("exibir(a + b + c)")
+    return '\n'.join(linhas) + '\n'
+
+
+def gerar_fstrings(escala):
+    linhas = ['nome = "Strix"', "x = 0"]
+    for i in range(2000 * escala):
+        linhas.append(f"x = x + {i % 13}")
+        linhas.append(f'exibir(f"linha {i}: valor={{x}} dobro={{x * 2}} nome={{nome}} fim")')
+    return '\n'.join(linhas) + '\n'
+
+
+def gerar_script_grande(escala):
+    linhas = ["v0 = 0"]
+    for i in range(1, 5000 * escala):
+        linhas.append(f"v{i} = v{i - 1} + {i % 17}")
+        if i % 10 == 0:
+            linhas.append(f'se v{i} > {i * 4}: exibir("acima") senao: exibir("abaixo")')
+        if i % 25 == 0:
+            linhas.append(f"# comentário {i}")
+    return '\n'.join(linhas) + '\n'
+
+
+def gerar_muitas_funcoes(escala):
+    quantidade = 800 * escala
+    linhas = []
+    for i in range(quantidade):
+        linhas.append(f"func f{i}(a, b): retornar a * {i % 5} + b - {i % 3}")
+    linhas.append("r = 0")
+    for i in range(quantidade):
+        linhas.append(f"r = f{i}(r, {i}) / 2")
+    linhas.append("exibir(r)")
+    return '\n'.join(linhas) + '\n'
+
+
+def gerar_lacos(escala):
+    return (
+        "func soma_ate(n): { s = 0 para i de 1 ate n: s = s + i retornar s }\n"
+        "total = 0\n"
+        f"para k de 1 ate {200 * escala}: {{\n"
+        "    total = total + soma_ate(k) - k\n"
+        "    j = 0\n"
+        "    enquanto j < 20: j = j + 1\n"
+        "}\n"
+        "exibir(total)\n"
+    )
+
+
+def gerar_listas(escala):
+    valores = ', '.join(str((i * 7919) % 1000) for i in range(2000 * escala))
+    linhas = [f"v = [{valores}]"]
+    for i in range(200):
+        linhas.append(f'w = mapear(mapear(v, "*", {i % 9 + 1}), "+", v)')
+        linhas.append(f"exibir(soma(w) + maximo(w) - minimo(w) + ordenar(w)[{i}])")
+    return '\n'.join(linhas) + '\n'
+
+
+def gerar_relatorio(escala):
+    return (
+        'relatorio = ""\n'
+        f"para i de 1 ate {20000 * escala}: {{\n"
+        '    relatorio = relatorio + "item " + i + ": " + i * 3 + "\\n"\n'
+        "}\n"
+        "exibir(tamanho(relatorio))\n"
+    )
+
+
+CORPUS = (
+    Programa('recursao', "fib recursivo (muitas chamadas curtas)", gerar_recursao),
+    Programa('recursao_profunda', "recursão linear de 50 mil níveis", gerar_recursao_profunda, ('vm',)),
+    Programa('aritmetica', "expressões aritméticas encadeadas", gerar_aritmetica),
+    Programa('fstrings', "saída com f-strings (estilo log)", gerar_fstrings),
+    Programa('script_grande', "script plano longo com atribuições e 'se'", gerar_script_grande),
+    Programa('muitas_funcoes', "centenas de declarações e chamadas de funções", gerar_muitas_funcoes),
+    Programa('lacos', "laços 'para' e 'enquanto' aninhados", gerar_lacos),
+    Programa('listas', "operações em massa sobre listas numéricas", gerar_listas),
+    Programa('relatorio', "texto longo montado com '+' em um laço", gerar_relatorio),
+)
@@ -0,0 +1,190 @@
+# benchmarks/executor.py
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+from time import perf_counter
+
+from lexer import Lexer
+from parser_strix import Parser
+from resolvedor import Resolvedor
+from compilador import Compilador
+from interpreter import Interpreter, VERSAO
+from maquina_virtual import MaquinaVirtual
+from saida import Saida
+from benchmarks.corpus import CORPUS, TODOS_MOTORES
+
+# Uma fase só conta como regressão se ficar mais lenta que a base por mais que isso (s),
+# para que variações de fases muito curtas não sejam acusadas
+TOLERANCIA_ABSOLUTA = 0.001
+
+LIMITE_PADRAO = 0.10
+
+
+def medir_programa(programa, motor, repeticoes, escala):
+    """
+    Roda 'programa' 'repeticoes' vezes e mede cada fase separadamente.
+    Retorna {fase: {'min': s, 'media': s}}; a saída do programa é descartada.
+    """
+    codigo = programa.gerar(escala)
+    tempos = {}
+
+    def registrar(fase, inicio):
+        tempos.setdefault(fase, []).append(perf_counter() - inicio)
+
+    with open(os.devnull, 'w', encoding='utf-8') as nulo:
+        for _ in range(repeticoes):
+            gc.collect()
+
+            inicio = perf_counter()
+            tokens = Lexer(codigo, programa.nome).tokenize()
+            registrar('lexer', inicio)
+
+            inicio = perf_counter()
+            arvore = Parser(tokens).parse()
+            registrar('parser', inicio)
+            del tokens
+
+            # Com o destino explícito, o buffer da saída não depende de o stdout ser um terminal
+            if motor == 'vm':
+                interpretador = MaquinaVirtual(saida=Saida(nulo))
+            else:
+                interpretador = Interpreter(saida=Saida(nulo))
+
+            inicio = perf_counter()
+            Resolvedor(interpretador.globais).resolver(arvore)
+            registrar('resolvedor', inicio)
+
+            if motor == 'vm':
+                inicio = perf_counter()
+                bytecode = Compilador().compilar(arvore)
+                registrar('compilador', inicio)
+
+            inicio = perf_counter()
+            if motor == 'vm':
+                interpretador.executar_codigo(bytecode)
+            else:
+                interpretador.interpret(arvore)
+            registrar('execucao', inicio)
+
+    return {
+        fase: {'min': min(valores), 'media': sum(valores) / len(valores)}
+        for fase, valores in tempos.items()
+    }
+
+
+def executar_suite(motores, repeticoes=5, escala=1, filtro=None, progresso=None):
+    """Mede todos os programas do corpus (ou os de 'filtro') nos motores pedidos."""
+    resultados = {}
+    for motor in motores:
+        for programa in CORPUS:
+            if filtro and programa.nome not in filtro:
+                continue
+            if motor not in programa.motores:
+                continue
+            if progresso:
+                progresso(f"{motor}/{programa.nome}")
+            resultados[f"{motor}/{programa.nome}"] = medir_programa(programa, motor, repeticoes, escala)
+    return {
+        'versao': VERSAO,
+        'python': platform.python_version(),
+        'repeticoes': repeticoes,
+        'escala': escala,
+        'resultados': resultados,
+    }
+
+
+def comparar(atual, base, limite=LIMITE_PADRAO):
+    """
+    Compara o tempo mínimo de cada fase com o de uma execução anterior.
+    Retorna uma lista de (programa, fase, tempo_base, tempo_atual, regrediu).
+    """
+    comparacoes = []
+    for nome, fases in atual['resultados'].items():
+        fases_base = base.get('resultados', {}).get(nome)
+        if not fases_base:
+            continue
+        for fase, tempos in fases.items():
+            if fase not in fases_base:
+                continue
+            anterior = fases_base[fase]['min']
+            agora = tempos['min']
+            regrediu = agora > anterior * (1 + limite) and agora - anterior > TOLERANCIA_ABSOLUTA
+            comparacoes.append((nome, fase, anterior, agora, regrediu))
+    return comparacoes
+
+
+def formatar_resultados(dados):
+    linhas = [f"{'programa':<28} {'fase':<12} {'min (ms)':>12} {'média (ms)':>12}"]
+    for nome, fases in dados['resultados'].items():
+        for fase, tempos in fases.items():
+            linhas.append(f"{nome:<28} {fase:<12} {tempos['min'] * 1000:>12.3f} {tempos['media'] * 1000:>12.3f}")
+    return '\n'.join(linhas)
+
+
+def formatar_comparacao(comparacoes, limite):
+    linhas = [f"{'programa':<28} {'fase':<12} {'base (ms)':>12} {'atual (ms)':>12} {'variação':>10}"]
+    for nome, fase, anterior, agora, regrediu in comparacoes:
+        variacao = (agora - anterior) / anterior * 100 if anterior else 0.0
+        marca = "  REGRESSÃO" if regrediu else ""
+        linhas.append(
+            f"{nome:<28} {fase:<12} {anterior * 1000:>12.3f} {agora * 1000:>12.3f} {variacao:>+9.1f}%{marca}"
+        )
+    regressoes = sum(1 for comparacao in comparacoes if comparacao[4])
+    linhas.append(f"{regressoes} regressão(ões) acima de {limite:.0%}.")
+    return '\n'.join(linhas)
+
+
+def _analisar_argumentos(argv):
+    analisador = argparse.ArgumentParser(
+        prog='strix bench',
+        description='Mede o tempo de cada fase do interpretador Strix sobre um corpus de programas.',
+    )
+    analisador.add_argument(
+        '--engine', choices=TODOS_MOTORES + ('todos',), default='todos',
+        help='motor medido (padrão: todos)',
+    )
+    analisador.add_argument('--repeticoes', type=int, default=5, metavar='N', help='execuções por programa (padrão: 5)')
+    analisador.add_argument('--escala', type=int, default=1, metavar='N', help='multiplica o tamanho dos programas (padrão: 1)')
+    analisador.add_argument(
+        '--programa', action='append', metavar='NOME',
+        help='mede apenas este programa (pode ser repetido): ' + ', '.join(p.nome for p in CORPUS),
+    )
+    analisador.add_argument('--saida', metavar='ARQUIVO', help='grava os resultados em JSON')
+    analisador.add_argument('--json', action='store_true', help='exibe os resultados em JSON em vez da tabela')
+    analisador.add_argument('--base', metavar='ARQUIVO', help='compara com resultados JSON salvos anteriormente')
+    analisador.add_argument(
+        '--limite', type=float, default=LIMITE_PADRAO, metavar='FRAÇÃO',
+        help=f'aumento de tempo tolerado em relação à base (padrão: {LIMITE_PADRAO})',
+    )
+    return analisador.parse_args(argv)
+
+
+def main(argv=None):
+    argumentos = _analisar_argumentos(sys.argv[1:] if argv is None else argv)
+    motores = TODOS_MOTORES if argumentos.engine == 'todos' else (argumentos.engine,)
+
+    dados = executar_suite(
+        motores, argumentos.repeticoes, argumentos.escala, argumentos.programa,
+        progresso=lambda nome: print(f"medindo {nome}...", file=sys.stderr),
+    )
+
+    if argumentos.saida:
+        with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(dados, arquivo, indent=2, ensure_ascii=False)
+    if argumentos.json:
+        print(json.dumps(dados, indent=2, ensure_ascii=False))
+    else:
+        print(formatar_resultados(dados))
+
+    if argumentos.base:
+        with open(argumentos.base, encoding='utf-8') as arquivo:
+            base = json.load(arquivo)
+        comparacoes = comparar(dados, base, argumentos.limite)
+        print(formatar_comparacao(comparacoes, argumentos.limite), file=sys.stderr)
+        if any(comparacao[4] for comparacao in comparacoes):
+            return 1
+    return 0
@@ -0,0 +1,144 @@
+# cache_programas.py
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import interpreter
+import lexer
+import nativas
+import otimizador
+import parser_strix
+import resolvedor
+
+# Cabeçalho dos arquivos .txc: assinatura + chave do programa (sha256 do código e do interpretador)
+ASSINATURA = b'STRIXTXC\x01'
+TAMANHO_CHAVE = hashlib.sha256().digest_size
+DIRETORIO_PADRAO = '__strixcache__'
+
+# Programas mantidos em memória pelo servidor
+PROGRAMAS_EM_MEMORIA = 256
+
+# Módulos que definem a AST guardada: qualquer mudança no código deles invalida os .txc
+MODULOS_DA_ARVORE = (lexer, parser_strix, resolvedor, otimizador, nativas, interpreter)
+
+_versao_arvore = None
+
+
+def versao_arvore():
+    """sha256 do código dos MODULOS_DA_ARVORE, calculado uma vez por processo."""
+    global _versao_arvore
+    if _versao_arvore is None:
+        h = hashlib.sha256()
+        for modulo in MODULOS_DA_ARVORE:
+            with open(modulo.__file__, 'rb') as f:
+                h.update(f.read())
+        _versao_arvore = h.hexdigest()
+    return _versao_arvore
+
+
+def chave_programa(blocos, *variantes):
+    """
+    Calcula a chave de cache de um programa a partir do seu código (um iterável
+    de strings) e de variantes que alteram o resultado, como o nível de otimização.
+    """
+    h = hashlib.sha256()
+    for parte in (versao_arvore(),) + variantes:
+        h.update(str(parte).encode('utf-8'))
+        h.update(b'\0')
+    for bloco in blocos:
+        h.update(bloco.encode('utf-8'))
+    return h.digest()
+
+
+class CacheProgramas:
+    """
+    Guarda em disco a AST já analisada (e resolvida) de cada script, no estilo do
+    __pycache__ do Python. O arquivo .txc é descartado quando a chave não confere.
+    """
+    def __init__(self, diretorio=None):
+        # Sem diretório, o cache fica em __strixcache__ ao lado de cada script
+        self.diretorio = diretorio
+
+    def caminho_para(self, caminho_fonte):
+        caminho_fonte = os.path.abspath(caminho_fonte)
+        nome = os.path.splitext(os.path.basename(caminho_fonte))[0]
+        if self.diretorio is None:
+            return os.path.join(os.path.dirname(caminho_fonte), DIRETORIO_PADRAO, nome + '.txc')
+        # Num diretório compartilhado, o caminho completo entra no nome para evitar colisões
+        sufixo = hashlib.sha1(caminho_fonte.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.diretorio, f'{nome}-{sufixo}.txc')
+
+    def carregar(self, caminho_fonte, chave):
+        """Retorna a AST guardada para 'chave', ou None se não houver uma válida."""
+        try:
+            with open(self.caminho_para(caminho_fonte), 'rb') as f:
+                dados = f.read()
+        except OSError:
+            return None
+
+        inicio = len(ASSINATURA)
+        if dados[:inicio] != ASSINATURA or dados[inicio:inicio + TAMANHO_CHAVE] != chave:
+            return None
+        try:
+            return pickle.loads(memoryview(dados)[inicio + TAMANHO_CHAVE:])
+        except Exception:
+            # Arquivo truncado ou de uma versão incompatível: trata como ausente
+            return None
+
+    def salvar(self, caminho_fonte, chave, arvore):
+        """Grava a AST de forma atômica. Falhas de escrita apenas deixam de usar o cache."""
+        caminho = self.caminho_para(caminho_fonte)
+        try:
+            conteudo = pickle.dumps(arvore, protocol=pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError):
+            # Árvores muito profundas não são guardadas
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+            try:
+                with os.fdopen(descritor, 'wb') as f:
+                    f.write(ASSINATURA)
+                    f.write(chave)
+                    f.write(conteudo)
+                os.replace(temporario, caminho)
+            except BaseException:
+                os.unlink(temporario)
+                raise
+        except OSError:
+            return False
+        return True
+
+
+class MemoriaProgramas:
+    """
+    ASTs já analisadas mantidas em memória entre execuções (usado pelo servidor), na
+    frente do cache em disco. Descarta o programa usado há mais tempo quando enche.
+    Pode ser usada por várias threads ao mesmo tempo.
+    """
+    def __init__(self, tamanho_maximo=PROGRAMAS_EM_MEMORIA):
+        self.tamanho_maximo = tamanho_maximo
+        self.arvores = OrderedDict()
+        self._trava = threading.Lock()
+
+    def carregar(self, caminho_fonte, chave):
+        """Retorna a AST guardada para o script e a chave, ou None."""
+        entrada = (os.path.abspath(caminho_fonte), chave)
+        with self._trava:
+            arvore = self.arvores.get(entrada)
+            if arvore is not None:
+                self.arvores.move_to_end(entrada)
+            return arvore
+
+    def salvar(self, caminho_fonte, chave, arvore):
+        entrada = (os.path.abspath(caminho_fonte), chave)
+        with self._trava:
+            self.arvores[entrada] = arvore
+            self.arvores.move_to_end(entrada)
+            if len(self.arvores) > self.tamanho_maximo:
+                self.arvores.popitem(last=False)
@@ -0,0 +1,92 @@
+# cliente.py
+
+# Cliente do servidor Strix (ver servidor.py). Só usa a biblioteca padrão e não
+# importa nenhum módulo do interpretador, para iniciar o mais rápido possível.
+#
+# Protocolo: mensagens JSON, uma por linha, pelo socket Unix.
+#   cliente -> servidor: {"argv": [...], "diretorio": ..., "terminal": bool} e,
+#                        opcionalmente, "codigo" (o script em vez do arquivo);
+#                        depois, {"entrada": texto} em resposta a cada "ler" ("" = fim)
+#   servidor -> cliente: {"saida": texto}, {"erro": texto}, {"ler": tamanho} e,
+#                        por último, {"fim": código de saída}
+
+import codecs
+import json
+import os
+import socket
+import sys
+
+SOCKET_PADRAO = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp', f'strix-{os.getuid()}.sock')
+
+
+def enviar_mensagem(conexao, mensagem):
+    conexao.sendall(json.dumps(mensagem, ensure_ascii=False).encode('utf-8') + b'\n')
+
+
+def main(argv=None):
+    """
+    'strix --cliente [--socket CAMINHO] [opções] <arquivo.tx>': pede ao servidor que
+    execute o script com as opções dadas, repassa o stdin local para 'digitar' e escreve
+    a saída e os erros recebidos. Retorna o código de saída do script.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    caminho_socket = _extrair_socket(argv)
+    if caminho_socket is None:
+        print("Erro: --socket precisa de um caminho.", file=sys.stderr)
+        return 2
+
+    conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conexao.connect(caminho_socket)
+    except OSError as e:
+        conexao.close()
+        print(
+            f"Erro: não foi possível conectar ao servidor Strix em '{caminho_socket}' ({e.strerror}). "
+            "Inicie-o com 'strix --servidor'.",
+            file=sys.stderr,
+        )
+        return 1
+
+    with conexao:
+        enviar_mensagem(conexao, {'argv': argv, 'diretorio': os.getcwd(), 'terminal': sys.stdout.isatty()})
+        decodificador = codecs.getincrementaldecoder('utf-8')()
+        for linha in conexao.makefile('rb'):
+            mensagem = json.loads(linha)
+            if 'saida' in mensagem:
+                sys.stdout.write(mensagem['saida'])
+                sys.stdout.flush()
+            elif 'erro' in mensagem:
+                sys.stderr.write(mensagem['erro'])
+                sys.stderr.flush()
+            elif 'ler' in mensagem:
+                dados = _ler_stdin(mensagem['ler'])
+                enviar_mensagem(conexao, {'entrada': decodificador.decode(dados, final=not dados)})
+            elif 'fim' in mensagem:
+                return mensagem['fim']
+
+    print("Erro: o servidor Strix encerrou a conexão antes do fim do script.", file=sys.stderr)
+    return 1
+
+
+def _extrair_socket(argv):
+    """Remove --socket de 'argv' e retorna o caminho (ou None se faltar o valor)."""
+    for i, argumento in enumerate(argv):
+        if argumento.startswith('--socket='):
+            del argv[i]
+            return argumento.partition('=')[2] or None
+        if argumento == '--socket':
+            if i + 1 >= len(argv):
+                return None
+            caminho = argv[i + 1]
+            del argv[i:i + 2]
+            return caminho
+    return SOCKET_PADRAO
+
+
+def _ler_stdin(tamanho):
+    # os.read devolve o que estiver disponível (uma linha, num terminal) sem esperar 'tamanho' bytes
+    try:
+        return os.read(sys.stdin.fileno(), tamanho)
+    except (AttributeError, OSError, ValueError):
+        # Sem stdin: trata como fim da entrada
+        return b''
@@ -0,0 +1,326 @@
+# compilador.py
+
+from lexer import (
+    T_MAIS, T_MENOS, T_MULT, T_DIV,
+    T_IGUAL_IGUAL, T_DIFERENTE, T_MENOR, T_MENOR_IGUAL, T_MAIOR, T_MAIOR_IGUAL,
+)
+from parser_strix import (
+    Bloco, AtribuicaoVar, ChamadaExibir, DeclaracaoSe, DeclaracaoFunc, ChamadaFunc,
+    DeclaracaoRetornar, NoVazio, DeclaracaoEnquanto, DeclaracaoPara,
+)
+from resolvedor import Resolvedor
+from interpreter import Ambiente
+
+# --- Opcodes ---
+# Cada instrução ocupa duas posições na lista de instruções: (opcode, argumento).
+
+OP_CONSTANTE = 0
+OP_CARREGAR_GLOBAL = 1
+OP_DEFINIR_GLOBAL = 2
+OP_DESCARTAR = 3
+OP_SOMAR = 4
+OP_SUBTRAIR = 5
+OP_MULTIPLICAR = 6
+OP_DIVIDIR = 7
+OP_IGUAL = 8
+OP_DIFERENTE = 9
+OP_MENOR = 10
+OP_MENOR_IGUAL = 11
+OP_MAIOR = 12
+OP_MAIOR_IGUAL = 13
+OP_SALTAR = 14
+OP_SALTAR_SE_FALSO = 15
+OP_EXIBIR = 16
+OP_DIGITAR = 17
+OP_FSTRING = 18
+OP_FUNCAO = 19
+OP_VERIFICAR_FUNCAO = 20
+OP_CHAMAR = 21
+OP_RETORNAR = 22
+OP_SINALIZAR_RETORNO = 23
+OP_CARREGAR_LOCAL = 24
+OP_DEFINIR_LOCAL = 25
+OP_CARREGAR_EXTERNO = 26
+OP_CHAMAR_CAUDA = 27
+
+# Versões especializadas, que nunca são emitidas pelo Compilador: a MaquinaVirtual
+# reescreve as instruções genéricas com elas depois de observar os operandos, e as
+# desfaz quando os tipos ou o nome global mudam.
+OP_SOMAR_INTEIROS = 28
+OP_SOMAR_TEXTOS = 29
+OP_CARREGAR_FUNCAO_GLOBAL = 30 # CARREGAR_GLOBAL + VERIFICAR_FUNCAO com cache da função
+
+OP_LISTA = 31
+OP_INDEXAR = 32
+OP_PREPARAR_PARA = 33
+OP_PARA = 34
+
+NOMES_OPCODES = {
+    valor: nome[3:] for nome, valor in list(globals().items()) if nome.startswith('OP_')
+}
+
+OPERADORES_BINARIOS = {
+    T_MAIS: OP_SOMAR,
+    T_MENOS: OP_SUBTRAIR,
+    T_MULT: OP_MULTIPLICAR,
+    T_DIV: OP_DIVIDIR,
+    T_IGUAL_IGUAL: OP_IGUAL,
+    T_DIFERENTE: OP_DIFERENTE,
+    T_MENOR: OP_MENOR,
+    T_MENOR_IGUAL: OP_MENOR_IGUAL,
+    T_MAIOR: OP_MAIOR,
+    T_MAIOR_IGUAL: OP_MAIOR_IGUAL,
+}
+
+
+class Codigo:
+    """Um bloco de bytecode compilado: o programa principal ou o corpo de uma função."""
+    __slots__ = ('nome', 'instrucoes', 'constantes', 'nomes', 'posicoes', 'enderecos',
+                 'alternativas', 'parametros', 'slots_parametros', 'num_slots', 'origem', 'pura', 'caches')
+
+    def __init__(self, nome, parametros=(), slots_parametros=(), num_slots=0, origem=None, pura=False):
+        self.nome = nome
+        self.instrucoes = []
+        self.constantes = []
+        self.nomes = []
+        # Nó da AST associado a cada posição de 'instrucoes', usado nas mensagens de erro
+        self.posicoes = []
+        # Pares (profundidade, slot) usados por OP_CARREGAR_EXTERNO
+        self.enderecos = []
+        # Nome e endereços alternativos (por pc) para locais lidas antes de serem atribuídas
+        self.alternativas = {}
+        self.parametros = tuple(parametros)
+        self.slots_parametros = tuple(slots_parametros)
+        self.num_slots = num_slots
+        self.origem = origem # Nó DeclaracaoFunc, usado nos erros de aridade
+        self.pura = pura # Pode ter os resultados memoizados
+        # Caches das chamadas especializadas, pela posição da instrução: [nome, função, índice do nome].
+        # Uma instrução que perde e volta a ganhar a especialização reaproveita o seu
+        self.caches = {}
+
+    def desmontar(self):
+        """Retorna uma listagem legível das instruções (útil para depuração)."""
+        linhas = []
+        for pc in range(0, len(self.instrucoes), 2):
+            op, arg = self.instrucoes[pc], self.instrucoes[pc + 1]
+            linhas.append(f"{pc:5d} {NOMES_OPCODES[op]:<24} {arg}")
+        return '\n'.join(linhas)
+
+
+class Compilador:
+    """
+    Traduz a AST produzida pelo Parser em bytecode para a MaquinaVirtual.
+    """
+    def __init__(self):
+        self.codigo = None
+        self.em_funcao = False
+        # Laços 'para' em andamento no corpo atual: cada um mantém o contador e o
+        # limite na pilha de valores, que um 'retornar' precisa descartar
+        self.lacos_para = 0
+        self._indices_constantes = {}
+        self._indices_nomes = {}
+
+    def compilar(self, arvore):
+        if arvore is not None and not arvore.resolvido:
+            Resolvedor(Ambiente.global_padrao()).resolver(arvore)
+        codigo = Codigo('<programa>')
+        self._compilar_corpo(codigo, arvore, em_funcao=False)
+        return codigo
+
+    def _compilar_corpo(self, codigo, bloco, em_funcao):
+        anterior = (self.codigo, self.em_funcao, self.lacos_para, self._indices_constantes, self._indices_nomes)
+        self.codigo = codigo
+        self.em_funcao = em_funcao
+        self.lacos_para = 0
+        self._indices_constantes = {}
+        self._indices_nomes = {}
+        try:
+            if bloco is not None:
+                self.compilar_no(bloco)
+            self._emitir(OP_CONSTANTE, self._constante(None))
+            self._emitir(OP_RETORNAR, 0)
+        finally:
+            self.codigo, self.em_funcao, self.lacos_para, self._indices_constantes, self._indices_nomes = anterior
+
+    # --- Utilitários de emissão ---
+
+    def _emitir(self, op, arg=0, origem=None):
+        self.codigo.instrucoes.append(op)
+        self.codigo.instrucoes.append(arg)
+        self.codigo.posicoes.append(origem)
+        self.codigo.posicoes.append(origem)
+        return len(self.codigo.instrucoes) - 2
+
+    def _corrigir_salto(self, pc_instrucao):
+        self.codigo.instrucoes[pc_instrucao + 1] = len(self.codigo.instrucoes)
+
+    def _constante(self, valor):
+        # A chave inclui o tipo para não confundir 1, 1.0 e True
+        chave = (type(valor), valor) if not isinstance(valor, Codigo) else (Codigo, id(valor))
+        indice = self._indices_constantes.get(chave)
+        if indice is None:
+            indice = len(self.codigo.constantes)
+            self.codigo.constantes.append(valor)
+            self._indices_constantes[chave] = indice
+        return indice
+
+    def _nome(self, nome):
+        indice = self._indices_nomes.get(nome)
+        if indice is None:
+            indice = len(self.codigo.nomes)
+            self.codigo.nomes.append(nome)
+            self._indices_nomes[nome] = indice
+        return indice
+
+    def _carregar(self, no, nome):
+        if no.profundidade is None:
+            self._emitir(OP_CARREGAR_GLOBAL, self._nome(nome), no)
+            return
+        if no.profundidade == 0:
+            pc = self._emitir(OP_CARREGAR_LOCAL, no.slot, no)
+        else:
+            self.codigo.enderecos.append((no.profundidade, no.slot))
+            pc = self._emitir(OP_CARREGAR_EXTERNO, len(self.codigo.enderecos) - 1, no)
+        self.codigo.alternativas[pc] = (nome, no.alternativas)
+
+    def _definir(self, no, nome):
+        if no.profundidade is None:
+            self._emitir(OP_DEFINIR_GLOBAL, self._nome(nome), no)
+        else:
+            self._emitir(OP_DEFINIR_LOCAL, no.slot, no)
+
+    # --- Visitantes ---
+
+    def compilar_no(self, no):
+        nome_metodo = f'compilar_{type(no).__name__}'
+        metodo = getattr(self, nome_metodo, self.compilador_generico)
+        metodo(no)
+
+    def compilador_generico(self, no):
+        raise Exception(f"Nenhum método 'compilar_{type(no).__name__}' definido")
+
+    def compilar_Bloco(self, no):
+        for declaracao in no.declaracoes:
+            self._compilar_declaracao(declaracao)
+
+    def _compilar_declaracao(self, no):
+        # Declarações que são apenas expressões têm o valor descartado
+        self.compilar_no(no)
+        if not isinstance(no, (Bloco, AtribuicaoVar, ChamadaExibir, DeclaracaoSe, DeclaracaoEnquanto,
+                               DeclaracaoPara, DeclaracaoFunc, DeclaracaoRetornar, NoVazio)):
+            self._emitir(OP_DESCARTAR)
+
+    def compilar_NoVazio(self, no):
+        pass
+
+    def compilar_AtribuicaoVar(self, no):
+        self.compilar_no(no.valor)
+        self._definir(no.var, no.var.nome)
+
+    def compilar_AcessoVar(self, no):
+        self._carregar(no, no.nome)
+
+    def compilar_Numero(self, no):
+        self._emitir(OP_CONSTANTE, self._constante(no.valor))
+
+    def compilar_String(self, no):
+        self._emitir(OP_CONSTANTE, self._constante(no.valor))
+
+    def compilar_FString(self, no):
+        for expr_no in no.expressoes:
+            self.compilar_no(expr_no)
+        self._emitir(OP_FSTRING, self._constante(tuple(no.segmentos)), no)
+
+    def compilar_ListaLiteral(self, no):
+        for elemento in no.elementos:
+            self.compilar_no(elemento)
+        self._emitir(OP_LISTA, len(no.elementos), no)
+
+    def compilar_AcessoIndice(self, no):
+        self.compilar_no(no.alvo)
+        self.compilar_no(no.indice)
+        self._emitir(OP_INDEXAR, 0, no)
+
+    def compilar_ChamadaExibir(self, no):
+        self.compilar_no(no.no)
+        self._emitir(OP_EXIBIR)
+
+    def compilar_ChamadaDigitar(self, no):
+        self.compilar_no(no.no_prompt)
+        self._emitir(OP_DIGITAR)
+
+    def compilar_OperacaoBinaria(self, no):
+        self.compilar_no(no.esq)
+        self.compilar_no(no.dir)
+        self._emitir(OPERADORES_BINARIOS[no.op], 0, no)
+
+    def compilar_DeclaracaoSe(self, no):
+        saltos_fim = []
+        ramos = [(no.condicao, no.bloco_se)] + list(no.blocos_senaose)
+        for condicao, bloco in ramos:
+            self.compilar_no(condicao)
+            salto_proximo = self._emitir(OP_SALTAR_SE_FALSO)
+            self.compilar_no(bloco)
+            saltos_fim.append(self._emitir(OP_SALTAR))
+            self._corrigir_salto(salto_proximo)
+        if no.bloco_senao:
+            self.compilar_no(no.bloco_senao)
+        for salto in saltos_fim:
+            self._corrigir_salto(salto)
+
+    def compilar_DeclaracaoEnquanto(self, no):
+        inicio = len(self.codigo.instrucoes)
+        self.compilar_no(no.condicao)
+        salto_fim = self._emitir(OP_SALTAR_SE_FALSO)
+        self.compilar_no(no.corpo)
+        self._emitir(OP_SALTAR, inicio)
+        self._corrigir_salto(salto_fim)
+
+    def compilar_DeclaracaoPara(self, no):
+        # Pilha durante o laço: [..., próximo valor, limite]. OP_PARA empilha o valor
+        # da volta (definido na variável logo em seguida) ou, no fim, descarta os dois.
+        self.compilar_no(no.inicio)
+        self.compilar_no(no.fim)
+        self._emitir(OP_PREPARAR_PARA, 0, no)
+        inicio = self._emitir(OP_PARA, 0, no)
+        self._definir(no.var, no.var.nome)
+        self.lacos_para += 1
+        try:
+            self.compilar_no(no.corpo)
+        finally:
+            self.lacos_para -= 1
+        self._emitir(OP_SALTAR, inicio)
+        self._corrigir_salto(inicio)
+
+    def compilar_DeclaracaoFunc(self, no):
+        codigo_func = Codigo(
+            no.nome_func,
+            [param.nome for param in no.parametros],
+            [param.slot for param in no.parametros],
+            no.num_slots,
+            no,
+            no.pura,
+        )
+        self._compilar_corpo(codigo_func, no.corpo, em_funcao=True)
+        self._emitir(OP_FUNCAO, self._constante(codigo_func), no)
+        self._definir(no, no.nome_func)
+
+    def compilar_ChamadaFunc(self, no, op=OP_CHAMAR):
+        self._carregar(no, no.nome_func)
+        self._emitir(OP_VERIFICAR_FUNCAO, 0, no)
+        for arg in no.args:
+            self.compilar_no(arg)
+        self._emitir(op, len(no.args), no)
+
+    def compilar_DeclaracaoRetornar(self, no):
+        if self.em_funcao and isinstance(no.valor, ChamadaFunc) and not self.lacos_para:
+            # 'retornar f(...)': chamada de cauda, que reaproveita o quadro da função atual
+            self.compilar_ChamadaFunc(no.valor, OP_CHAMAR_CAUDA)
+            return
+        self.compilar_no(no.valor)
+        if self.em_funcao:
+            # O argumento é quantos valores dos laços 'para' descartar abaixo do resultado
+            self._emitir(OP_RETORNAR, 2 * self.lacos_para)
+        else:
+            # Fora de uma função, 'retornar' se comporta como no Interpreter: propaga o sinal
+            self._emitir(OP_SINALIZAR_RETORNO)
@@ -0,0 +1,107 @@
+# corda.py
+
+# Concatenações cujo resultado tem menos caracteres que isso produzem um str comum
+LIMIAR_CORDA = 512
+
+
+class Corda:
+    """
+    Texto produzido por concatenações sucessivas com '+', guardado como a lista das
+    partes e convertido em um str só quando necessário (exibir, comparações, funções
+    nativas...). Assim, 's = s + parte' em um laço custa tempo e memória lineares no
+    tamanho final, em vez de copiar o texto inteiro a cada volta.
+
+    A lista de partes é compartilhada: a Corda que vê todas as partes da lista pode
+    acrescentar no lugar; uma Corda mais antiga que continue de outro jeito (a = s + "x"
+    e depois b = s + "y") copia antes as suas partes. Para os programas Strix, uma
+    Corda é indistinguível de um str: os operadores e comparações usam o texto.
+    """
+    __slots__ = ('partes', 'quantidade', 'tamanho', '_texto')
+
+    def __init__(self, partes, tamanho):
+        self.partes = partes
+        self.quantidade = len(partes) # Partes da lista que pertencem a esta Corda
+        self.tamanho = tamanho
+        self._texto = None # Texto já montado
+
+    def acrescentar(self, texto):
+        """Retorna a Corda com 'texto' (um str) no final, sem copiar o texto já acumulado."""
+        partes = self.partes
+        if len(partes) != self.quantidade:
+            partes = partes[:self.quantidade]
+        partes.append(texto)
+        return Corda(partes, self.tamanho + len(texto))
+
+    def __str__(self):
+        texto = self._texto
+        if texto is None:
+            partes = self.partes
+            if len(partes) != self.quantidade:
+                partes = partes[:self.quantidade]
+            texto = self._texto = ''.join(partes)
+        return texto
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __len__(self):
+        return self.tamanho
+
+    def __hash__(self):
+        return hash(str(self))
+
+    # Os demais operadores valem para o texto montado, com os mesmos resultados
+    # (e os mesmos erros) de um str
+    def __eq__(self, outro):
+        return str(self) == plano(outro)
+
+    def __ne__(self, outro):
+        return str(self) != plano(outro)
+
+    def __lt__(self, outro):
+        return str(self) < plano(outro)
+
+    def __le__(self, outro):
+        return str(self) <= plano(outro)
+
+    def __gt__(self, outro):
+        return str(self) > plano(outro)
+
+    def __ge__(self, outro):
+        return str(self) >= plano(outro)
+
+    def __mul__(self, outro):
+        return str(self) * plano(outro)
+
+    def __rmul__(self, outro):
+        return plano(outro) * str(self)
+
+    def __sub__(self, outro):
+        return str(self) - plano(outro)
+
+    def __rsub__(self, outro):
+        return plano(outro) - str(self)
+
+    def __truediv__(self, outro):
+        return str(self) / plano(outro)
+
+    def __rtruediv__(self, outro):
+        return plano(outro) / str(self)
+
+
+def plano(valor):
+    """Converte uma Corda em str; os demais valores são retornados sem mudança."""
+    return str(valor) if type(valor) is Corda else valor
+
+
+def concatenar(esq, dir):
+    """O '+' da Strix quando um dos lados é texto: str(esq) + str(dir), montado sob demanda."""
+    if type(esq) is Corda:
+        return esq.acrescentar(dir if type(dir) is str else str(dir))
+    if type(esq) is not str:
+        esq = str(esq)
+    if type(dir) is not str:
+        dir = str(dir)
+    if len(esq) + len(dir) < LIMIAR_CORDA:
+        return esq + dir
+    return Corda([esq, dir], len(esq) + len(dir))
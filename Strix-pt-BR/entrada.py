@@ -0,0 +1,80 @@
+# entrada.py
+
+import sys
+
+from saida import eh_terminal
+
+# Caracteres lidos de uma vez da origem no modo em lote
+TAMANHO_BLOCO = 64 * 1024
+
+
+class Entrada:
+    """
+    Fonte das linhas lidas por 'digitar'.
+
+    No modo interativo (stdin é um terminal), usa input(), como antes. No modo em lote
+    (uma origem foi informada ou o stdin não é um terminal), lê a origem em blocos
+    grandes e entrega uma linha por chamada; o prompt vai para o buffer da Saida junto
+    com o resto da saída, ou é omitido se 'exibir_prompt' for falso.
+
+    'origem' pode ser um arquivo (qualquer objeto com read()) ou um iterável de linhas,
+    como uma lista de strings. Sem origem, usa o sys.stdin do momento da leitura.
+    """
+    def __init__(self, origem=None, exibir_prompt=True, em_lote=None, tamanho_bloco=TAMANHO_BLOCO):
+        self.origem = origem
+        self.exibir_prompt = exibir_prompt
+        if em_lote is None:
+            em_lote = origem is not None or not eh_terminal(sys.stdin)
+        self.em_lote = em_lote
+        self.tamanho_bloco = tamanho_bloco
+        self._linhas = []
+        self._posicao = 0
+        self._resto = ''
+        self._iterador = None
+        if origem is not None and not hasattr(origem, 'read'):
+            self._iterador = iter(origem)
+
+    def ler(self, prompt, saida):
+        """Exibe 'prompt' e retorna a próxima linha, sem a quebra de linha, como input()."""
+        if not self.em_lote:
+            # O que já foi exibido precisa aparecer antes da pergunta
+            saida.descarregar()
+            return input(prompt) if self.exibir_prompt else input()
+
+        if self.exibir_prompt:
+            saida.escrever(prompt, fim='')
+        if self._iterador is not None:
+            return self._linha_do_iteravel()
+
+        while self._posicao >= len(self._linhas):
+            # A leitura pode ficar esperando: o que já foi exibido precisa aparecer antes
+            saida.descarregar()
+            if not self._carregar():
+                raise EOFError("EOF when reading a line")
+        linha = self._linhas[self._posicao]
+        self._posicao += 1
+        return linha
+
+    def _carregar(self):
+        """Lê o próximo bloco da origem e o divide em linhas. Retorna False no fim da entrada."""
+        origem = self.origem if self.origem is not None else sys.stdin
+        bloco = origem.read(self.tamanho_bloco)
+        if not bloco:
+            if not self._resto:
+                return False
+            # Última linha, sem quebra de linha no final
+            self._linhas = [self._resto]
+            self._resto = ''
+        else:
+            self._linhas = (self._resto + bloco).split('\n')
+            # A parte depois da última quebra pode estar incompleta
+            self._resto = self._linhas.pop()
+        self._posicao = 0
+        return True
+
+    def _linha_do_iteravel(self):
+        try:
+            linha = str(next(self._iterador))
+        except StopIteration:
+            raise EOFError("EOF when reading a line") from None
+        return linha[:-1] if linha.endswith('\n') else linha
@@ -0,0 +1,84 @@
+# estatisticas.py
+
+import json
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+from parser_strix import AST
+
+
+class Estatisticas:
+    """
+    Telemetria de uma execução: tempo (e pico de memória, se o tracemalloc estiver
+    ativo) de cada fase, número de tokens e de nós da AST, chamadas de funções Strix
+    e profundidade máxima de chamadas. Cada Interpreter/MaquinaVirtual tem uma
+    instância em 'estatisticas', que pode ser lida depois de 'interpret'.
+    """
+    def __init__(self):
+        self.fases = {} # nome -> {'tempo': s, 'memoria_pico': bytes ou None}
+        self.tokens = None
+        self.nos = None
+        self.chamadas = 0
+        self.profundidade_maxima = 0
+
+    @contextmanager
+    def fase(self, nome):
+        """Mede o bloco 'with' como a fase 'nome' (tempos repetidos são somados)."""
+        medir_memoria = tracemalloc.is_tracing()
+        if medir_memoria:
+            tracemalloc.reset_peak()
+        inicio = perf_counter()
+        try:
+            yield
+        finally:
+            duracao = perf_counter() - inicio
+            fase = self.fases.setdefault(nome, {'tempo': 0.0, 'memoria_pico': None})
+            fase['tempo'] += duracao
+            if medir_memoria:
+                pico = tracemalloc.get_traced_memory()[1]
+                fase['memoria_pico'] = max(pico, fase['memoria_pico'] or 0)
+
+    def registrar_chamada(self, profundidade):
+        self.chamadas += 1
+        if profundidade > self.profundidade_maxima:
+            self.profundidade_maxima = profundidade
+
+    def como_dict(self):
+        return {
+            'fases': {nome: dict(dados) for nome, dados in self.fases.items()},
+            'tempo_total': sum(dados['tempo'] for dados in self.fases.values()),
+            'tokens': self.tokens,
+            'nos': self.nos,
+            'chamadas': self.chamadas,
+            'profundidade_maxima': self.profundidade_maxima,
+        }
+
+    def como_json(self):
+        return json.dumps(self.como_dict(), indent=2, ensure_ascii=False)
+
+
+def contar_tokens(tokens, estatisticas):
+    """Repassa os tokens de um gerador, contando-os em 'estatisticas.tokens'."""
+    estatisticas.tokens = 0
+    for token in tokens:
+        estatisticas.tokens += 1
+        yield token
+
+
+def contar_nos(arvore):
+    """Conta os nós da AST, percorrendo os atributos de cada nó."""
+    if arvore is None:
+        return 0
+    total = 0
+    pendentes = [arvore]
+    while pendentes:
+        valor = pendentes.pop()
+        if isinstance(valor, AST):
+            total += 1
+            for classe in type(valor).__mro__:
+                for nome in getattr(classe, '__slots__', ()):
+                    pendentes.append(getattr(valor, nome, None))
+        elif isinstance(valor, (list, tuple)):
+            pendentes.extend(valor)
+    return total
@@ -0,0 +1,620 @@
+# incremental.py
+
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+from lexer import (
+    Lexer, Token, StrixSintaxeError, StrixErrosSintaxe, MENSAGEM_STRING_NAO_TERMINADA,
+    T_EOF, T_RCHAVE, primeiro_por_linha,
+)
+from parser_strix import (
+    Parser, AnaliseInterrompida, mensagem_esperava, AST, AcessoVar, AtribuicaoVar, ChamadaFunc,
+    DeclaracaoFunc, DeclaracaoSe, DeclaracaoEnquanto, DeclaracaoPara, Bloco,
+)
+from nativas import NATIVAS
+
+# Linhas entregues ao Lexer de cada vez durante uma reanálise
+LINHAS_POR_BLOCO = 64
+
+# Quantidade de trechos por página (ver _Pagina) ao refazer as páginas
+TRECHOS_POR_PAGINA = 128
+
+# Como a análise de um trecho pode terminar em aberto (ver Trecho.aberto): dentro de
+# um bloco, descartando tokens dentro de { } depois de um erro (no nível superior ou
+# dentro de um bloco) ou dentro de uma string sem a aspa que a fecha
+_BLOCO, _DESCARTE, _DESCARTE_EM_BLOCO, _STRING = range(1, 5)
+
+_ASPAS = ('"', "'")
+
+
+def _inicio(trecho):
+    return trecho.inicio
+
+
+def _primeira_linha(pagina):
+    return pagina.trechos[0].inicio + pagina.deslocamento
+
+
+class Trecho:
+    """
+    Linhas consecutivas do documento e as declarações do nível superior que começam
+    nelas. Um trecho sempre começa no início de uma linha, no primeiro token de uma
+    declaração (ou na linha 1), e vai até o trecho seguinte.
+
+    As posições dos nós e dos erros são as do momento da análise, quando o trecho
+    começava na linha 'base'; 'deslocamento' converte para a numeração atual.
+
+    Quando a análise termina com um bloco, um descarte de tokens ou uma string
+    ainda abertos, 'aberto' diz qual. Os trechos seguintes ficam em espera: guardam
+    a análise que teriam no nível superior, mas só os erros que continuariam
+    valendo aparecem (ver DocumentoIncremental.erros). 'fecha' marca um trecho com
+    um '}' sem par no nível superior e 'aspas', as aspas que aparecem no seu código,
+    que mudariam a análise de um trecho aberto antes deles.
+    """
+    __slots__ = (
+        'inicio', 'base', 'pagina', 'declaracoes', 'erros', 'aberto', 'aspa', 'fecha', 'aspas',
+        '_definicoes',
+    )
+
+    def __init__(self, inicio):
+        self.inicio = inicio # Relativo ao deslocamento da página (ver _Pagina)
+        self.base = inicio
+        self.pagina = None
+        self.declaracoes = []
+        self.erros = [] # (linha, coluna, mensagem, do_lexer) na numeração de 'base'
+        self.aberto = None
+        self.aspa = None # A aspa da string aberta, se aberto == _STRING
+        self.fecha = False
+        self.aspas = ''
+        self._definicoes = None
+
+    @property
+    def linha(self):
+        """Linha atual do início do trecho."""
+        return self.inicio + self.pagina.deslocamento
+
+    @property
+    def deslocamento(self):
+        return self.linha - self.base
+
+    @property
+    def definicoes(self):
+        """Nomes globais definidos no trecho -> nó da primeira definição."""
+        if self._definicoes is None:
+            self._definicoes = {}
+            _coletar_definicoes(self.declaracoes, self._definicoes)
+        return self._definicoes
+
+
+class _Pagina:
+    """
+    Trechos consecutivos que se deslocam juntos: a linha de cada um é trecho.inicio
+    mais o deslocamento da página. Uma edição que muda a quantidade de linhas só
+    ajusta os trechos seguintes da própria página e o deslocamento das páginas seguintes.
+    """
+    __slots__ = ('trechos', 'deslocamento', 'com_erros', 'abertos', 'fechas', 'aspas', '_definicoes')
+
+    def __init__(self, trechos):
+        # 'inicio' de cada trecho já deve estar na numeração atual
+        self.trechos = trechos
+        self.deslocamento = 0
+        self.com_erros = 0
+        self.abertos = 0
+        self.fechas = 0
+        aspas = set()
+        for trecho in trechos:
+            trecho.pagina = self
+            if trecho.erros:
+                self.com_erros += 1
+            if trecho.aberto:
+                self.abertos += 1
+            if trecho.fecha:
+                self.fechas += 1
+            aspas.update(trecho.aspas)
+        self.aspas = ''.join(aspas)
+        self._definicoes = None
+
+    @property
+    def definicoes(self):
+        """Nomes globais definidos na página -> primeiro trecho que o define."""
+        if self._definicoes is None:
+            self._definicoes = {}
+            for trecho in self.trechos:
+                for nome in trecho.definicoes:
+                    self._definicoes.setdefault(nome, trecho)
+        return self._definicoes
+
+
+class _Lexer(Lexer):
+    """Lexer que anota quais erros da lista são dele, e não do Parser (ver Trecho.erros)."""
+    def __init__(self, *argumentos, **opcoes):
+        super().__init__(*argumentos, **opcoes)
+        self.lexicos = set() # Índices dos erros do Lexer na lista de erros
+
+    def _erro(self, mensagem):
+        self.lexicos.add(len(self.erros))
+        super()._erro(mensagem)
+
+
+def _coletar_definicoes(declaracoes, definicoes):
+    """Como Resolvedor._coletar_nomes, mas guardando o nó de cada definição."""
+    for declaracao in declaracoes:
+        if isinstance(declaracao, AtribuicaoVar):
+            definicoes.setdefault(declaracao.var.nome, declaracao.var)
+        elif isinstance(declaracao, DeclaracaoFunc):
+            definicoes.setdefault(declaracao.nome_func, declaracao)
+        elif isinstance(declaracao, DeclaracaoSe):
+            _coletar_definicoes(declaracao.bloco_se.declaracoes, definicoes)
+            for _, bloco_senaose in declaracao.blocos_senaose:
+                _coletar_definicoes(bloco_senaose.declaracoes, definicoes)
+            if declaracao.bloco_senao:
+                _coletar_definicoes(declaracao.bloco_senao.declaracoes, definicoes)
+        elif isinstance(declaracao, DeclaracaoEnquanto):
+            _coletar_definicoes(declaracao.corpo.declaracoes, definicoes)
+        elif isinstance(declaracao, DeclaracaoPara):
+            definicoes.setdefault(declaracao.var.nome, declaracao.var)
+            _coletar_definicoes(declaracao.corpo.declaracoes, definicoes)
+        elif isinstance(declaracao, Bloco):
+            _coletar_definicoes(declaracao.declaracoes, definicoes)
+
+
+def _definicoes_locais(funcao):
+    definicoes = {}
+    for parametro in funcao.parametros:
+        definicoes.setdefault(parametro.nome, parametro)
+    _coletar_definicoes(funcao.corpo.declaracoes, definicoes)
+    return definicoes
+
+
+def _nome_do_no(no):
+    if isinstance(no, AcessoVar):
+        return no.nome
+    if isinstance(no, (ChamadaFunc, DeclaracaoFunc)):
+        return no.nome_func
+    return None
+
+
+def _nome_em(declaracoes, linha, coluna):
+    """
+    Procura o identificador na posição dada. Retorna (nó, funções que o envolvem,
+    da mais externa para a mais interna) ou None.
+    """
+    pendentes = [(declaracao, ()) for declaracao in reversed(declaracoes)]
+    while pendentes:
+        valor, funcoes = pendentes.pop()
+        if isinstance(valor, AST):
+            nome = _nome_do_no(valor)
+            if nome is not None and valor.linha == linha and valor.coluna <= coluna < valor.coluna + len(nome):
+                return valor, funcoes
+            internas = funcoes + (valor,) if isinstance(valor, DeclaracaoFunc) else funcoes
+            filhos = [
+                getattr(valor, atributo, None)
+                for classe in type(valor).__mro__
+                for atributo in getattr(classe, '__slots__', ())
+                if atributo not in ('linha', 'coluna')
+            ]
+            pendentes.extend((filho, internas) for filho in reversed(filhos))
+        elif isinstance(valor, (list, tuple)):
+            pendentes.extend((item, funcoes) for item in reversed(valor))
+    return None
+
+
+class DocumentoIncremental:
+    """
+    Código de um arquivo .tx aberto em um editor, reanalisado a cada edição só
+    onde ela pode ter mudado alguma coisa (ver servidor_lsp.py).
+
+    O documento é dividido em Trechos. Uma edição volta a passar pelo Lexer e pelo
+    Parser a partir do trecho anterior ao editado: uma declaração pode continuar
+    na linha seguinte, como em 'x = 1' seguido de '+ 2'. A análise para assim que
+    chega, no início de uma declaração, a um trecho antigo que estava todo depois
+    da edição. Daí em diante o código é o mesmo, então os tokens e a AST também
+    seriam, e esses trechos são aproveitados.
+
+    Se a edição deixa um bloco ou uma string aberta (ex.: um '{' ou uma aspa recém
+    digitados), a análise para no primeiro trecho antigo que encontrar e os demais
+    ficam em espera (ver Trecho.aberto) em vez de serem todos reanalisados. Um
+    trecho em espera com o '}' ou a aspa que fecharia o trecho aberto faz a
+    análise ser refeita a partir dele (ver _ajustar_aberturas).
+
+    Linhas e colunas começam em 1, como nos erros da Strix.
+    """
+    def __init__(self, texto='', nome_arquivo=None):
+        self.nome_arquivo = nome_arquivo
+        self.linhas = ['']
+        self.paginas = [_Pagina([Trecho(1)])]
+        self.abertos = 0 # Trechos abertos no documento (ver Trecho.aberto)
+        self.substituir(texto)
+
+    @property
+    def texto(self):
+        return '\n'.join(self.linhas)
+
+    def trechos(self):
+        """Trechos cujas declarações fazem parte do programa: até o primeiro trecho aberto."""
+        for pagina in self.paginas:
+            if not pagina.abertos:
+                yield from pagina.trechos
+                continue
+            for trecho in pagina.trechos:
+                yield trecho
+                if trecho.aberto:
+                    return
+
+    def substituir(self, texto):
+        """Troca todo o código do documento."""
+        self.editar(1, 1, len(self.linhas), len(self.linhas[-1]) + 1, texto)
+
+    def editar(self, linha_inicio, coluna_inicio, linha_fim, coluna_fim, texto):
+        """Troca o código entre as duas posições (a do fim não incluída) por 'texto'."""
+        antes = self.linhas[linha_inicio - 1][:coluna_inicio - 1]
+        depois = self.linhas[linha_fim - 1][coluna_fim - 1:]
+        novas = (antes + texto + depois).split('\n')
+        self.linhas[linha_inicio - 1:linha_fim] = novas
+        self._reanalisar(linha_inicio, linha_fim + 1, len(novas))
+
+    # --- Posições dos trechos: (índice da página, índice do trecho na página) ---
+
+    def _localizar(self, linha):
+        """Posição do trecho que contém a linha."""
+        paginas = self.paginas
+        indice_pagina = max(bisect_right(paginas, linha, key=_primeira_linha) - 1, 0)
+        pagina = paginas[indice_pagina]
+        indice = max(bisect_right(pagina.trechos, linha - pagina.deslocamento, key=_inicio) - 1, 0)
+        return indice_pagina, indice
+
+    def _seguinte(self, indice_pagina, indice):
+        """Posição do trecho seguinte; depois do último, (len(self.paginas), 0)."""
+        if indice + 1 < len(self.paginas[indice_pagina].trechos):
+            return indice_pagina, indice + 1
+        return indice_pagina + 1, 0
+
+    def _trecho_em(self, linha, indice_pagina, indice):
+        """Posição do trecho que começa exatamente em 'linha', procurando a partir da posição dada."""
+        paginas = self.paginas
+        if indice_pagina >= len(paginas):
+            return None
+        if paginas[indice_pagina].trechos[-1].linha < linha:
+            # Em uma das páginas seguintes, se estiver em alguma
+            proxima = bisect_right(paginas, linha, lo=indice_pagina + 1, key=_primeira_linha) - 1
+            if proxima == indice_pagina:
+                return None
+            indice_pagina, indice = proxima, 0
+        pagina = paginas[indice_pagina]
+        indice = bisect_left(pagina.trechos, linha - pagina.deslocamento, lo=indice, key=_inicio)
+        if indice < len(pagina.trechos) and pagina.trechos[indice].linha == linha:
+            return indice_pagina, indice
+        return None
+
+    def _primeiro_depois(self, linha, indice_pagina, indice):
+        """Posição do primeiro trecho que começa depois de 'linha', procurando a partir da posição dada."""
+        paginas = self.paginas
+        if indice_pagina >= len(paginas):
+            return len(paginas), 0
+        if paginas[indice_pagina].trechos[-1].linha <= linha:
+            anterior = bisect_right(paginas, linha, lo=indice_pagina + 1, key=_primeira_linha) - 1
+            if anterior == indice_pagina:
+                return indice_pagina + 1, 0
+            indice_pagina, indice = anterior, 0
+        pagina = paginas[indice_pagina]
+        indice = bisect_right(pagina.trechos, linha - pagina.deslocamento, lo=indice, key=_inicio)
+        if indice == len(pagina.trechos):
+            return indice_pagina + 1, 0
+        return indice_pagina, indice
+
+    def _primeira_abertura(self):
+        """Posição do primeiro trecho aberto, ou None."""
+        if not self.abertos:
+            return None
+        for indice_pagina, pagina in enumerate(self.paginas):
+            if pagina.abertos:
+                for indice, trecho in enumerate(pagina.trechos):
+                    if trecho.aberto:
+                        return indice_pagina, indice
+        return None
+
+    def _reanalisar(self, inicio, fim, quantidade):
+        """As linhas [inicio, fim) foram trocadas por 'quantidade' linhas novas."""
+        paginas = self.paginas
+        # Recomeça no trecho anterior ao editado
+        pagina_reinicio, reinicio = self._localizar(inicio)
+        if reinicio > 0:
+            reinicio -= 1
+        elif pagina_reinicio > 0:
+            pagina_reinicio -= 1
+            reinicio = len(paginas[pagina_reinicio].trechos) - 1
+
+        # Trechos inteiramente depois da edição: passam para a numeração nova
+        seguintes = self._localizar(fim)
+        if paginas[seguintes[0]].trechos[seguintes[1]].linha < fim:
+            seguintes = self._seguinte(*seguintes)
+        deslocamento = quantidade - (fim - inicio)
+        if deslocamento and seguintes[0] < len(paginas):
+            for trecho in paginas[seguintes[0]].trechos[seguintes[1]:]:
+                trecho.inicio += deslocamento
+            for pagina in paginas[seguintes[0] + 1:]:
+                pagina.deslocamento += deslocamento
+
+        novos, aproveitados = self._analisar(paginas[pagina_reinicio].trechos[reinicio].linha, seguintes)
+        self._trocar_trechos((pagina_reinicio, reinicio), aproveitados, novos)
+        self._ajustar_aberturas()
+
+    def _ajustar_aberturas(self):
+        """
+        Enquanto um trecho em espera mudaria a análise do trecho aberto antes dele
+        (um '}' que fecharia o bloco, uma aspa que fecharia a string), refaz a
+        análise do trecho aberto até depois dele.
+        """
+        while True:
+            conflito = self._conflito()
+            if conflito is None:
+                return
+            abertura, seguintes = conflito
+            trecho = self.paginas[abertura[0]].trechos[abertura[1]]
+            novos, aproveitados = self._analisar(trecho.linha, seguintes)
+            self._trocar_trechos(abertura, aproveitados, novos)
+
+    def _conflito(self):
+        """
+        Posição do trecho aberto e a do trecho seguinte ao primeiro trecho em espera
+        que o fecharia, ou None. Depois de uma string aberta, o resto do código
+        pertence a ela: só uma aspa igual importa.
+        """
+        if not self.abertos:
+            return None
+        abertura = None # Posição do último trecho aberto
+        aspa = None
+        for indice_pagina, pagina in enumerate(self.paginas):
+            if aspa is not None:
+                if aspa not in pagina.aspas:
+                    continue
+            elif not pagina.abertos and (abertura is None or not pagina.fechas):
+                continue
+            for indice, trecho in enumerate(pagina.trechos):
+                if aspa is not None:
+                    if aspa in trecho.aspas:
+                        return abertura, self._seguinte(indice_pagina, indice)
+                    continue
+                if trecho.fecha and abertura is not None:
+                    return abertura, self._seguinte(indice_pagina, indice)
+                if trecho.aberto:
+                    abertura = indice_pagina, indice
+                    aspa = trecho.aspa
+        return None
+
+    def _trocar_trechos(self, inicio, fim, novos):
+        """Troca os trechos de 'inicio' até 'fim' (não incluído) por 'novos' e refaz essas páginas."""
+        paginas = self.paginas
+        (pagina_inicio, indice_inicio), (pagina_fim, indice_fim) = inicio, fim
+        antes = paginas[pagina_inicio].trechos[:indice_inicio]
+        depois = paginas[pagina_fim].trechos[indice_fim:] if pagina_fim < len(paginas) else []
+        for trecho in antes + depois:
+            trecho.inicio = trecho.linha
+        trechos = antes + novos + depois
+        quantidade = max(round(len(trechos) / TRECHOS_POR_PAGINA), 1)
+        tamanho = -(-len(trechos) // quantidade)
+        refeitas = [_Pagina(trechos[indice:indice + tamanho]) for indice in range(0, len(trechos), tamanho)]
+        self.abertos += sum(pagina.abertos for pagina in refeitas)
+        self.abertos -= sum(pagina.abertos for pagina in paginas[pagina_inicio:pagina_fim + 1])
+        paginas[pagina_inicio:pagina_fim + 1] = refeitas
+
+    def _blocos(self, linha):
+        linhas = self.linhas
+        for inicio in range(linha - 1, len(linhas), LINHAS_POR_BLOCO):
+            fim = inicio + LINHAS_POR_BLOCO
+            # Sem quebra depois da última linha, para o EOF ficar onde o Parser o veria
+            yield '\n'.join(linhas[inicio:fim]) + ('\n' if fim < len(linhas) else '')
+
+    def _comeca_linha(self, token):
+        return not self.linhas[token.linha - 1][:token.coluna - 1].strip()
+
+    def _analisar(self, linha, seguintes):
+        """
+        Analisa o código a partir de 'linha' até reencontrar o começo de um trecho
+        a partir da posição 'seguintes' (ou até o fim do arquivo). Retorna os
+        trechos novos e a posição do primeiro trecho aproveitado.
+
+        Dentro de um bloco ou de um descarte de tokens, a análise não pode retomar
+        um trecho antigo, mas para nele: o último trecho novo fica aberto e os
+        antigos, em espera. O mesmo vale para uma aspa sem par, a partir da
+        primeira linha depois dela.
+        """
+        paginas = self.paginas
+        aproveitados = (len(paginas), 0)
+        erros = []
+        lexer = _Lexer.de_blocos(self._blocos(linha), self.nome_arquivo, erros, linha)
+        parser = Parser(lexer.gerar_tokens(), self.nome_arquivo, erros)
+        if seguintes[0] < len(paginas):
+            primeira_seguinte = paginas[seguintes[0]].trechos[seguintes[1]].linha
+            parser.interromper = lambda token: (
+                token.linha >= primeira_seguinte and self._comeca_linha(token)
+                and self._trecho_em(token.linha, *seguintes) is not None
+            )
+        atual = Trecho(linha)
+        novos = [atual]
+        limite = None # Primeira linha que já pertence a um trecho aproveitado
+        aspa_aberta = None
+
+        def registro(indice):
+            erro = erros[indice]
+            return erro.linha, erro.coluna, erro.mensagem, indice in lexer.lexicos
+
+        # Um erro fica com o trecho cuja declaração estava sendo analisada, mesmo que
+        # esteja no primeiro token do trecho seguinte (ex.: 'x = 1 +' antes de 'exibir').
+        # Os erros do Lexer em tokens lidos adiante são separados pela linha, no final.
+        adiados = []
+        atribuidos = 0
+        try:
+            primeira = True
+            while parser.token_atual.tipo != T_EOF:
+                token = parser.token_atual
+                if not primeira and self._comeca_linha(token):
+                    posicao = self._trecho_em(token.linha, *seguintes)
+                    if posicao is not None:
+                        aproveitados = posicao
+                        limite = token.linha
+                        break
+                    atual = Trecho(token.linha)
+                    novos.append(atual)
+                primeira = False
+                if token.tipo == T_RCHAVE:
+                    atual.fecha = True
+                try:
+                    no = parser.declaracao_raiz()
+                except AnaliseInterrompida as interrupcao:
+                    no = None
+                    if not interrupcao.descartando:
+                        atual.aberto = _BLOCO
+                    else:
+                        atual.aberto = _DESCARTE_EM_BLOCO if interrupcao.em_bloco else _DESCARTE
+                if no is not None:
+                    atual.declaracoes.append(no)
+                seguinte = parser.token_atual
+                for indice in range(atribuidos, len(erros)):
+                    erro = erros[indice]
+                    if (erro.linha, erro.coluna) > (seguinte.linha, seguinte.coluna):
+                        adiados.append(indice)
+                    else:
+                        atual.erros.append(registro(indice))
+                atribuidos = len(erros)
+                if atual.aberto:
+                    # Parou no começo de um trecho antigo, que fica em espera
+                    limite = seguinte.linha
+                    aproveitados = self._trecho_em(limite, *seguintes)
+                    break
+            else:
+                if lexer.string_aberta is not None:
+                    # O resto do código pertence à string; os erros no EOF são refeitos por erros()
+                    linha_aspa, coluna_aspa, atual.aspa = aspa_aberta = lexer.string_aberta
+                    atual.aberto = _STRING
+                    atual.erros = [erro for erro in atual.erros if erro[:2] < (linha_aspa, coluna_aspa)]
+                    aproveitados = self._primeiro_depois(linha_aspa, *seguintes)
+                    if aproveitados[0] < len(paginas):
+                        limite = paginas[aproveitados[0]].trechos[aproveitados[1]].linha
+        except StrixErrosSintaxe:
+            # Erros demais: o resto do arquivo fica sem análise até a próxima edição
+            pass
+
+        for indice in adiados + list(range(atribuidos, len(erros))):
+            erro = erros[indice]
+            if limite is None or erro.linha < limite:
+                if aspa_aberta is not None and (erro.linha, erro.coluna) >= aspa_aberta[:2]:
+                    continue
+                trecho = novos[max(bisect_right(novos, erro.linha, key=_inicio) - 1, 0)]
+                trecho.erros.append(registro(indice))
+
+        # Aspas no código de cada trecho novo, até o seguinte
+        fins = [trecho.inicio for trecho in novos[1:]]
+        fins.append(limite if limite is not None else len(self.linhas) + 1)
+        for trecho, fim in zip(novos, fins):
+            codigo = '\n'.join(self.linhas[trecho.inicio - 1:fim - 1])
+            trecho.aspas = ''.join(aspa for aspa in _ASPAS if aspa in codigo)
+        return novos, aproveitados
+
+    # --- Consultas ---
+
+    def erros(self):
+        """Erros de sintaxe do documento, como no Parser: lista de (linha, coluna, mensagem)."""
+        resultado = []
+        # Depois de um trecho aberto, os erros dos trechos em espera continuam valendo
+        # dentro de um bloco; num descarte de tokens, só os do Lexer; numa string, nenhum
+        todos, so_lexicos, nenhum = range(3)
+        visiveis = todos
+        linha_eof, coluna_eof = len(self.linhas), len(self.linhas[-1]) + 1
+        no_eof = None # Erro que o trecho aberto causa no final do código
+        for pagina in self.paginas:
+            if not pagina.com_erros and not pagina.abertos:
+                continue
+            for trecho in pagina.trechos:
+                if trecho.erros:
+                    deslocamento = trecho.deslocamento
+                    resultado.extend(
+                        (linha + deslocamento, coluna, mensagem)
+                        for linha, coluna, mensagem, do_lexer in trecho.erros
+                        if visiveis == todos or do_lexer
+                    )
+                if trecho.aberto == _STRING:
+                    no_eof = MENSAGEM_STRING_NAO_TERMINADA
+                    visiveis = nenhum
+                    break
+                if trecho.aberto:
+                    if visiveis == todos and trecho.aberto != _DESCARTE:
+                        no_eof = mensagem_esperava(T_RCHAVE, Token(T_EOF, None, linha_eof, coluna_eof))
+                    if trecho.aberto != _BLOCO:
+                        visiveis = so_lexicos
+            if visiveis == nenhum:
+                break
+        if no_eof is not None:
+            erro = StrixSintaxeError(no_eof, linha_eof, coluna_eof, self.nome_arquivo)
+            resultado.append((linha_eof, coluna_eof, erro.mensagem))
+        return primeiro_por_linha(resultado, itemgetter(0, 1))
+
+    def simbolo(self, linha, coluna):
+        """
+        Identificador na posição e a sua definição. Retorna (nome, definicao,
+        trecho da definição, funções que envolvem a definição) ou None fora de um
+        identificador; 'definicao' é None para funções nativas e nomes desconhecidos.
+        """
+        indice_pagina, indice = self._localizar(linha)
+        abertura = self._primeira_abertura()
+        if abertura is not None and (indice_pagina, indice) > abertura:
+            return None # Trecho em espera
+        trecho = self.paginas[indice_pagina].trechos[indice]
+        encontrado = _nome_em(trecho.declaracoes, linha - trecho.deslocamento, coluna)
+        if encontrado is None:
+            return None
+        no, funcoes = encontrado
+        nome = _nome_do_no(no)
+        # Os nomes de uma função são locais a ela; procura da mais interna para fora
+        for indice in range(len(funcoes) - 1, -1, -1):
+            definicao = _definicoes_locais(funcoes[indice]).get(nome)
+            if definicao is not None:
+                return nome, definicao, trecho, funcoes[:indice + 1]
+        for indice_pagina, pagina in enumerate(self.paginas):
+            if abertura is not None and indice_pagina == abertura[0]:
+                for candidato in pagina.trechos[:abertura[1] + 1]:
+                    if nome in candidato.definicoes:
+                        return nome, candidato.definicoes[nome], candidato, ()
+                break
+            candidato = pagina.definicoes.get(nome)
+            if candidato is not None:
+                return nome, candidato.definicoes[nome], candidato, ()
+        return nome, None, None, ()
+
+    def definicao(self, linha, coluna):
+        """Posição (linha, coluna) da definição do identificador na posição dada, ou None."""
+        simbolo = self.simbolo(linha, coluna)
+        if simbolo is None or simbolo[1] is None:
+            return None
+        _, definicao, trecho, _ = simbolo
+        return definicao.linha + trecho.deslocamento, definicao.coluna
+
+    def descricao(self, linha, coluna):
+        """Texto curto sobre o identificador na posição dada (para o 'hover'), ou None."""
+        simbolo = self.simbolo(linha, coluna)
+        if simbolo is None:
+            return None
+        nome, definicao, trecho, funcoes = simbolo
+        if definicao is None:
+            if nome in NATIVAS:
+                menor, maior = NATIVAS[nome][1]
+                if maior is None:
+                    aridade = f"{menor} ou mais argumentos"
+                elif menor == maior:
+                    aridade = f"{menor} argumento{'s' if menor != 1 else ''}"
+                else:
+                    aridade = f"de {menor} a {maior} argumentos"
+                return f"função nativa {nome} ({aridade})"
+            return f"{nome}: nome não definido neste arquivo"
+
+        linha_definicao = definicao.linha + trecho.deslocamento
+        if isinstance(definicao, DeclaracaoFunc):
+            parametros = ', '.join(parametro.nome for parametro in definicao.parametros)
+            texto = f"func {nome}({parametros})"
+        elif funcoes and any(parametro is definicao for parametro in funcoes[-1].parametros):
+            texto = f"parâmetro {nome} de {funcoes[-1].nome_func}"
+        elif funcoes:
+            texto = f"variável local {nome} de {funcoes[-1].nome_func}"
+        else:
+            texto = f"variável global {nome}"
+        return f"{texto}\ndefinida na linha {linha_definicao}"
@@ -1,49 +1,226 @@
 # interpreter.py
 
-from lexer import StrixError
-import re
+import operator
+
+from lexer import (
+    StrixError,
+    T_MAIS, T_MENOS, T_MULT, T_DIV,
+    T_IGUAL_IGUAL, T_DIFERENTE, T_MENOR, T_MENOR_IGUAL, T_MAIOR, T_MAIOR_IGUAL,
+)
+from resolvedor import Resolvedor
+from estatisticas import Estatisticas
+from saida import Saida
+from entrada import Entrada
+from lista import Lista, ErroLista
+from corda import Corda, concatenar
+from nativas import NATIVAS, ERROS_NATIVOS, aridade_de
+from memoizacao import AnalisadorPureza, CacheMemo, AUSENTE, TAMANHO_MEMO, chave_memo
+
+# Versão do interpretador (o cache de programas usa o código dos módulos, ver cache_programas.py)
+VERSAO = '0.2.6'
+
+def _montar_especializacoes():
+    """
+    Operações especializadas por (operador, tipo da esquerda, tipo da direita): pares de
+    tipos em que o operador do Python dá exatamente o resultado do caminho genérico.
+    A divisão fica de fora por causa do teste de divisão por zero. O '+' entre textos
+    passa por 'concatenar', que monta os textos longos como Cordas.
+    """
+    numericas = {
+        T_MAIS: operator.add, T_MENOS: operator.sub, T_MULT: operator.mul,
+        T_IGUAL_IGUAL: operator.eq, T_DIFERENTE: operator.ne,
+        T_MENOR: operator.lt, T_MENOR_IGUAL: operator.le,
+        T_MAIOR: operator.gt, T_MAIOR_IGUAL: operator.ge,
+    }
+    textos = {T_MAIS: concatenar, T_IGUAL_IGUAL: operator.eq, T_DIFERENTE: operator.ne}
+    especializacoes = {}
+    for tipo_esq in (int, float):
+        for tipo_dir in (int, float):
+            for op, funcao in numericas.items():
+                especializacoes[(op, tipo_esq, tipo_dir)] = (tipo_esq, tipo_dir, funcao)
+    for op, funcao in textos.items():
+        especializacoes[(op, str, str)] = (str, str, funcao)
+    especializacoes[(T_MAIS, Corda, str)] = (Corda, str, Corda.acrescentar)
+    return especializacoes
+
+_ESPECIALIZACOES = _montar_especializacoes()
 
 class StrixRuntimeError(StrixError):
     """Erro para problemas em tempo de execução."""
-    def __init__(self, mensagem, token):
-        linha = token.linha if token else None
-        coluna = token.coluna if token else None
+    def __init__(self, mensagem, origem):
+        # 'origem' é o nó da AST (ou qualquer objeto com linha e coluna) onde o erro ocorreu
+        linha = origem.linha if origem else None
+        coluna = origem.coluna if origem else None
         super().__init__(f"Erro de Execução: {mensagem}", linha, coluna, None)
 
 class ReturnSignal(Exception):
-    """Sinal usado para implementar a declaração 'retornar'."""
+    """Sinal usado para um 'retornar' fora de qualquer função."""
     def __init__(self, valor):
         self.valor = valor
 
 class Funcao:
     """Representa uma função definida pelo usuário."""
-    def __init__(self, declaracao, ambiente_fechado):
+    def __init__(self, declaracao, quadro_fechado):
         self.declaracao = declaracao
-        self.ambiente_fechado = ambiente_fechado # O ambiente onde a função foi criada
+        self.quadro_fechado = quadro_fechado # O quadro onde a função foi criada (None no nível superior)
 
     def chamar(self, interpretador, argumentos):
         if len(argumentos) != len(self.declaracao.parametros):
             raise StrixRuntimeError(
-                f"Função '{self.declaracao.nome_func.valor}' esperava "
+                f"Função '{self.declaracao.nome_func}' esperava "
                 f"{len(self.declaracao.parametros)} argumentos, mas recebeu {len(argumentos)}.",
-                self.declaracao.nome_func
+                self.declaracao
             )
         
-        # Cria um novo ambiente para a execução da função
-        ambiente_chamada = Ambiente(enclosing=self.ambiente_fechado)
+        # Cria um novo quadro, com um slot por variável local, para a execução da função
+        quadro_chamada = Quadro(self.declaracao.num_slots, self.quadro_fechado)
         
-        # Mapeia os argumentos para os nomes dos parâmetros no novo ambiente
+        # Os parâmetros ocupam os primeiros slots do quadro
+        slots = quadro_chamada.slots
         for param_no, arg_valor in zip(self.declaracao.parametros, argumentos):
-            ambiente_chamada.definir(param_no.var.valor, arg_valor)
+            slots[param_no.slot] = arg_valor
+
+        # Executa o corpo da função no novo quadro
+        interpretador.profundidade += 1
+        interpretador.estatisticas.registrar_chamada(interpretador.profundidade)
+        interpretador.executar_bloco(self.declaracao.corpo, quadro_chamada)
+        interpretador.profundidade -= 1
+
+        valor = interpretador.retorno
+        if valor is _SEM_RETORNO:
+            # Funções sem 'retornar' explícito retornam nulo (None)
+            return None
+        interpretador.retorno = _SEM_RETORNO
+        return valor
 
+
+class FuncaoNativa:
+    """
+    Função implementada em Python (ver nativas.py). A chamada não cria Quadro nem
+    passa pelo Interpreter: os argumentos já avaliados vão direto para a função.
+    """
+    __slots__ = ('nome', 'funcao', 'aridade_minima', 'aridade_maxima', 'pura')
+
+    def __init__(self, nome, funcao, aridade=None, pura=False):
+        self.nome = nome
+        self.funcao = funcao
+        self.aridade_minima, self.aridade_maxima = aridade_de(funcao, aridade)
+        self.pura = pura
+
+    def chamar(self, argumentos, origem):
+        """Chama a função; 'origem' é o nó da chamada, usado nas mensagens de erro."""
+        quantidade = len(argumentos)
+        if quantidade < self.aridade_minima or (self.aridade_maxima is not None and quantidade > self.aridade_maxima):
+            raise StrixRuntimeError(
+                f"Função '{self.nome}' esperava {self._descrever_aridade()}, mas recebeu {quantidade}.",
+                origem
+            )
         try:
-            # Executa o corpo da função no novo ambiente
-            interpretador.executar_bloco(self.declaracao.corpo, ambiente_chamada)
-        except ReturnSignal as ret:
-            return ret.valor
-        
-        # Funções sem 'retornar' explícito retornam nulo (None)
-        return None
+            # O código nativo sempre recebe textos como str
+            return self.funcao(*[str(arg) if type(arg) is Corda else arg for arg in argumentos])
+        except ERROS_NATIVOS as erro:
+            raise StrixRuntimeError(str(erro), origem) from None
+
+    def _descrever_aridade(self):
+        if self.aridade_maxima is None:
+            return f"pelo menos {self.aridade_minima} argumentos"
+        if self.aridade_maxima != self.aridade_minima:
+            return f"de {self.aridade_minima} a {self.aridade_maxima} argumentos"
+        return f"{self.aridade_minima} argumentos"
+
+    def __repr__(self):
+        return f"<função nativa {self.nome}>"
+
+
+def indexar(valor, indice, origem):
+    """Retorna valor[indice] com os erros de execução da Strix (usado pelos dois motores)."""
+    if type(valor) is not Lista:
+        raise StrixRuntimeError("Apenas listas podem ser indexadas.", origem)
+    try:
+        return valor.obter(indice)
+    except ErroLista as erro:
+        raise StrixRuntimeError(str(erro), origem) from None
+
+
+def eh_verdadeiro(valor):
+    """Valor lógico de um valor da Strix (usado pelos dois motores e pelo Otimizador)."""
+    if valor is None:
+        return False
+    if isinstance(valor, bool):
+        return valor
+    if isinstance(valor, (int, float)):
+        return valor != 0
+    return True # Strings não vazias, listas, etc.
+
+
+def operar(op, esq, dir, origem):
+    """
+    Aplica o operador binário 'op' (T_MAIS, T_MENOR, ...) a dois valores já avaliados,
+    com as regras da Strix. Não depende de um Interpreter: o Otimizador a usa para
+    dobrar constantes. 'origem' é o nó usado nas mensagens de erro.
+    """
+    # Operações Aritméticas
+    if op == T_MAIS:
+        if isinstance(esq, (int, float)) and isinstance(dir, (int, float)):
+            return esq + dir
+        if isinstance(esq, Lista) and isinstance(dir, Lista):
+            return esq.concatenar(dir)
+        if isinstance(esq, (str, Corda)) or isinstance(dir, (str, Corda)):
+            return concatenar(esq, dir)
+        raise StrixRuntimeError("Operação '+' inválida entre os tipos fornecidos.", origem)
+    if op == T_MENOS: return esq - dir
+    if op == T_MULT: return esq * dir
+    if op == T_DIV:
+        if dir == 0:
+            raise StrixRuntimeError("Divisão por zero.", origem)
+        return esq / dir
+
+    # Operações de Comparação
+    if op == T_IGUAL_IGUAL: return esq == dir
+    if op == T_DIFERENTE: return esq != dir
+    if op == T_MENOR: return esq < dir
+    if op == T_MENOR_IGUAL: return esq <= dir
+    if op == T_MAIOR: return esq > dir
+    if op == T_MAIOR_IGUAL: return esq >= dir
+
+
+class FuncaoMemoizada(Funcao):
+    """Função pura cujos resultados são guardados em um CacheMemo, indexados pelos argumentos."""
+    def __init__(self, declaracao, quadro_fechado, memo):
+        super().__init__(declaracao, quadro_fechado)
+        self.memo = memo
+
+    def chamar(self, interpretador, argumentos):
+        chave = chave_memo(argumentos)
+        if chave is None:
+            return super().chamar(interpretador, argumentos)
+        valor = self.memo.obter(chave)
+        if valor is AUSENTE:
+            valor = super().chamar(interpretador, argumentos)
+            self.memo.guardar(chave, valor)
+        return valor
+
+
+# Marca slots de um Quadro que ainda não receberam valor
+_NAO_DEFINIDO = object()
+
+# Valor de Interpreter.retorno enquanto nenhum 'retornar' está em andamento
+_SEM_RETORNO = object()
+
+
+class Quadro:
+    """Variáveis locais de uma chamada de função, endereçadas por slot pelo Resolvedor."""
+    __slots__ = ('slots', 'pai')
+
+    def __init__(self, tamanho, pai=None):
+        self.slots = [_NAO_DEFINIDO] * tamanho
+        self.pai = pai
+
+    def ancestral(self, profundidade):
+        quadro = self
+        for _ in range(profundidade):
+            quadro = quadro.pai
+        return quadro
 
 
 class Ambiente:
@@ -52,37 +229,93 @@ class Ambiente:
         self.valores = {}
         self.enclosing = enclosing
 
+    @classmethod
+    def global_padrao(cls):
+        """Ambiente global de um programa, já com as funções nativas registradas."""
+        ambiente = cls()
+        for nome, (funcao, aridade, pura) in NATIVAS.items():
+            ambiente.definir_nativa(nome, funcao, aridade, pura)
+        return ambiente
+
+    def definir_nativa(self, nome, funcao, aridade=None, pura=False):
+        """Expõe a função Python 'funcao' apenas neste ambiente (ver nativas.registrar)."""
+        self.definir(nome, FuncaoNativa(nome, funcao, aridade, pura))
+
+    def nativas_puras(self):
+        """Nomes ligados a funções nativas puras, para o AnalisadorPureza."""
+        return {nome for nome, valor in self.valores.items() if type(valor) is FuncaoNativa and valor.pura}
+
     def definir(self, nome, valor):
         self.valores[nome] = valor
 
-    def obter(self, token_var):
-        nome = token_var.valor
+    def obter(self, nome, origem=None):
         if nome in self.valores:
             return self.valores[nome]
         if self.enclosing is not None:
-            return self.enclosing.obter(token_var)
-        raise StrixRuntimeError(f"Variável '{nome}' não foi definida.", token_var)
+            return self.enclosing.obter(nome, origem)
+        raise StrixRuntimeError(f"Variável '{nome}' não foi definida.", origem)
 
-    def atribuir(self, token_var, valor):
-        nome = token_var.valor
+    def atribuir(self, nome, valor, origem=None):
         if nome in self.valores:
             self.valores[nome] = valor
             return
         if self.enclosing is not None:
-            self.enclosing.atribuir(token_var, valor)
+            self.enclosing.atribuir(nome, valor, origem)
             return
-        raise StrixRuntimeError(f"Variável '{nome}' não foi definida para atribuição.", token_var)
+        raise StrixRuntimeError(f"Variável '{nome}' não foi definida para atribuição.", origem)
 
 
 class Interpreter:
     """
     Executa o código Strix caminhando pela AST (Árvore de Sintaxe Abstrata).
     """
-    def __init__(self):
-        self.ambiente = Ambiente()
+    def __init__(self, memoizar=False, tamanho_memo=TAMANHO_MEMO, saida=None, entrada=None):
+        self.globais = Ambiente.global_padrao()
+        # Destino de 'exibir'; o buffer é descarregado ao final de 'interpret', mesmo com erro
+        self.saida = saida if saida is not None else Saida()
+        # Fonte de 'digitar': o terminal, ou um arquivo/iterável lido em lote
+        self.entrada = entrada if entrada is not None else Entrada()
+        self.quadro = None # Quadro da função em execução (None no nível superior)
+        # Memoização de funções puras: um CacheMemo por nome de função
+        self.memoizar = memoizar
+        self.tamanho_memo = tamanho_memo
+        self.memos = {}
+        # Valor de um 'retornar' executado: os blocos param assim que ele é definido
+        self.retorno = _SEM_RETORNO
+        self.estatisticas = Estatisticas()
+        self.profundidade = 0 # Chamadas de função em andamento
+        # Caches em linha das operações, por nó da AST. Ficam com o Interpreter,
+        # e não nos nós, porque a mesma AST pode ser usada por outras execuções (ver servidor.py)
+        self.caches = {}
 
     def interpret(self, arvore):
-        return self.executar(arvore)
+        estatisticas = self.estatisticas
+        if arvore is not None and not arvore.resolvido:
+            with estatisticas.fase('resolvedor'):
+                Resolvedor(self.globais).resolver(arvore)
+        if self.memoizar:
+            AnalisadorPureza(self.globais.nativas_puras()).analisar(arvore)
+        self.profundidade = 0
+        with estatisticas.fase('execucao'):
+            try:
+                resultado = self.executar(arvore)
+            finally:
+                self.saida.descarregar()
+        if self.retorno is not _SEM_RETORNO:
+            # 'retornar' no nível superior interrompe o programa
+            valor, self.retorno = self.retorno, _SEM_RETORNO
+            raise ReturnSignal(valor)
+        return resultado
+
+    def estatisticas_memo(self):
+        """Acertos, falhas e tamanho do cache de cada função memoizada."""
+        return {nome: memo.estatisticas() for nome, memo in self.memos.items()}
+
+    def _cache_memo(self, nome):
+        memo = self.memos.get(nome)
+        if memo is None:
+            memo = self.memos[nome] = CacheMemo(self.tamanho_memo)
+        return memo
 
     def executar(self, no):
         # Padrão Visitor: chama o método correspondente ao tipo do nó
@@ -93,27 +326,53 @@ class Interpreter:
     def visitante_generico(self, no):
         raise Exception(f"Nenhum método 'visitar_{type(no).__name__}' definido")
 
-    def executar_bloco(self, bloco, ambiente):
-        ambiente_anterior = self.ambiente
-        self.ambiente = ambiente
+    def executar_bloco(self, bloco, quadro):
+        quadro_anterior = self.quadro
+        self.quadro = quadro
         try:
             for declaracao in bloco.declaracoes:
                 self.executar(declaracao)
+                if self.retorno is not _SEM_RETORNO:
+                    break
         finally:
-            self.ambiente = ambiente_anterior
+            self.quadro = quadro_anterior
+
+    def _obter(self, no, nome):
+        """Lê o valor no endereço resolvido de 'no' (AcessoVar ou ChamadaFunc)."""
+        if no.profundidade is None:
+            return self.globais.obter(nome, no)
+        quadro = self.quadro
+        if no.profundidade:
+            quadro = quadro.ancestral(no.profundidade)
+        valor = quadro.slots[no.slot]
+        if valor is _NAO_DEFINIDO:
+            # Local ainda não atribuído: continua a busca pelos escopos externos
+            for profundidade, slot in no.alternativas:
+                valor = self.quadro.ancestral(profundidade).slots[slot]
+                if valor is not _NAO_DEFINIDO:
+                    return valor
+            return self.globais.obter(nome, no)
+        return valor
+
+    def _definir(self, no, nome, valor):
+        if no.profundidade is None:
+            self.globais.definir(nome, valor)
+        else:
+            self.quadro.slots[no.slot] = valor
     
     def visitar_Bloco(self, no):
         for declaracao in no.declaracoes:
             self.executar(declaracao)
+            if self.retorno is not _SEM_RETORNO:
+                break
 
     def visitar_AtribuicaoVar(self, no):
-        nome_var = no.var.var.valor
         valor = self.executar(no.valor)
-        self.ambiente.definir(nome_var, valor)
+        self._definir(no.var, no.var.nome, valor)
         return valor
     
     def visitar_AcessoVar(self, no):
-        return self.ambiente.obter(no.var)
+        return self._obter(no, no.nome)
 
     def visitar_Numero(self, no):
         return no.valor
@@ -122,95 +381,114 @@ class Interpreter:
         return no.valor
 
     def visitar_FString(self, no):
-        template = no.valor
-        valores_expr = {}
-        for expr_no in no.expressoes:
-            # A chave é o nome da variável no template (ex: "nome")
-            chave = expr_no.var.valor
-            # O valor é o resultado da execução do nó (ex: "Mundo")
-            valores_expr[chave] = self.executar(expr_no)
-
-        # Substitui {variavel} pelo seu valor
-        # Esta é uma forma simples, mas funcional
-        resultado = template
-        for chave, valor in valores_expr.items():
-            resultado = resultado.replace(f"{{{chave}}}", str(valor))
-        
-        return resultado
+        # Intercala os trechos literais com os valores das expressões e junta tudo de uma vez
+        segmentos = no.segmentos
+        partes = [segmentos[0]]
+        for indice, expr_no in enumerate(no.expressoes, 1):
+            partes.append(str(self.executar(expr_no)))
+            partes.append(segmentos[indice])
+        return ''.join(partes)
+
+
+    def visitar_ListaLiteral(self, no):
+        return Lista.de_valores([self.executar(elemento) for elemento in no.elementos])
 
+    def visitar_AcessoIndice(self, no):
+        alvo = self.executar(no.alvo)
+        return indexar(alvo, self.executar(no.indice), no)
 
     def visitar_ChamadaExibir(self, no):
         valor = self.executar(no.no)
-        print(valor)
+        self.saida.escrever(valor)
 
     def visitar_ChamadaDigitar(self, no):
         prompt = self.executar(no.no_prompt)
-        return input(prompt)
+        return self.entrada.ler(prompt, self.saida)
 
     def visitar_DeclaracaoSe(self, no):
-        if self._eh_verdadeiro(self.executar(no.condicao)):
+        if eh_verdadeiro(self.executar(no.condicao)):
             self.executar(no.bloco_se)
             return
 
         for cond_senaose, bloco_senaose in no.blocos_senaose:
-            if self._eh_verdadeiro(self.executar(cond_senaose)):
+            if eh_verdadeiro(self.executar(cond_senaose)):
                 self.executar(bloco_senaose)
                 return
 
         if no.bloco_senao:
             self.executar(no.bloco_senao)
 
+    def visitar_DeclaracaoEnquanto(self, no):
+        condicao = no.condicao
+        corpo = no.corpo
+        executar = self.executar
+        executar_corpo = self.visitar_Bloco
+        while eh_verdadeiro(executar(condicao)):
+            executar_corpo(corpo)
+            if self.retorno is not _SEM_RETORNO:
+                return
+
+    def visitar_DeclaracaoPara(self, no):
+        inicio = self.executar(no.inicio)
+        fim = self.executar(no.fim)
+        if type(inicio) is not int or type(fim) is not int:
+            raise StrixRuntimeError("Os limites de 'para' devem ser números inteiros.", no)
+
+        # O contador é o do range: atribuir à variável no corpo não muda as iterações.
+        # Cada volta só escreve no slot (ou no dicionário global) e executa o corpo.
+        var = no.var
+        if var.profundidade is None:
+            valores, chave = self.globais.valores, var.nome
+        else:
+            valores, chave = self.quadro.slots, var.slot
+        corpo = no.corpo
+        executar_corpo = self.visitar_Bloco
+        for valor in range(inicio, fim + 1):
+            valores[chave] = valor
+            executar_corpo(corpo)
+            if self.retorno is not _SEM_RETORNO:
+                return
+
     def visitar_DeclaracaoFunc(self, no):
-        nome_func = no.nome_func.valor
-        funcao = Funcao(no, self.ambiente)
-        self.ambiente.definir(nome_func, funcao)
+        if self.memoizar and no.pura:
+            funcao = FuncaoMemoizada(no, self.quadro, self._cache_memo(no.nome_func))
+        else:
+            funcao = Funcao(no, self.quadro)
+        self._definir(no, no.nome_func, funcao)
 
     def visitar_ChamadaFunc(self, no):
-        nome_func_token = no.nome_func
-        funcao = self.ambiente.obter(nome_func_token)
+        funcao = self._obter(no, no.nome_func)
+        if not isinstance(funcao, (Funcao, FuncaoNativa)):
+            raise StrixRuntimeError(f"'{no.nome_func}' não é uma função.", no)
 
-        if not isinstance(funcao, Funcao):
-            raise StrixRuntimeError(f"'{nome_func_token.valor}' não é uma função.", nome_func_token)
-        
         argumentos = [self.executar(arg) for arg in no.args]
+        if type(funcao) is FuncaoNativa:
+            return funcao.chamar(argumentos, no)
         return funcao.chamar(self, argumentos)
 
     def visitar_DeclaracaoRetornar(self, no):
-        valor = self.executar(no.valor)
-        raise ReturnSignal(valor)
-
-    def _eh_verdadeiro(self, valor):
-        if valor is None:
-            return False
-        if isinstance(valor, bool):
-            return valor
-        if isinstance(valor, (int, float)):
-            return valor != 0
-        return True # Strings não vazias, listas, etc.
+        self.retorno = self.executar(no.valor)
 
     def visitar_OperacaoBinaria(self, no):
         esq = self.executar(no.esq)
         dir = self.executar(no.dir)
-        op = no.op.tipo
-
-        # Operações Aritméticas
-        if op == 'MAIS':
-            if isinstance(esq, (int, float)) and isinstance(dir, (int, float)):
-                return esq + dir
-            if isinstance(esq, str) or isinstance(dir, str):
-                return str(esq) + str(dir)
-            raise StrixRuntimeError("Operação '+' inválida entre os tipos fornecidos.", no.op)
-        if op == 'MENOS': return esq - dir
-        if op == 'MULT': return esq * dir
-        if op == 'DIV': 
-            if dir == 0:
-                raise StrixRuntimeError("Divisão por zero.", no.op)
-            return esq / dir
-
-        # Operações de Comparação
-        if op == 'IGUAL_IGUAL': return esq == dir
-        if op == 'DIFERENTE': return esq != dir
-        if op == 'MENOR': return esq < dir
-        if op == 'MENOR_IGUAL': return esq <= dir
-        if op == 'MAIOR': return esq > dir
-        if op == 'MAIOR_IGUAL': return esq >= dir
+
+        # O cache do nó é None se ele nunca foi avaliado, False depois da primeira
+        # avaliação e, a partir da segunda, a operação especializada nos tipos dos
+        # operandos. Assim, código que roda uma única vez não guarda especializações.
+        caches = self.caches
+        cache = caches.get(no)
+        if cache:
+            if type(esq) is cache[0] and type(dir) is cache[1]:
+                return cache[2](esq, dir)
+            caches[no] = False # Os tipos mudaram: volta ao caminho genérico
+        else:
+            # A operação especializada dá o mesmo resultado de 'operar', só que mais rápido
+            especializada = _ESPECIALIZACOES.get((no.op, type(esq), type(dir)))
+            if especializada is not None:
+                caches[no] = especializada if cache is False else False
+                return especializada[2](esq, dir)
+            if cache is None:
+                caches[no] = False
+
+        return operar(no.op, esq, dir, no)
@@ -1,5 +1,6 @@
 # lexer.py
 
+import gc
 import re
 
 class StrixError(Exception):
@@ -15,6 +16,8 @@ class StrixError(Exception):
         msg = f"ErroStrix: {self.mensagem}"
         if self.nome_arquivo and self.linha is not None:
             msg += f"\n  Arquivo \"{self.nome_arquivo}\", linha {self.linha}"
+            if self.coluna is not None:
+                msg += f", coluna {self.coluna}"
         elif self.linha is not None:
             msg += f" na linha {self.linha}, coluna {self.coluna}"
         return msg
@@ -24,171 +27,423 @@ class StrixSintaxeError(StrixError):
     def __init__(self, mensagem, linha, coluna, nome_arquivo):
         super().__init__(f"Sintaxe inválida: {mensagem}", linha, coluna, nome_arquivo)
 
+def _posicao_erro(erro):
+    return (erro.linha, erro.coluna)
+
+def primeiro_por_linha(erros, posicao=_posicao_erro):
+    """
+    Ordena os erros pela posição e mantém só o primeiro de cada linha: os demais
+    costumam ser consequência dele. 'posicao' dá a (linha, coluna) de cada erro.
+    """
+    resultado = []
+    for erro in sorted(erros, key=posicao):
+        if not resultado or posicao(resultado[-1])[0] != posicao(erro)[0]:
+            resultado.append(erro)
+    return resultado
+
+class StrixErrosSintaxe(StrixSintaxeError):
+    """
+    Todos os erros de sintaxe encontrados numa análise com recuperação (ver o
+    parâmetro 'erros' do Lexer e do Parser), em ordem de posição no código.
+    """
+    def __init__(self, erros):
+        self.erros = primeiro_por_linha(erros)
+        primeiro = self.erros[0]
+        StrixError.__init__(self, primeiro.mensagem, primeiro.linha, primeiro.coluna, primeiro.nome_arquivo)
+
+    def formatar_mensagem(self):
+        mensagens = [erro.formatar_mensagem() for erro in self.erros]
+        if len(mensagens) > 1:
+            mensagens.append(f"{len(mensagens)} erros de sintaxe.")
+        return '\n'.join(mensagens)
+
+# Quantidade de erros a partir da qual a análise com recuperação desiste do arquivo
+MAXIMO_ERROS_SINTAXE = 100
+
+MENSAGEM_STRING_NAO_TERMINADA = "String não terminada. Esperando por uma aspa '\"'."
+
+
+# --- Tipos de token ---
+# Cada tipo é um inteiro pequeno, barato de comparar e de armazenar.
+# NOMES_TIPOS[tipo] dá o nome legível usado em repr e nas mensagens de erro.
+
+T_EOF = 0
+T_ID = 1
+T_NUMERO_INT = 2
+T_NUMERO_FLOAT = 3
+T_STRING = 4
+T_FSTRING = 5
+T_EXIBIR = 6
+T_SE = 7
+T_SENAO = 8
+T_SENAOSE = 9
+T_FUNC = 10
+T_RETORNAR = 11
+T_DIGITAR = 12
+T_MAIS = 13
+T_MENOS = 14
+T_MULT = 15
+T_DIV = 16
+T_LPAREN = 17
+T_RPAREN = 18
+T_LCHAVE = 19
+T_RCHAVE = 20
+T_DOISPONTOS = 21
+T_VIRGULA = 22
+T_IGUAL = 23
+T_IGUAL_IGUAL = 24
+T_DIFERENTE = 25
+T_MENOR = 26
+T_MENOR_IGUAL = 27
+T_MAIOR = 28
+T_MAIOR_IGUAL = 29
+T_LCOLCHETE = 30
+T_RCOLCHETE = 31
+T_ENQUANTO = 32
+T_PARA = 33
+
+NOMES_TIPOS = (
+    'EOF',
+    'ID',
+    'NUMERO_INT',
+    'NUMERO_FLOAT',
+    'STRING',
+    'FSTRING',
+    'EXIBIR',
+    'SE',
+    'SENAO',
+    'SENAOSE',
+    'FUNC',
+    'RETORNAR',
+    'DIGITAR',
+    'MAIS',
+    'MENOS',
+    'MULT',
+    'DIV',
+    'LPAREN',
+    'RPAREN',
+    'LCHAVE',
+    'RCHAVE',
+    'DOISPONTOS',
+    'VIRGULA',
+    'IGUAL',
+    'IGUAL_IGUAL',
+    'DIFERENTE',
+    'MENOR',
+    'MENOR_IGUAL',
+    'MAIOR',
+    'MAIOR_IGUAL',
+    'LCOLCHETE',
+    'RCOLCHETE',
+    'ENQUANTO',
+    'PARA',
+)
+
 
 class Token:
     """Representa um token, a menor unidade da linguagem."""
+    __slots__ = ('tipo', 'valor', 'linha', 'coluna')
+
     def __init__(self, tipo, valor, linha, coluna):
         self.tipo = tipo
         self.valor = valor
         self.linha = linha
         self.coluna = coluna
 
+    @property
+    def nome_tipo(self):
+        return NOMES_TIPOS[self.tipo]
+
     def __repr__(self):
-        return f"Token({self.tipo}, {repr(self.valor)}, L{self.linha}:C{self.coluna})"
+        return f"Token({self.nome_tipo}, {repr(self.valor)}, L{self.linha}:C{self.coluna})"
+
+
+PALAVRAS_CHAVE = {
+    'exibir': T_EXIBIR,
+    'se': T_SE,
+    'senao': T_SENAO,
+    'senaose': T_SENAOSE,
+    'func': T_FUNC,
+    'retornar': T_RETORNAR,
+    'digitar': T_DIGITAR,
+    'enquanto': T_ENQUANTO,
+    'para': T_PARA,
+}
+
+OPERADORES = {
+    '==': T_IGUAL_IGUAL,
+    '!=': T_DIFERENTE,
+    '<=': T_MENOR_IGUAL,
+    '>=': T_MAIOR_IGUAL,
+    '+': T_MAIS,
+    '-': T_MENOS,
+    '*': T_MULT,
+    '/': T_DIV,
+    '(': T_LPAREN,
+    ')': T_RPAREN,
+    '{': T_LCHAVE,
+    '}': T_RCHAVE,
+    '[': T_LCOLCHETE,
+    ']': T_RCOLCHETE,
+    ':': T_DOISPONTOS,
+    ',': T_VIRGULA,
+    '=': T_IGUAL,
+    '<': T_MENOR,
+    '>': T_MAIOR,
+}
+
+# Expressão mestre: cada alternativa reconhece uma classe de token. Ela não tem
+# grupos, para que findall devolva só os textos recortados (ver recortar); os
+# espaços que não quebram linha ficam entre os recortes. A ordem importa:
+# identificadores colados a uma aspa ficam para a alternativa das strings (prefixo
+# de f-string), operadores de dois caracteres vêm antes dos de um e qualquer outro
+# caractere cai na última alternativa, como erro.
+_PADRAO_TOKENS = re.compile(r"""
+    [^\W\d]\w*(?![\w"'])                  # Identificador ou palavra-chave
+  | ==|!=|<=|>=|[-+*/(){}\[\]:,=<>]       # Operador
+  | \n\s*                                # Quebras de linha e a indentação seguinte
+  | \d+(?:\.\d*)?                        # Número
+  | \#[^\n]*                              # Comentário
+  | (?:[^\W\d]\w*)?(?:"[^"]*"|'[^']*')    # String, com ou sem prefixo
+  | [^\W\d]\w*                            # Identificador antes de uma aspa sem par
+  | \S                                    # Caractere inesperado (ou a aspa sem par)
+""", re.VERBOSE)
+
+# Tipo dos recortes que são sempre o mesmo token
+_TIPOS_FIXOS = {**PALAVRAS_CHAVE, **OPERADORES}
+
+# Classes dos demais recortes, pelo primeiro caractere
+_NOME, _QUEBRA, _NUMERO, _TEXTO, _COMENTARIO, _INVALIDO = range(6)
+
+_CLASSES = {'\n': _QUEBRA, '#': _COMENTARIO, '"': _TEXTO, "'": _TEXTO}
+for _caractere in map(chr, range(128)):
+    if _caractere.isdigit():
+        _CLASSES[_caractere] = _NUMERO
+    elif _caractere.isalpha() or _caractere == '_':
+        _CLASSES[_caractere] = _NOME
+    elif not _caractere.isspace() and _caractere not in _CLASSES and _caractere not in OPERADORES:
+        _CLASSES[_caractere] = _INVALIDO
+del _caractere
+
+_INICIO_NOME = re.compile(r'[^\W\d]')
+
+
+def _classe(caractere):
+    """Classe de um recorte que começa com um caractere fora da tabela ASCII."""
+    if caractere.isdecimal():
+        return _NUMERO
+    if _INICIO_NOME.match(caractere):
+        return _NOME
+    return _INVALIDO
+
+
+def recortar(codigo):
+    """
+    Recorta o código em tokens sem criar um Token para cada um: retorna duas listas
+    paralelas, com o texto de cada recorte (inclusive quebras de linha e comentários)
+    e o tipo dos que são palavras-chave ou operadores (None nos demais). Valor, linha
+    e coluna só são calculados quando o Token é criado (ver Lexer.gerar_tokens).
+    """
+    textos = _PADRAO_TOKENS.findall(codigo)
+    return textos, list(map(_TIPOS_FIXOS.get, textos))
+
+
+# Tamanho dos blocos lidos de um arquivo no modo de fluxo
+TAMANHO_BLOCO = 64 * 1024
+
+
+def ler_blocos(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """Lê um arquivo de texto aberto em blocos de 'tamanho_bloco' caracteres."""
+    while True:
+        bloco = arquivo.read(tamanho_bloco)
+        if not bloco:
+            return
+        yield bloco
 
 
 class Lexer:
     """
     O Lexer (ou Tokenizer) quebra o código fonte em uma lista de Tokens.
+
+    Os tokens são recortados do código por uma única expressão regular mestre (ver
+    recortar); os objetos Token, com valor, linha e coluna, são criados sob demanda
+    por gerar_tokens. Com 'de_blocos', o código também é lido aos poucos.
+
+    Com uma lista em 'erros', os erros são guardados nela e o caractere inválido é
+    ignorado, para que o Parser relate todos os erros do arquivo de uma vez.
     """
-    def __init__(self, codigo, nome_arquivo):
+    def __init__(self, codigo, nome_arquivo, linha=1, coluna=1, erros=None):
         self.codigo = codigo
         self.nome_arquivo = nome_arquivo
         self.pos = 0
-        self.linha = 1
-        self.coluna = 1
-
-    def _avancar(self):
-        if self.pos < len(self.codigo):
-            if self.codigo[self.pos] == '\n':
-                self.linha += 1
-                self.coluna = 1
-            else:
-                self.coluna += 1
-            self.pos += 1
-
-    def _char_atual(self):
-        return self.codigo[self.pos] if self.pos < len(self.codigo) else None
+        # Posição do primeiro caractere de 'codigo' (ex.: uma expressão dentro de uma f-string)
+        self.linha = linha
+        self.coluna = coluna
+        self.erros = erros
+        self._blocos = None
+        # (linha, coluna, aspa) de uma aspa sem par, depois que gerar_tokens chega nela
+        self.string_aberta = None
 
-    def _proximo_char(self):
-        return self.codigo[self.pos + 1] if self.pos + 1 < len(self.codigo) else None
+    @classmethod
+    def de_blocos(cls, blocos, nome_arquivo, erros=None, linha=1):
+        """
+        Cria um Lexer que consome o código de um iterável de strings (ex.: ler_blocos(f)).
+        'linha' é a linha do primeiro bloco, quando ele não é o começo do arquivo.
+        """
+        lexer = cls(None, nome_arquivo, linha, erros=erros)
+        lexer._blocos = blocos
+        return lexer
 
     def _erro(self, mensagem):
-        raise StrixSintaxeError(mensagem, self.linha, self.coluna, self.nome_arquivo)
+        erro = StrixSintaxeError(mensagem, self.linha, self.coluna, self.nome_arquivo)
+        if self.erros is None:
+            raise erro
+        self.erros.append(erro)
+        if len(self.erros) >= MAXIMO_ERROS_SINTAXE:
+            raise StrixErrosSintaxe(self.erros)
+
+    def _posicionar(self, pos, linha, inicio_linha):
+        self.pos = pos
+        self.linha = linha
+        self.coluna = pos - inicio_linha + 1
 
     def tokenize(self):
-        tokens = []
-        palavras_chave = {
-            'exibir': 'EXIBIR',
-            'se': 'SE',
-            'senao': 'SENAO',
-            'senaose': 'SENAOSE',
-            'func': 'FUNC',
-            'retornar': 'RETORNAR',
-            'digitar': 'DIGITAR',
-        }
-
-        while self.pos < len(self.codigo):
-            char = self._char_atual()
-
-            if char.isspace():
-                self._avancar()
-                continue
-
-            if char == '#':
-                while self._char_atual() and self._char_atual() != '\n':
-                    self._avancar()
-                continue
-            
-            linha_inicio, col_inicio = self.linha, self.coluna
-
-            # Números (inteiros e float)
-            if char.isdigit():
-                num_str = ''
-                while self._char_atual() and self._char_atual().isdigit():
-                    num_str += self._char_atual()
-                    self._avancar()
-                if self._char_atual() == '.':
-                    num_str += '.'
-                    self._avancar()
-                    while self._char_atual() and self._char_atual().isdigit():
-                        num_str += self._char_atual()
-                        self._avancar()
-                    tokens.append(Token('NUMERO_FLOAT', float(num_str), linha_inicio, col_inicio))
-                else:
-                    tokens.append(Token('NUMERO_INT', int(num_str), linha_inicio, col_inicio))
-                continue
-
-            # Identificadores e Palavras-chave
-            if char.isalpha() or char == '_':
-                id_str = ''
-                is_fstring = False
-                if char == 'f' and self._proximo_char() in ('"', "'"):
-                    is_fstring = True
-                    self._avancar() # Pula o 'f'
-                    char = self._char_atual() # Agora é a aspa
-                
-                if not is_fstring:
-                    while self._char_atual() and (self._char_atual().isalnum() or self._char_atual() == '_'):
-                        id_str += self._char_atual()
-                        self._avancar()
-                    
-                    tipo_token = palavras_chave.get(id_str, 'ID')
-                    tokens.append(Token(tipo_token, id_str, linha_inicio, col_inicio))
-                    continue
+        # Tokens não formam ciclos: enquanto a lista cresce, o coletor de ciclos só
+        # percorreria milhões de objetos à toa
+        coletor_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            return list(self.gerar_tokens())
+        finally:
+            if coletor_ativo:
+                gc.enable()
 
-            # Strings e F-Strings
-            if char == '"' or char == "'":
-                tipo_token = 'FSTRING' if 'f' == self.codigo[self.pos-1] and self.pos > 0 else 'STRING'
-                quote = char
-                self._avancar()
-                str_val = ''
-                while self._char_atual() != quote:
-                    if self._char_atual() is None:
-                        self._erro("String não terminada. Esperando por uma aspa '\"'.")
-                    str_val += self._char_atual()
-                    self._avancar()
-                self._avancar() # Pula a aspa final
-                tokens.append(Token(tipo_token, str_val, linha_inicio, col_inicio))
-                continue
-            
-            # Operadores e Símbolos
-            if char == '+': tokens.append(Token('MAIS', '+', self.linha, self.coluna)); self._avancar(); continue
-            if char == '-': tokens.append(Token('MENOS', '-', self.linha, self.coluna)); self._avancar(); continue
-            if char == '*': tokens.append(Token('MULT', '*', self.linha, self.coluna)); self._avancar(); continue
-            if char == '/': tokens.append(Token('DIV', '/', self.linha, self.coluna)); self._avancar(); continue
-            if char == '(': tokens.append(Token('LPAREN', '(', self.linha, self.coluna)); self._avancar(); continue
-            if char == ')': tokens.append(Token('RPAREN', ')', self.linha, self.coluna)); self._avancar(); continue
-            if char == '{': tokens.append(Token('LCHAVE', '{', self.linha, self.coluna)); self._avancar(); continue
-            if char == '}': tokens.append(Token('RCHAVE', '}', self.linha, self.coluna)); self._avancar(); continue
-            if char == ':': tokens.append(Token('DOISPONTOS', ':', self.linha, self.coluna)); self._avancar(); continue
-            if char == ',': tokens.append(Token('VIRGULA', ',', self.linha, self.coluna)); self._avancar(); continue
-
-            if char == '=':
-                if self._proximo_char() == '=':
-                    self._avancar()
-                    tokens.append(Token('IGUAL_IGUAL', '==', linha_inicio, col_inicio))
-                else:
-                    tokens.append(Token('IGUAL', '=', linha_inicio, col_inicio))
-                self._avancar()
-                continue
-            
-            if char == '!':
-                if self._proximo_char() == '=':
-                    self._avancar()
-                    tokens.append(Token('DIFERENTE', '!=', linha_inicio, col_inicio))
-                    self._avancar()
+    def gerar_tokens(self):
+        """Gera os tokens um a um, terminando com o token EOF."""
+        palavra_chave = PALAVRAS_CHAVE.get
+        classes = _CLASSES.get
+        blocos = iter(self._blocos if self._blocos is not None else (self.codigo,))
+        codigo = next(blocos, '')
+        base = 0 # Posição, no código completo, do primeiro caractere de 'codigo'
+        linha = self.linha
+        inicio_linha = 1 - self.coluna # Posição (relativa a 'codigo') do primeiro caractere da linha atual
+        sem_fechamento = 0 # Com uma aspa que nenhum bloco fecha: tamanho do código até o fim do bloco dela
+
+        while True:
+            proximo_bloco = next(blocos, None)
+            final = proximo_bloco is None
+            if sem_fechamento:
+                # Tudo depois da aspa pertence à string: basta recortar até o fim do bloco dela
+                textos, tipos = recortar(codigo[:sem_fechamento])
+            else:
+                textos, tipos = recortar(codigo)
+            aspa_aberta = None
+            if not final:
+                # O último recorte pode continuar no próximo bloco, assim como uma aspa
+                # sem par e o identificador antes dela: voltam a ser analisados depois
+                quantidade = len(textos) - 1
+                for aspa in ('"', "'"):
+                    if aspa in textos and textos.index(aspa) - 1 < quantidade:
+                        quantidade = textos.index(aspa) - 1
+                        aspa_aberta = aspa
+                quantidade = max(quantidade, 0)
+                del textos[quantidade:], tipos[quantidade:]
+
+            # Entre um recorte e o seguinte só há espaços, então cada texto é
+            # encontrado logo depois do anterior
+            busca = codigo.find
+            fim = 0
+            for texto, tipo in zip(textos, tipos):
+                inicio = busca(texto, fim)
+                fim = inicio + len(texto)
+                if tipo is not None:
+                    yield Token(tipo, texto, linha, inicio - inicio_linha + 1)
                     continue
-            
-            if char == '<':
-                if self._proximo_char() == '=':
-                    self._avancar()
-                    tokens.append(Token('MENOR_IGUAL', '<=', linha_inicio, col_inicio))
-                else:
-                    tokens.append(Token('MENOR', '<', linha_inicio, col_inicio))
-                self._avancar()
-                continue
-
-            if char == '>':
-                if self._proximo_char() == '=':
-                    self._avancar()
-                    tokens.append(Token('MAIOR_IGUAL', '>=', linha_inicio, col_inicio))
-                else:
-                    tokens.append(Token('MAIOR', '>', linha_inicio, col_inicio))
-                self._avancar()
-                continue
-
-            self._erro(f"Caractere inesperado '{char}'")
-
-        tokens.append(Token('EOF', None, self.linha, self.coluna))
-        return tokens
+
+                primeiro = texto[0]
+                classe = classes(primeiro)
+                if classe is None:
+                    classe = _classe(primeiro)
+
+                if classe == _NOME:
+                    ultimo = texto[-1]
+                    if ultimo != '"' and ultimo != "'":
+                        yield Token(T_ID, texto, linha, inicio - inicio_linha + 1)
+                        continue
+                    # String com prefixo
+                    prefixo = texto[:texto.index(ultimo)]
+                    if prefixo == 'f':
+                        # f"..." : o token começa no 'f'
+                        coluna = inicio - inicio_linha + 1
+                    else:
+                        # Um identificador colado à string é um token separado
+                        yield Token(palavra_chave(prefixo, T_ID), prefixo, linha, inicio - inicio_linha + 1)
+                        coluna = inicio + len(prefixo) - inicio_linha + 1
+                    # Uma string colada a um 'f' (ex.: fim de um identificador) também é f-string.
+                    # Toda f-string começa no seu 'f', duas colunas antes do conteúdo: o parser
+                    # conta a partir daí as colunas das expressões entre {}
+                    if prefixo[-1] == 'f':
+                        tipo_token = T_FSTRING
+                        coluna = inicio + len(prefixo) - inicio_linha
+                    else:
+                        tipo_token = T_STRING
+                    yield Token(tipo_token, texto[len(prefixo) + 1:-1], linha, coluna)
+                    quebras = texto.count('\n')
+                    if quebras:
+                        linha += quebras
+                        inicio_linha = inicio + texto.rindex('\n') + 1
+
+                elif classe == _QUEBRA:
+                    linha += texto.count('\n')
+                    inicio_linha = inicio + texto.rindex('\n') + 1
+
+                elif classe == _NUMERO:
+                    coluna = inicio - inicio_linha + 1
+                    if '.' in texto:
+                        yield Token(T_NUMERO_FLOAT, float(texto), linha, coluna)
+                    else:
+                        yield Token(T_NUMERO_INT, int(texto), linha, coluna)
+
+                elif classe == _TEXTO:
+                    if len(texto) == 1:
+                        # Aspa sem par: o erro é apontado no final do código, onde a string terminaria
+                        self.string_aberta = (linha, inicio - inicio_linha + 1, texto)
+                        fim = len(codigo)
+                        quebras = codigo.count('\n', inicio, fim)
+                        if quebras:
+                            linha += quebras
+                            inicio_linha = codigo.rindex('\n', inicio, fim) + 1
+                        self._posicionar(base + fim, linha, base + inicio_linha)
+                        self._erro(MENSAGEM_STRING_NAO_TERMINADA)
+                        break # O restante do código pertence à string
+                    yield Token(T_STRING, texto[1:-1], linha, inicio - inicio_linha + 1)
+                    quebras = texto.count('\n')
+                    if quebras:
+                        linha += quebras
+                        inicio_linha = inicio + texto.rindex('\n') + 1
+
+                elif classe == _INVALIDO:
+                    self._posicionar(base + inicio, linha, base + inicio_linha)
+                    self._erro(f"Caractere inesperado '{texto}'")
+
+                # Comentários não geram tokens
+
+            if final:
+                break
+            # Mantém apenas o trecho ainda não analisado e acrescenta o próximo bloco
+            partes = [codigo[fim:], proximo_bloco]
+            if aspa_aberta is not None:
+                # A string aberta só termina na próxima aspa igual: os blocos até ela são
+                # juntados sem passar de novo por recortar a cada um
+                while aspa_aberta not in proximo_bloco:
+                    proximo_bloco = next(blocos, None)
+                    if proximo_bloco is None:
+                        sem_fechamento = len(partes[0])
+                        break
+                    partes.append(proximo_bloco)
+            codigo = ''.join(partes)
+            base += fim
+            inicio_linha -= fim
+
+        self._posicionar(base + len(codigo), linha, base + inicio_linha)
+        yield Token(T_EOF, None, self.linha, self.coluna)
@@ -0,0 +1,249 @@
+# lista.py
+
+import operator
+from array import array
+
+from corda import Corda
+
+try:
+    import numpy as np
+except ImportError: # A NumPy é opcional: sem ela, tudo roda em Python puro
+    np = None
+
+# Código do array usado para listas homogêneas de cada tipo
+CODIGOS_ARRAY = {int: 'q', float: 'd'}
+
+# Tamanho a partir do qual as operações em massa usam a NumPy, quando instalada
+LIMIAR_NUMPY = 1024
+
+# Inteiros convertidos para float sem arredondamento (a NumPy converte antes de operar)
+_INTEIRO_EXATO = 2 ** 53
+
+_OPERACOES = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+
+
+class ErroLista(Exception):
+    """Erro de uma operação sobre listas; quem chama o converte em StrixRuntimeError, com a posição."""
+
+
+def _armazenar(valores):
+    """
+    Escolhe o armazenamento de uma lista de valores Python: listas só de inteiros
+    (que caibam em 64 bits) ou só de floats ficam em um array compacto; as demais
+    (vazias, mistas, com textos, bools ou outras listas) continuam em uma list,
+    com as Cordas já convertidas em str.
+    """
+    if valores:
+        codigo = CODIGOS_ARRAY.get(type(valores[0]))
+        if codigo is not None:
+            tipo = type(valores[0])
+            if all(type(valor) is tipo for valor in valores):
+                try:
+                    return array(codigo, valores)
+                except OverflowError:
+                    pass
+    return [str(valor) if type(valor) is Corda else valor for valor in valores]
+
+
+def _formatar(valor):
+    return repr(valor) if isinstance(valor, str) else str(valor)
+
+
+class Lista:
+    """
+    Valor do tipo lista da Strix. É imutável: as operações criam listas novas.
+
+    'itens' é um array('q') ou array('d') para listas homogêneas de números (ver
+    _armazenar), ou uma list comum. Em ambos os casos, indexar devolve ints e floats do Python.
+    """
+    __slots__ = ('itens',)
+
+    def __init__(self, itens):
+        self.itens = itens
+
+    @classmethod
+    def de_valores(cls, valores):
+        return cls(_armazenar(list(valores)))
+
+    @property
+    def compacta(self):
+        return type(self.itens) is array
+
+    def __len__(self):
+        return len(self.itens)
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __eq__(self, outra):
+        if not isinstance(outra, Lista):
+            return NotImplemented
+        if type(self.itens) is type(outra.itens):
+            return self.itens == outra.itens
+        return list(self.itens) == list(outra.itens)
+
+    __hash__ = None # Listas não entram nas chaves de memoização
+
+    def __str__(self):
+        return '[' + ', '.join(map(_formatar, self.itens)) + ']'
+
+    def __repr__(self):
+        return f"Lista({self})"
+
+    def obter(self, indice):
+        """Elemento na posição 'indice' (negativos contam a partir do fim)."""
+        if type(indice) is not int:
+            raise ErroLista("O índice de uma lista deve ser um número inteiro.")
+        try:
+            return self.itens[indice]
+        except IndexError:
+            raise ErroLista(f"Índice {indice} fora da lista de tamanho {len(self.itens)}.") from None
+
+    def concatenar(self, outra):
+        if self.compacta and outra.compacta and self.itens.typecode == outra.itens.typecode:
+            return Lista(self.itens + outra.itens)
+        return Lista.de_valores(list(self.itens) + list(outra.itens))
+
+
+# --- Operações em massa ---
+# Cada operação percorre a lista inteira em código nativo (laços do Python sobre
+# arrays ou, para listas grandes, a NumPy), em vez de uma chamada Strix por elemento.
+# A NumPy só é usada onde dá exatamente o mesmo resultado que o Python.
+
+def _lista(valor, nome):
+    if not isinstance(valor, Lista):
+        raise ErroLista(f"'{nome}' esperava uma lista.")
+    return valor
+
+
+def _numerica(lista, nome):
+    itens = lista.itens
+    if type(itens) is not array and not all(isinstance(valor, (int, float)) for valor in itens):
+        raise ErroLista(f"'{nome}' só aceita listas de números.")
+    return itens
+
+
+def _vetor(itens):
+    """Visão NumPy (sem cópia) de um array compacto grande, ou None."""
+    if np is None or type(itens) is not array or len(itens) < LIMIAR_NUMPY:
+        return None
+    return np.frombuffer(itens, dtype=np.int64 if itens.typecode == 'q' else np.float64)
+
+
+def _sem_nan(itens, vetor):
+    # Com NaN, a ordem do Python depende das posições; só a NumPy não basta
+    return itens.typecode == 'q' or not np.isnan(vetor).any()
+
+
+def _de_vetor(vetor):
+    itens = array('q' if vetor.dtype == np.int64 else 'd')
+    itens.frombytes(vetor.tobytes())
+    return Lista(itens)
+
+
+def soma(lista):
+    # Não usa a NumPy: ela acumula os floats em outra ordem e estoura com inteiros grandes
+    return sum(_numerica(_lista(lista, 'soma'), 'soma'))
+
+
+def _extremo(lista, nome, funcao, posicao):
+    itens = _lista(lista, nome).itens
+    if not itens:
+        raise ErroLista(f"'{nome}' de uma lista vazia.")
+    vetor = _vetor(itens)
+    if vetor is not None and _sem_nan(itens, vetor):
+        # Primeira ocorrência do extremo, como min() e max() (importa para 0.0 e -0.0)
+        return itens[int(posicao(vetor))]
+    try:
+        return funcao(itens)
+    except TypeError:
+        raise ErroLista(f"'{nome}' precisa de elementos comparáveis entre si.") from None
+
+
+def minimo(lista):
+    return _extremo(lista, 'minimo', min, np.argmin if np is not None else None)
+
+
+def maximo(lista):
+    return _extremo(lista, 'maximo', max, np.argmax if np is not None else None)
+
+
+def ordenar(lista):
+    """Retorna uma nova lista com os elementos em ordem crescente."""
+    itens = _lista(lista, 'ordenar').itens
+    vetor = _vetor(itens)
+    if vetor is not None and _sem_nan(itens, vetor):
+        return _de_vetor(np.sort(vetor, kind='stable'))
+    try:
+        ordenados = sorted(itens)
+    except TypeError:
+        raise ErroLista("'ordenar' precisa de elementos comparáveis entre si.") from None
+    if type(itens) is array:
+        return Lista(array(itens.typecode, ordenados))
+    return Lista(ordenados)
+
+
+def mapear(lista, operador, valor):
+    """
+    Aplica 'operador' ('+', '-', '*' ou '/') a cada elemento da lista com 'valor',
+    que pode ser um número ou uma lista do mesmo tamanho (elemento a elemento).
+    """
+    itens = _numerica(_lista(lista, 'mapear'), 'mapear')
+    funcao = _OPERACOES.get(operador)
+    if funcao is None:
+        raise ErroLista("'mapear' aceita apenas os operadores '+', '-', '*' e '/'.")
+
+    if isinstance(valor, Lista):
+        outros = _numerica(valor, 'mapear')
+        if len(outros) != len(itens):
+            raise ErroLista(f"'mapear' recebeu listas de tamanhos diferentes ({len(itens)} e {len(outros)}).")
+        if operador == '/' and any(outro == 0 for outro in outros):
+            raise ErroLista("Divisão por zero.")
+        vetores = _vetores_exatos(operador, itens, outros)
+        if vetores is not None:
+            return _de_vetor(funcao(*vetores))
+        return Lista.de_valores(map(funcao, itens, outros))
+
+    if not isinstance(valor, (int, float)):
+        raise ErroLista("'mapear' precisa de um número ou de uma lista de números.")
+    if operador == '/' and valor == 0:
+        raise ErroLista("Divisão por zero.")
+    vetores = _vetores_exatos(operador, itens, valor)
+    if vetores is not None:
+        return _de_vetor(funcao(*vetores))
+    return Lista.de_valores([funcao(item, valor) for item in itens])
+
+
+def _vetores_exatos(operador, *operandos):
+    """
+    Converte os operandos (arrays compactos grandes ou números) para float64 da NumPy,
+    se assim a operação der exatamente o resultado do Python: quando algum operando é
+    float, ou numa divisão entre inteiros que cabem sem arredondamento em um float.
+    Somas e produtos só de inteiros ficam no Python, que não estoura. Retorna None
+    quando a NumPy não pode ser usada.
+    """
+    if np is None:
+        return None
+    com_float = False
+    maior_inteiro = 0
+    for operando in operandos:
+        if type(operando) is array:
+            vetor = _vetor(operando)
+            if vetor is None:
+                return None
+            if operando.typecode == 'd':
+                com_float = True
+            elif len(vetor):
+                maior_inteiro = max(maior_inteiro, -int(vetor.min()), int(vetor.max()))
+        elif type(operando) is float:
+            com_float = True
+        elif type(operando) is int:
+            maior_inteiro = max(maior_inteiro, abs(operando))
+        else:
+            return None
+    if not com_float and (operador != '/' or maior_inteiro > _INTEIRO_EXATO):
+        return None
+    return [
+        _vetor(operando).astype(np.float64, copy=False) if type(operando) is array else float(operando)
+        for operando in operandos
+    ]
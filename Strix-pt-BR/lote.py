@@ -0,0 +1,185 @@
+# lote.py
+
+import argparse
+import io
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+
+from strix import executar
+from cache_programas import DIRETORIO_PADRAO
+
+# Scripts mais lentos listados no resumo
+MAIS_LENTOS = 5
+
+
+class TempoEsgotado(BaseException):
+    """
+    Levantada (pelo SIGALRM) quando um script passa do tempo limite. Deriva de
+    BaseException para não ser tratada como erro do interpretador por 'executar'.
+    """
+
+
+class Resultado:
+    """Resultado da execução de um script: código de saída, saída e erros capturados e tempo (s)."""
+    __slots__ = ('caminho', 'codigo_saida', 'saida', 'erro', 'tempo', 'esgotado')
+
+    def __init__(self, caminho, codigo_saida, saida, erro, tempo, esgotado=False):
+        self.caminho = caminho
+        self.codigo_saida = codigo_saida
+        self.saida = saida
+        self.erro = erro
+        self.tempo = tempo
+        self.esgotado = esgotado
+
+    @property
+    def ok(self):
+        return self.codigo_saida == 0 and not self.esgotado
+
+
+def encontrar_scripts(caminhos):
+    """Lista os arquivos .tx dos caminhos dados; diretórios são percorridos recursivamente, em ordem."""
+    scripts = []
+    for caminho in caminhos:
+        if not os.path.isdir(caminho):
+            scripts.append(caminho)
+            continue
+        for raiz, diretorios, arquivos in os.walk(caminho):
+            diretorios[:] = sorted(d for d in diretorios if d != DIRETORIO_PADRAO)
+            scripts.extend(os.path.join(raiz, nome) for nome in sorted(arquivos) if nome.endswith('.tx'))
+    return scripts
+
+
+def _estourar_tempo(sinal, quadro):
+    raise TempoEsgotado()
+
+
+def executar_script(caminho, opcoes=(), tempo_limite=None):
+    """
+    Executa um script com as opções de linha de comando 'opcoes', capturando a saída
+    e os erros. Roda nos processos do pool; 'digitar' recebe uma entrada vazia.
+    """
+    saida = io.StringIO()
+    erro = io.StringIO()
+    esgotado = False
+    inicio = perf_counter()
+    anterior = signal.signal(signal.SIGALRM, _estourar_tempo) if tempo_limite else None
+    try:
+        try:
+            if tempo_limite:
+                signal.setitimer(signal.ITIMER_REAL, tempo_limite)
+            codigo_saida = executar(list(opcoes) + [caminho], saida, erro, entrada=io.StringIO())
+        finally:
+            # O alarme é cancelado ainda dentro do try: se disparar depois que 'executar'
+            # terminou, também conta como tempo esgotado, em vez de escapar para o pool
+            if tempo_limite:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except TempoEsgotado:
+        codigo_saida = 1
+        esgotado = True
+    finally:
+        if anterior is not None:
+            signal.signal(signal.SIGALRM, anterior)
+    return Resultado(caminho, codigo_saida, saida.getvalue(), erro.getvalue(), perf_counter() - inicio, esgotado)
+
+
+def executar_lote(scripts, opcoes=(), processos=None, tempo_limite=None, ordenado=True):
+    """
+    Executa os scripts em um pool de processos e gera os Resultados: na ordem de
+    'scripts' se 'ordenado', ou à medida que cada um termina.
+    """
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = [pool.submit(executar_script, script, opcoes, tempo_limite) for script in scripts]
+        for futuro in (futuros if ordenado else as_completed(futuros)):
+            yield futuro.result()
+
+
+def _descrever_falha(resultado, tempo_limite):
+    if resultado.esgotado:
+        return f"tempo limite de {tempo_limite:g} s excedido"
+    # A primeira linha dos erros traz a mensagem do StrixError; com o nome do arquivo,
+    # a posição vem na linha seguinte ('  Arquivo "x.tx", linha L, coluna C')
+    mensagem = (resultado.erro or resultado.saida).strip().splitlines()
+    if not mensagem:
+        return f"código de saída {resultado.codigo_saida}"
+    if len(mensagem) > 1 and mensagem[1].startswith('  Arquivo '):
+        return f"{mensagem[0]} ({mensagem[1].split(', ', 1)[-1]})"
+    return mensagem[0]
+
+
+def _exibir_resultado(resultado, tempo_limite, saida):
+    estado = 'ok' if resultado.ok else ('tempo esgotado' if resultado.esgotado else 'erro')
+    print(f"== {resultado.caminho} ({estado}, {resultado.tempo * 1000:.1f} ms) ==", file=saida)
+    if resultado.saida:
+        saida.write(resultado.saida)
+    if resultado.erro:
+        saida.write(resultado.erro)
+    if resultado.esgotado:
+        print(_descrever_falha(resultado, tempo_limite), file=saida)
+
+
+def formatar_resumo(resultados, tempo_total, processos, tempo_limite):
+    ok = sum(1 for resultado in resultados if resultado.ok)
+    esgotados = sum(1 for resultado in resultados if resultado.esgotado)
+    falhas = [resultado for resultado in resultados if not resultado.ok]
+    soma = sum(resultado.tempo for resultado in resultados)
+
+    linhas = [
+        f"Resumo: {len(resultados)} scripts, {ok} ok, {len(falhas) - esgotados} com erro, "
+        f"{esgotados} com tempo esgotado",
+        f"Tempo total: {tempo_total:.3f} s ({soma:.3f} s somando os scripts, {processos} processos)",
+    ]
+    if falhas:
+        linhas.append("Falhas:")
+        for resultado in falhas:
+            linhas.append(f"  {resultado.caminho}: {_descrever_falha(resultado, tempo_limite)}")
+    if resultados:
+        linhas.append("Mais lentos:")
+        for resultado in sorted(resultados, key=lambda r: r.tempo, reverse=True)[:MAIS_LENTOS]:
+            linhas.append(f"  {resultado.tempo * 1000:>10.1f} ms  {resultado.caminho}")
+    return '\n'.join(linhas)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # As opções depois de '--' são repassadas a cada script, como na linha de comando normal
+    opcoes = []
+    if '--' in argv:
+        separador = argv.index('--')
+        argv, opcoes = argv[:separador], argv[separador + 1:]
+
+    analisador = argparse.ArgumentParser(
+        prog='strix --lote',
+        usage='strix --lote [opções] <diretório ou arquivo.tx>... [-- opções de cada script]',
+        description='Executa muitos scripts Strix em paralelo e exibe um resumo.',
+        epilog="exemplo: strix --lote testes/ -j 8 --tempo-limite 10 -- --engine vm",
+    )
+    analisador.add_argument('caminhos', nargs='+', metavar='CAMINHO', help='diretórios (percorridos recursivamente) ou arquivos .tx')
+    analisador.add_argument('-j', dest='processos', type=int, default=os.cpu_count() or 1, metavar='N',
+                            help='número de processos (padrão: número de CPUs)')
+    analisador.add_argument('--tempo-limite', type=float, metavar='SEGUNDOS', help='interrompe scripts que demorarem mais que isso')
+    analisador.add_argument('--ordem', choices=('entrada', 'conclusao'), default='entrada',
+                            help="'entrada' exibe os resultados na ordem dos arquivos; 'conclusao', à medida que terminam")
+    analisador.add_argument('-q', '--quieto', action='store_true', help='exibe apenas o resumo, sem a saída de cada script')
+    argumentos = analisador.parse_args(argv)
+
+    scripts = encontrar_scripts(argumentos.caminhos)
+    if not scripts:
+        print("Erro: nenhum arquivo .tx encontrado.", file=sys.stderr)
+        return 1
+
+    inicio = perf_counter()
+    resultados = []
+    lote = executar_lote(
+        scripts, opcoes, argumentos.processos, argumentos.tempo_limite, argumentos.ordem == 'entrada',
+    )
+    for resultado in lote:
+        resultados.append(resultado)
+        if not argumentos.quieto:
+            _exibir_resultado(resultado, argumentos.tempo_limite, sys.stdout)
+            sys.stdout.flush()
+
+    print(formatar_resumo(resultados, perf_counter() - inicio, argumentos.processos, argumentos.tempo_limite))
+    return 0 if all(resultado.ok for resultado in resultados) else 1
@@ -0,0 +1,364 @@
+# maquina_virtual.py
+
+from compilador import (
+    Compilador,
+    OP_CONSTANTE, OP_CARREGAR_GLOBAL, OP_DEFINIR_GLOBAL, OP_DESCARTAR,
+    OP_CARREGAR_LOCAL, OP_DEFINIR_LOCAL, OP_CARREGAR_EXTERNO,
+    OP_SOMAR, OP_SUBTRAIR, OP_MULTIPLICAR, OP_DIVIDIR,
+    OP_IGUAL, OP_DIFERENTE, OP_MENOR, OP_MENOR_IGUAL, OP_MAIOR, OP_MAIOR_IGUAL,
+    OP_SALTAR, OP_SALTAR_SE_FALSO, OP_EXIBIR, OP_DIGITAR, OP_FSTRING,
+    OP_FUNCAO, OP_VERIFICAR_FUNCAO, OP_CHAMAR, OP_CHAMAR_CAUDA, OP_RETORNAR, OP_SINALIZAR_RETORNO,
+    OP_SOMAR_INTEIROS, OP_SOMAR_TEXTOS, OP_CARREGAR_FUNCAO_GLOBAL, OP_LISTA, OP_INDEXAR,
+    OP_PREPARAR_PARA, OP_PARA,
+)
+from interpreter import (
+    Ambiente, Quadro, ReturnSignal, StrixRuntimeError, FuncaoNativa, indexar, eh_verdadeiro, _NAO_DEFINIDO,
+)
+from lista import Lista
+from corda import Corda, concatenar
+from resolvedor import Resolvedor
+from estatisticas import Estatisticas
+from saida import Saida
+from entrada import Entrada
+from memoizacao import AnalisadorPureza, CacheMemo, AUSENTE, TAMANHO_MEMO, chave_memo
+
+
+class FuncaoCompilada:
+    """Representa uma função definida pelo usuário na MaquinaVirtual."""
+    __slots__ = ('codigo', 'quadro_fechado', 'memo')
+
+    def __init__(self, codigo, quadro_fechado, memo=None):
+        self.codigo = codigo
+        self.quadro_fechado = quadro_fechado # O quadro onde a função foi criada (None no nível superior)
+        self.memo = memo # CacheMemo, para funções puras com memoização ativa
+
+
+# Número máximo de chamadas aninhadas, padrão (chamadas de cauda não contam)
+PROFUNDIDADE_MAXIMA = 200000
+
+
+class MaquinaVirtual:
+    """
+    Executa o bytecode gerado pelo Compilador em um laço de despacho sobre uma pilha.
+    Produz a mesma saída e os mesmos erros que o Interpreter.
+
+    As chamadas de função não usam a pilha do Python: cada chamada guarda o estado
+    do chamador em uma pilha de quadros explícita, e 'retornar' apenas o restaura.
+    Assim a recursão é limitada por 'profundidade_maxima', e não pelo Python.
+    """
+    def __init__(self, profundidade_maxima=PROFUNDIDADE_MAXIMA, memoizar=False, tamanho_memo=TAMANHO_MEMO,
+                 saida=None, entrada=None):
+        self.globais = Ambiente.global_padrao()
+        self.saida = saida if saida is not None else Saida()
+        self.entrada = entrada if entrada is not None else Entrada()
+        self.profundidade_maxima = profundidade_maxima
+        self.memoizar = memoizar
+        self.tamanho_memo = tamanho_memo
+        self.memos = {}
+        self.estatisticas = Estatisticas()
+
+    def interpret(self, arvore):
+        estatisticas = self.estatisticas
+        if arvore is not None and not arvore.resolvido:
+            with estatisticas.fase('resolvedor'):
+                Resolvedor(self.globais).resolver(arvore)
+        if self.memoizar:
+            AnalisadorPureza(self.globais.nativas_puras()).analisar(arvore)
+        with estatisticas.fase('compilador'):
+            codigo = Compilador().compilar(arvore)
+        with estatisticas.fase('execucao'):
+            return self.executar_codigo(codigo)
+
+    def estatisticas_memo(self):
+        """Acertos, falhas e tamanho do cache de cada função memoizada."""
+        return {nome: memo.estatisticas() for nome, memo in self.memos.items()}
+
+    def _cache_memo(self, nome):
+        memo = self.memos.get(nome)
+        if memo is None:
+            memo = self.memos[nome] = CacheMemo(self.tamanho_memo)
+        return memo
+
+    def executar_codigo(self, codigo):
+        try:
+            return self._executar(codigo, None)
+        finally:
+            self.saida.descarregar()
+
+    def _criar_quadro(self, funcao, argumentos):
+        codigo = funcao.codigo
+        if len(argumentos) != len(codigo.parametros):
+            raise StrixRuntimeError(
+                f"Função '{codigo.nome}' esperava "
+                f"{len(codigo.parametros)} argumentos, mas recebeu {len(argumentos)}.",
+                codigo.origem
+            )
+        quadro_chamada = Quadro(codigo.num_slots, funcao.quadro_fechado)
+        slots = quadro_chamada.slots
+        for slot, valor in zip(codigo.slots_parametros, argumentos):
+            slots[slot] = valor
+        return quadro_chamada
+
+    def _carregar_alternativa(self, codigo, pc, quadro):
+        """Busca uma local ainda não atribuída nos escopos externos e, por fim, nos globais."""
+        nome, alternativas = codigo.alternativas[pc]
+        for profundidade, slot in alternativas:
+            valor = quadro.ancestral(profundidade).slots[slot]
+            if valor is not _NAO_DEFINIDO:
+                return valor
+        return self.globais.obter(nome, codigo.posicoes[pc])
+
+    def _executar(self, codigo, quadro):
+        instrucoes = codigo.instrucoes
+        constantes = codigo.constantes
+        nomes = codigo.nomes
+        caches = codigo.caches
+        globais = self.globais.valores
+        slots = quadro.slots if quadro is not None else None
+        pilha = []
+        empilhar = pilha.append
+        desempilhar = pilha.pop
+        pc = 0
+        # Estado salvo dos chamadores: (codigo, pc, quadro, memo pendente). A pilha de
+        # valores é compartilhada por todas as chamadas.
+        chamadas = []
+        profundidade_maxima = self.profundidade_maxima
+        estatisticas = self.estatisticas
+        exibir = self.saida.escrever
+
+        while True:
+            op = instrucoes[pc]
+            arg = instrucoes[pc + 1]
+            pc += 2
+
+            # Os opcodes mais frequentes são testados primeiro
+            if op == OP_CARREGAR_LOCAL:
+                valor = slots[arg]
+                if valor is _NAO_DEFINIDO:
+                    valor = self._carregar_alternativa(codigo, pc - 2, quadro)
+                empilhar(valor)
+            elif op == OP_CARREGAR_GLOBAL:
+                nome = nomes[arg]
+                if nome in globais:
+                    empilhar(globais[nome])
+                else:
+                    empilhar(self.globais.obter(nome, codigo.posicoes[pc - 2]))
+            elif op == OP_CARREGAR_FUNCAO_GLOBAL:
+                cache = caches[arg]
+                funcao = globais.get(cache[0])
+                if funcao is not cache[1]:
+                    if not isinstance(funcao, (FuncaoCompilada, FuncaoNativa)):
+                        # O nome deixou de ser uma função: desfaz a especialização
+                        instrucoes[pc - 2] = OP_CARREGAR_GLOBAL
+                        instrucoes[pc - 1] = cache[2]
+                        pc -= 2
+                        continue
+                    cache[1] = funcao # Outra função com o mesmo nome
+                empilhar(funcao)
+                pc += 2 # A função já foi verificada: pula o VERIFICAR_FUNCAO
+            elif op == OP_CONSTANTE:
+                empilhar(constantes[arg])
+            elif op == OP_DEFINIR_LOCAL:
+                slots[arg] = desempilhar()
+            elif op == OP_DEFINIR_GLOBAL:
+                globais[nomes[arg]] = desempilhar()
+            elif op == OP_SOMAR_INTEIROS:
+                dir = desempilhar()
+                esq = pilha[-1]
+                if type(esq) is int and type(dir) is int:
+                    pilha[-1] = esq + dir
+                else:
+                    # Os tipos mudaram: volta à soma genérica e refaz a instrução
+                    instrucoes[pc - 2] = OP_SOMAR
+                    empilhar(dir)
+                    pc -= 2
+            elif op == OP_SOMAR:
+                dir = desempilhar()
+                esq = pilha[-1]
+                if isinstance(esq, (int, float)) and isinstance(dir, (int, float)):
+                    pilha[-1] = esq + dir
+                    if type(esq) is int and type(dir) is int:
+                        instrucoes[pc - 2] = OP_SOMAR_INTEIROS
+                elif type(dir) is str and (type(esq) is str or type(esq) is Corda):
+                    pilha[-1] = concatenar(esq, dir)
+                    instrucoes[pc - 2] = OP_SOMAR_TEXTOS
+                elif isinstance(esq, Lista) and isinstance(dir, Lista):
+                    pilha[-1] = esq.concatenar(dir)
+                elif isinstance(esq, (str, Corda)) or isinstance(dir, (str, Corda)):
+                    pilha[-1] = concatenar(esq, dir)
+                else:
+                    raise StrixRuntimeError("Operação '+' inválida entre os tipos fornecidos.", codigo.posicoes[pc - 2])
+            elif op == OP_SUBTRAIR:
+                dir = desempilhar()
+                pilha[-1] = pilha[-1] - dir
+            elif op == OP_MENOR:
+                dir = desempilhar()
+                pilha[-1] = pilha[-1] < dir
+            elif op == OP_SALTAR_SE_FALSO:
+                valor = desempilhar()
+                if valor is True:
+                    continue
+                if valor is False or not eh_verdadeiro(valor):
+                    pc = arg
+            elif op == OP_PARA:
+                atual = pilha[-2]
+                if atual > pilha[-1]:
+                    del pilha[-2:]
+                    pc = arg
+                else:
+                    pilha[-2] = atual + 1
+                    empilhar(atual)
+            elif op == OP_SALTAR:
+                pc = arg
+            elif op == OP_RETORNAR:
+                valor = desempilhar()
+                if arg:
+                    # Contadores e limites de laços 'para' interrompidos pelo 'retornar'
+                    del pilha[-arg:]
+                if not chamadas:
+                    return valor
+                codigo, pc, quadro, pendente = chamadas.pop()
+                if pendente is not None:
+                    # Resultado de uma função memoizada
+                    pendente[0].guardar(pendente[1], valor)
+                instrucoes = codigo.instrucoes
+                constantes = codigo.constantes
+                nomes = codigo.nomes
+                caches = codigo.caches
+                slots = quadro.slots if quadro is not None else None
+                empilhar(valor)
+            elif op == OP_CHAMAR or op == OP_CHAMAR_CAUDA:
+                if arg:
+                    argumentos = pilha[-arg:]
+                    del pilha[-arg:]
+                else:
+                    argumentos = []
+                funcao = desempilhar()
+                if type(funcao) is FuncaoNativa:
+                    empilhar(funcao.chamar(argumentos, codigo.posicoes[pc - 2]))
+                    if op == OP_CHAMAR_CAUDA:
+                        pc = len(instrucoes) - 2
+                    continue
+                pendente = None
+                if funcao.memo is not None:
+                    chave = chave_memo(argumentos)
+                    if chave is not None:
+                        valor = funcao.memo.obter(chave)
+                        if valor is not AUSENTE:
+                            empilhar(valor)
+                            if op == OP_CHAMAR_CAUDA:
+                                # Todo código termina em RETORNAR: retorna o valor guardado
+                                pc = len(instrucoes) - 2
+                            continue
+                        pendente = (funcao.memo, chave)
+                novo_quadro = self._criar_quadro(funcao, argumentos)
+                if op == OP_CHAMAR:
+                    if len(chamadas) >= profundidade_maxima:
+                        raise StrixRuntimeError(
+                            f"Profundidade máxima de recursão excedida ({profundidade_maxima} chamadas).",
+                            codigo.posicoes[pc - 2]
+                        )
+                    chamadas.append((codigo, pc, quadro, pendente))
+                    if len(chamadas) > estatisticas.profundidade_maxima:
+                        estatisticas.profundidade_maxima = len(chamadas)
+                estatisticas.chamadas += 1
+                # Na chamada de cauda, o quadro atual é simplesmente substituído
+                # (e o resultado da função chamada não é memoizado)
+                codigo = funcao.codigo
+                quadro = novo_quadro
+                instrucoes = codigo.instrucoes
+                constantes = codigo.constantes
+                nomes = codigo.nomes
+                caches = codigo.caches
+                slots = quadro.slots
+                pc = 0
+            elif op == OP_MULTIPLICAR:
+                dir = desempilhar()
+                pilha[-1] = pilha[-1] * dir
+            elif op == OP_DIVIDIR:
+                dir = desempilhar()
+                if dir == 0:
+                    raise StrixRuntimeError("Divisão por zero.", codigo.posicoes[pc - 2])
+                pilha[-1] = pilha[-1] / dir
+            elif op == OP_IGUAL:
+                dir = desempilhar()
+                pilha[-1] = pilha[-1] == dir
+            elif op == OP_DIFERENTE:
+                dir = desempilhar()
+                pilha[-1] = pilha[-1] != dir
+            elif op == OP_MENOR_IGUAL:
+                dir = desempilhar()
+                pilha[-1] = pilha[-1] <= dir
+            elif op == OP_MAIOR:
+                dir = desempilhar()
+                pilha[-1] = pilha[-1] > dir
+            elif op == OP_MAIOR_IGUAL:
+                dir = desempilhar()
+                pilha[-1] = pilha[-1] >= dir
+            elif op == OP_VERIFICAR_FUNCAO:
+                funcao = pilha[-1]
+                if not isinstance(funcao, (FuncaoCompilada, FuncaoNativa)):
+                    no = codigo.posicoes[pc - 2]
+                    raise StrixRuntimeError(f"'{no.nome_func}' não é uma função.", no)
+                if instrucoes[pc - 4] == OP_CARREGAR_GLOBAL:
+                    # Função global: a carga e a verificação passam a usar um cache
+                    indice_nome = instrucoes[pc - 3]
+                    caches[pc - 4] = [nomes[indice_nome], funcao, indice_nome]
+                    instrucoes[pc - 4] = OP_CARREGAR_FUNCAO_GLOBAL
+                    instrucoes[pc - 3] = pc - 4
+            elif op == OP_SOMAR_TEXTOS:
+                dir = desempilhar()
+                esq = pilha[-1]
+                if type(dir) is str and (type(esq) is str or type(esq) is Corda):
+                    pilha[-1] = concatenar(esq, dir)
+                else:
+                    instrucoes[pc - 2] = OP_SOMAR
+                    empilhar(dir)
+                    pc -= 2
+            elif op == OP_CARREGAR_EXTERNO:
+                profundidade, slot = codigo.enderecos[arg]
+                valor = quadro.ancestral(profundidade).slots[slot]
+                if valor is _NAO_DEFINIDO:
+                    valor = self._carregar_alternativa(codigo, pc - 2, quadro)
+                empilhar(valor)
+            elif op == OP_DESCARTAR:
+                desempilhar()
+            elif op == OP_EXIBIR:
+                exibir(desempilhar())
+            elif op == OP_DIGITAR:
+                pilha[-1] = self.entrada.ler(pilha[-1], self.saida)
+            elif op == OP_FSTRING:
+                segmentos = constantes[arg]
+                quantidade = len(segmentos) - 1
+                if quantidade:
+                    partes = [segmentos[0]]
+                    for indice, valor in enumerate(pilha[-quantidade:], 1):
+                        partes.append(str(valor))
+                        partes.append(segmentos[indice])
+                    del pilha[-quantidade:]
+                    empilhar(''.join(partes))
+                else:
+                    empilhar(segmentos[0])
+            elif op == OP_LISTA:
+                if arg:
+                    valores = pilha[-arg:]
+                    del pilha[-arg:]
+                else:
+                    valores = []
+                empilhar(Lista.de_valores(valores))
+            elif op == OP_INDEXAR:
+                indice = desempilhar()
+                pilha[-1] = indexar(pilha[-1], indice, codigo.posicoes[pc - 2])
+            elif op == OP_PREPARAR_PARA:
+                if type(pilha[-2]) is not int or type(pilha[-1]) is not int:
+                    raise StrixRuntimeError("Os limites de 'para' devem ser números inteiros.", codigo.posicoes[pc - 2])
+            elif op == OP_FUNCAO:
+                codigo_func = constantes[arg]
+                if self.memoizar and codigo_func.pura:
+                    empilhar(FuncaoCompilada(codigo_func, quadro, self._cache_memo(codigo_func.nome)))
+                else:
+                    empilhar(FuncaoCompilada(codigo_func, quadro))
+            elif op == OP_SINALIZAR_RETORNO:
+                raise ReturnSignal(desempilhar())
+            else:
+                raise Exception(f"Opcode desconhecido: {op}")
@@ -0,0 +1,206 @@
+# memoizacao.py
+
+from collections import OrderedDict
+
+from parser_strix import (
+    Bloco, AtribuicaoVar, DeclaracaoSe, DeclaracaoFunc, DeclaracaoEnquanto, DeclaracaoPara,
+)
+
+# Número padrão de resultados guardados por função
+TAMANHO_MEMO = 4096
+
+# Retornado por CacheMemo.obter quando a chave não está no cache
+AUSENTE = object()
+
+
+def chave_memo(argumentos):
+    """
+    Monta a chave do cache a partir dos argumentos de uma chamada.
+    Os tipos entram na chave para que f(1), f(1.0) e f(1 == 1) não se confundam.
+    Retorna None se algum argumento não puder ser usado como chave.
+    """
+    chave = (tuple(argumentos), tuple(map(type, argumentos)))
+    try:
+        hash(chave)
+    except TypeError:
+        return None
+    return chave
+
+
+class CacheMemo:
+    """Cache LRU com os resultados de uma função pura, com contadores de acertos e falhas."""
+    __slots__ = ('tamanho_maximo', 'valores', 'acertos', 'falhas')
+
+    def __init__(self, tamanho_maximo=TAMANHO_MEMO):
+        self.tamanho_maximo = tamanho_maximo
+        self.valores = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave):
+        valores = self.valores
+        if chave in valores:
+            self.acertos += 1
+            valores.move_to_end(chave)
+            return valores[chave]
+        self.falhas += 1
+        return AUSENTE
+
+    def guardar(self, chave, valor):
+        if self.tamanho_maximo <= 0:
+            return
+        valores = self.valores
+        valores[chave] = valor
+        if len(valores) > self.tamanho_maximo:
+            # Descarta o resultado usado há mais tempo
+            valores.popitem(last=False)
+
+    def estatisticas(self):
+        return {'acertos': self.acertos, 'falhas': self.falhas, 'tamanho': len(self.valores)}
+
+
+class AnalisadorPureza:
+    """
+    Marca como puras (DeclaracaoFunc.pura) as funções do nível superior cujo
+    resultado depende apenas dos argumentos e que não têm efeitos colaterais:
+
+    - não usam 'exibir' nem 'digitar' e não declaram funções internas;
+    - só leem os próprios parâmetros e variáveis locais;
+    - só chamam funções do nível superior que também são puras, ou funções nativas
+      puras ('nativas_puras') cujo nome o programa não redefine.
+
+    O nome da função precisa ser definido uma única vez no nível superior, para que
+    as chamadas sempre encontrem a mesma função. Roda sobre a AST já resolvida.
+    """
+    def __init__(self, nativas_puras=()):
+        self.nativas_puras = frozenset(nativas_puras)
+        self.nomes_globais = set()
+        self.chamadas = None # Funções chamadas pela declaração em análise
+        self.slots_parametros = None
+
+    def analisar(self, arvore):
+        if arvore is None:
+            return arvore
+        definicoes = {}
+        candidatas = {}
+        self._coletar_definicoes(arvore, definicoes, candidatas)
+        self.nomes_globais = set(definicoes)
+        candidatas = {
+            nome: declaracao for nome, declaracao in candidatas.items() if definicoes[nome] == 1
+        }
+
+        # Nativas puras não redefinidas pelo programa não impedem a memoização
+        nativas = self.nativas_puras - self.nomes_globais
+
+        # Primeiro, cada função é analisada isoladamente
+        dependencias = {}
+        for nome, declaracao in candidatas.items():
+            self.chamadas = set()
+            self.slots_parametros = {param.slot for param in declaracao.parametros}
+            if self.verificar_no(declaracao.corpo):
+                dependencias[nome] = self.chamadas - nativas
+
+        # Depois, descarta as que chamam funções impuras, até não haver mudanças
+        puras = set(dependencias)
+        mudou = True
+        while mudou:
+            mudou = False
+            for nome in list(puras):
+                if not dependencias[nome] <= puras:
+                    puras.discard(nome)
+                    mudou = True
+
+        for nome in puras:
+            candidatas[nome].pura = True
+        return arvore
+
+    def _coletar_definicoes(self, bloco, definicoes, candidatas):
+        """Conta quantas vezes cada nome é definido no nível superior."""
+        for declaracao in bloco.declaracoes:
+            if isinstance(declaracao, AtribuicaoVar):
+                definicoes[declaracao.var.nome] = definicoes.get(declaracao.var.nome, 0) + 1
+            elif isinstance(declaracao, DeclaracaoFunc):
+                definicoes[declaracao.nome_func] = definicoes.get(declaracao.nome_func, 0) + 1
+                candidatas[declaracao.nome_func] = declaracao
+            elif isinstance(declaracao, DeclaracaoSe):
+                self._coletar_definicoes(declaracao.bloco_se, definicoes, candidatas)
+                for _, bloco_senaose in declaracao.blocos_senaose:
+                    self._coletar_definicoes(bloco_senaose, definicoes, candidatas)
+                if declaracao.bloco_senao:
+                    self._coletar_definicoes(declaracao.bloco_senao, definicoes, candidatas)
+            elif isinstance(declaracao, DeclaracaoEnquanto):
+                self._coletar_definicoes(declaracao.corpo, definicoes, candidatas)
+            elif isinstance(declaracao, DeclaracaoPara):
+                definicoes[declaracao.var.nome] = definicoes.get(declaracao.var.nome, 0) + 1
+                self._coletar_definicoes(declaracao.corpo, definicoes, candidatas)
+            elif isinstance(declaracao, Bloco):
+                self._coletar_definicoes(declaracao, definicoes, candidatas)
+
+    # --- Visitantes ---
+    # Cada visitante retorna True se o nó (e seus filhos) não impede a memoização.
+
+    def verificar_no(self, no):
+        nome_metodo = f'verificar_{type(no).__name__}'
+        visitante = getattr(self, nome_metodo, self.verificador_generico)
+        return visitante(no)
+
+    def verificador_generico(self, no):
+        # Nós desconhecidos (exibir, digitar, funções internas...) tornam a função impura
+        return False
+
+    def verificar_Numero(self, no):
+        return True
+
+    def verificar_String(self, no):
+        return True
+
+    def verificar_NoVazio(self, no):
+        return True
+
+    def verificar_Bloco(self, no):
+        return all(self.verificar_no(declaracao) for declaracao in no.declaracoes)
+
+    def verificar_AtribuicaoVar(self, no):
+        return no.var.profundidade == 0 and self.verificar_no(no.valor)
+
+    def verificar_AcessoVar(self, no):
+        if no.profundidade != 0:
+            return False
+        # Uma local lida antes de ser atribuída é buscada nos globais, que podem mudar
+        return no.slot in self.slots_parametros or no.nome not in self.nomes_globais
+
+    def verificar_OperacaoBinaria(self, no):
+        return self.verificar_no(no.esq) and self.verificar_no(no.dir)
+
+    def verificar_ListaLiteral(self, no):
+        return all(self.verificar_no(elemento) for elemento in no.elementos)
+
+    def verificar_AcessoIndice(self, no):
+        return self.verificar_no(no.alvo) and self.verificar_no(no.indice)
+
+    def verificar_FString(self, no):
+        return all(self.verificar_no(expr_no) for expr_no in no.expressoes)
+
+    def verificar_DeclaracaoSe(self, no):
+        ramos = [(no.condicao, no.bloco_se)] + list(no.blocos_senaose)
+        for condicao, bloco in ramos:
+            if not (self.verificar_no(condicao) and self.verificar_no(bloco)):
+                return False
+        return no.bloco_senao is None or self.verificar_no(no.bloco_senao)
+
+    def verificar_DeclaracaoEnquanto(self, no):
+        return self.verificar_no(no.condicao) and self.verificar_no(no.corpo)
+
+    def verificar_DeclaracaoPara(self, no):
+        return (no.var.profundidade == 0 and self.verificar_no(no.inicio)
+                and self.verificar_no(no.fim) and self.verificar_no(no.corpo))
+
+    def verificar_DeclaracaoRetornar(self, no):
+        return self.verificar_no(no.valor)
+
+    def verificar_ChamadaFunc(self, no):
+        if no.profundidade is not None:
+            # Chamada de uma função recebida como parâmetro ou definida localmente
+            return False
+        self.chamadas.add(no.nome_func)
+        return all(self.verificar_no(arg) for arg in no.args)
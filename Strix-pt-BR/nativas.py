@@ -0,0 +1,139 @@
+# nativas.py
+
+import inspect
+import math
+
+from lexer import PALAVRAS_CHAVE
+from lista import Lista, ErroLista, soma, minimo, maximo, ordenar, mapear
+
+# Funções Python pré-definidas nos globais de todo programa Strix:
+# nome -> (função, (mínimo, máximo) de argumentos, pura). Cada Interpreter ou
+# MaquinaVirtual criado depois de um registro já enxerga a função.
+NATIVAS = {}
+
+_POSICIONAIS = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+class ErroNativo(Exception):
+    """
+    Levantada por uma função nativa para indicar um erro da Strix (ex.: argumento de
+    tipo errado). Vira um StrixRuntimeError com a posição da chamada.
+    """
+
+
+# Erros de funções nativas convertidos em StrixRuntimeError pelos motores
+ERROS_NATIVOS = (ErroNativo, ErroLista)
+
+
+def aridade_de(funcao, aridade=None):
+    """
+    Normaliza a aridade de uma função nativa para (mínimo, máximo), com máximo None
+    para funções que aceitam *args. 'aridade' pode ser um int ou um par (mínimo, máximo);
+    sem ela, a aridade é lida da assinatura da função.
+    """
+    if aridade is not None:
+        if isinstance(aridade, int):
+            return (aridade, aridade)
+        menor, maior = aridade
+        return (menor, maior)
+    menor = maior = 0
+    for parametro in inspect.signature(funcao).parameters.values():
+        if parametro.kind in _POSICIONAIS:
+            maior += 1
+            if parametro.default is parametro.empty:
+                menor += 1
+        elif parametro.kind is inspect.Parameter.VAR_POSITIONAL:
+            return (menor, None)
+    return (menor, maior)
+
+
+def registrar(nome, funcao, aridade=None, pura=False):
+    """
+    Expõe 'funcao' aos programas Strix com o nome 'nome'. A quantidade de argumentos
+    é verificada antes de cada chamada; a função recebe e retorna valores Strix (int,
+    float, str, bool, None, Lista) e sinaliza erros com ErroNativo.
+
+    'pura' indica que o resultado depende apenas dos argumentos e que não há efeitos
+    colaterais: funções Strix que a chamam continuam candidatas à memoização.
+    Para um único interpretador, use interpretador.globais.definir_nativa(...).
+    """
+    if not nome.isidentifier() or nome in PALAVRAS_CHAVE:
+        raise ValueError(f"Nome inválido para uma função nativa: {nome!r}")
+    NATIVAS[nome] = (funcao, aridade_de(funcao, aridade), pura)
+    return funcao
+
+
+def nativa(nome, aridade=None, pura=False):
+    """Decorador equivalente a registrar(nome, funcao, aridade, pura)."""
+    def decorar(funcao):
+        return registrar(nome, funcao, aridade, pura)
+    return decorar
+
+
+# --- Funções pré-definidas ---
+
+@nativa('tamanho', pura=True)
+def tamanho(valor):
+    if isinstance(valor, (str, Lista)):
+        return len(valor)
+    raise ErroNativo("'tamanho' espera um texto ou uma lista.")
+
+
+@nativa('texto', pura=True)
+def texto(valor):
+    # A mesma conversão usada por 'exibir' e pelas f-strings
+    return str(valor)
+
+
+@nativa('numero', pura=True)
+def numero(valor):
+    if isinstance(valor, (int, float)):
+        return int(valor) if type(valor) is bool else valor
+    if not isinstance(valor, str):
+        raise ErroNativo("'numero' espera um texto ou um número.")
+    conteudo = valor.strip()
+    try:
+        return int(conteudo)
+    except ValueError:
+        pass
+    try:
+        resultado = float(conteudo)
+    except ValueError:
+        resultado = None
+    if resultado is None or not math.isfinite(resultado):
+        raise ErroNativo(f"Não é possível converter '{valor}' em número.")
+    return resultado
+
+
+@nativa('raiz', pura=True)
+def raiz(valor):
+    if not isinstance(valor, (int, float)):
+        raise ErroNativo("'raiz' espera um número.")
+    if valor < 0:
+        raise ErroNativo("'raiz' de um número negativo.")
+    try:
+        return math.sqrt(valor)
+    except OverflowError:
+        raise ErroNativo("'raiz' recebeu um número grande demais.") from None
+
+
+@nativa('abs', pura=True)
+def valor_absoluto(valor):
+    if not isinstance(valor, (int, float)):
+        raise ErroNativo("'abs' espera um número.")
+    return abs(valor)
+
+
+@nativa('substituir', pura=True)
+def substituir(texto, antigo, novo):
+    if not (isinstance(texto, str) and isinstance(antigo, str) and isinstance(novo, str)):
+        raise ErroNativo("'substituir' espera três textos.")
+    return texto.replace(antigo, novo)
+
+
+# Operações em massa sobre listas (ver lista.py)
+registrar('soma', soma, pura=True)
+registrar('minimo', minimo, pura=True)
+registrar('maximo', maximo, pura=True)
+registrar('ordenar', ordenar, pura=True)
+registrar('mapear', mapear, pura=True)
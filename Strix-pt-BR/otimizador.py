@@ -0,0 +1,201 @@
+# otimizador.py
+
+import sys
+
+from lexer import T_MULT
+from parser_strix import Bloco, Numero, String, DeclaracaoRetornar, NoVazio
+from interpreter import eh_verdadeiro, operar
+from corda import plano
+
+# Strings dobradas maiores que isso ficam para a execução (ex.: "-" * 1000000),
+# para não inflar a AST nem o cache .txc
+TAMANHO_MAXIMO_TEXTO = 4096
+
+NIVEL_PADRAO = 1
+
+
+def _eh_constante(no):
+    return isinstance(no, (Numero, String))
+
+
+class Otimizador:
+    """
+    Simplifica a AST já resolvida antes da execução (nível -O1):
+
+    - dobra operações entre literais ("a" + "b", 2 * 3 + 1, 1 < 2);
+    - remove ramos de 'se'/'senaose'/'senao' e laços 'enquanto' com condição constante falsa;
+    - descarta declarações sem efeito (literais soltos, código após 'retornar');
+    - compartilha uma única cópia de cada texto literal e nome de variável.
+
+    Operações que falham (ex.: divisão por zero) não são dobradas: o erro continua
+    acontecendo na execução, na mesma linha. O otimizador roda depois do Resolvedor,
+    então remover código não muda os endereços das variáveis nem os erros de resolução.
+    """
+    def __init__(self, nivel=NIVEL_PADRAO):
+        self.nivel = nivel
+
+    def otimizar(self, arvore):
+        if arvore is None or self.nivel < 1:
+            return arvore
+        arvore.declaracoes = self._otimizar_declaracoes(arvore.declaracoes)
+        return arvore
+
+    def _otimizar_declaracoes(self, declaracoes):
+        resultado = []
+        for declaracao in declaracoes:
+            declaracao = self.otimizar_no(declaracao)
+            if isinstance(declaracao, Bloco):
+                # Ramo de um 'se' constante: o bloco não cria escopo, então é incorporado
+                resultado.extend(declaracao.declaracoes)
+            elif not isinstance(declaracao, (Numero, String, NoVazio)):
+                resultado.append(declaracao)
+            if resultado and isinstance(resultado[-1], DeclaracaoRetornar):
+                # O que vem depois de 'retornar' nunca é executado
+                break
+        return resultado
+
+    # --- Visitantes ---
+    # Cada visitante retorna o nó que deve ocupar o lugar de 'no'.
+
+    def otimizar_no(self, no):
+        nome_metodo = f'otimizar_{type(no).__name__}'
+        visitante = getattr(self, nome_metodo, self.otimizador_generico)
+        return visitante(no)
+
+    def otimizador_generico(self, no):
+        return no
+
+    def otimizar_Bloco(self, no):
+        no.declaracoes = self._otimizar_declaracoes(no.declaracoes)
+        return no
+
+    def otimizar_AtribuicaoVar(self, no):
+        no.var.nome = sys.intern(no.var.nome)
+        no.valor = self.otimizar_no(no.valor)
+        return no
+
+    def otimizar_AcessoVar(self, no):
+        no.nome = sys.intern(no.nome)
+        return no
+
+    def otimizar_String(self, no):
+        no.valor = sys.intern(no.valor)
+        return no
+
+    def otimizar_FString(self, no):
+        # Expressões constantes são incorporadas aos trechos literais
+        segmentos = [no.segmentos[0]]
+        expressoes = []
+        for expr_no, segmento in zip(no.expressoes, no.segmentos[1:]):
+            expr_no = self.otimizar_no(expr_no)
+            if _eh_constante(expr_no):
+                segmentos[-1] += str(expr_no.valor) + segmento
+            else:
+                expressoes.append(expr_no)
+                segmentos.append(segmento)
+        if not expressoes:
+            return String(sys.intern(segmentos[0]), no.linha, no.coluna)
+        no.segmentos = segmentos
+        no.expressoes = expressoes
+        return no
+
+    def otimizar_ListaLiteral(self, no):
+        no.elementos = [self.otimizar_no(elemento) for elemento in no.elementos]
+        return no
+
+    def otimizar_AcessoIndice(self, no):
+        no.alvo = self.otimizar_no(no.alvo)
+        no.indice = self.otimizar_no(no.indice)
+        return no
+
+    def otimizar_ChamadaExibir(self, no):
+        no.no = self.otimizar_no(no.no)
+        return no
+
+    def otimizar_ChamadaDigitar(self, no):
+        no.no_prompt = self.otimizar_no(no.no_prompt)
+        return no
+
+    def otimizar_DeclaracaoRetornar(self, no):
+        no.valor = self.otimizar_no(no.valor)
+        return no
+
+    def otimizar_DeclaracaoEnquanto(self, no):
+        no.condicao = self.otimizar_no(no.condicao)
+        self.otimizar_Bloco(no.corpo)
+        if _eh_constante(no.condicao) and not eh_verdadeiro(no.condicao.valor):
+            return NoVazio()
+        return no
+
+    def otimizar_DeclaracaoPara(self, no):
+        no.var.nome = sys.intern(no.var.nome)
+        no.inicio = self.otimizar_no(no.inicio)
+        no.fim = self.otimizar_no(no.fim)
+        self.otimizar_Bloco(no.corpo)
+        return no
+
+    def otimizar_DeclaracaoFunc(self, no):
+        no.nome_func = sys.intern(no.nome_func)
+        self.otimizar_Bloco(no.corpo)
+        return no
+
+    def otimizar_ChamadaFunc(self, no):
+        no.nome_func = sys.intern(no.nome_func)
+        no.args = [self.otimizar_no(arg) for arg in no.args]
+        return no
+
+    def otimizar_OperacaoBinaria(self, no):
+        no.esq = self.otimizar_no(no.esq)
+        no.dir = self.otimizar_no(no.dir)
+        if not (_eh_constante(no.esq) and _eh_constante(no.dir)):
+            return no
+        if self._resultado_grande(no):
+            return no
+        try:
+            # Mesmas regras da execução (ver interpreter.operar)
+            valor = plano(operar(no.op, no.esq.valor, no.dir.valor, no))
+        except Exception:
+            # Erros de execução (divisão por zero, tipos inválidos) ficam para a execução
+            return no
+        if isinstance(valor, str):
+            if len(valor) > TAMANHO_MAXIMO_TEXTO:
+                return no
+            return String(sys.intern(valor), no.linha, no.coluna)
+        # Comparações produzem bool, que o Interpreter já trata como número
+        return Numero(valor, no.linha, no.coluna)
+
+    def _resultado_grande(self, no):
+        """Evita calcular repetições enormes de texto só para descartá-las."""
+        if no.op != T_MULT:
+            return False
+        esq, dir = no.esq.valor, no.dir.valor
+        if isinstance(esq, str) and isinstance(dir, int):
+            return len(esq) * dir > TAMANHO_MAXIMO_TEXTO
+        if isinstance(dir, str) and isinstance(esq, int):
+            return len(dir) * esq > TAMANHO_MAXIMO_TEXTO
+        return False
+
+    def otimizar_DeclaracaoSe(self, no):
+        ramos = [(no.condicao, no.bloco_se)] + list(no.blocos_senaose)
+        bloco_senao = self.otimizar_Bloco(no.bloco_senao) if no.bloco_senao else None
+
+        restantes = []
+        for condicao, bloco in ramos:
+            condicao = self.otimizar_no(condicao)
+            bloco = self.otimizar_Bloco(bloco)
+            if _eh_constante(condicao):
+                if not eh_verdadeiro(condicao.valor):
+                    # Ramo nunca executado
+                    continue
+                # Ramo sempre executado: os ramos seguintes nunca são avaliados
+                bloco_senao = bloco
+                break
+            restantes.append((condicao, bloco))
+
+        if not restantes:
+            return bloco_senao if bloco_senao is not None else NoVazio()
+
+        no.condicao, no.bloco_se = restantes[0]
+        no.blocos_senaose = restantes[1:]
+        no.bloco_senao = bloco_senao
+        return no
@@ -1,101 +1,310 @@
 # parser_strix.py
 
-from lexer import StrixSintaxeError
+import re
+
+from lexer import (
+    Lexer, StrixSintaxeError, StrixErrosSintaxe, MAXIMO_ERROS_SINTAXE, NOMES_TIPOS,
+    T_EOF, T_ID, T_NUMERO_INT, T_NUMERO_FLOAT, T_STRING, T_FSTRING,
+    T_EXIBIR, T_SE, T_SENAO, T_SENAOSE, T_FUNC, T_RETORNAR, T_DIGITAR,
+    T_MAIS, T_MENOS, T_MULT, T_DIV, T_LPAREN, T_RPAREN, T_LCHAVE, T_RCHAVE,
+    T_DOISPONTOS, T_VIRGULA, T_IGUAL, T_IGUAL_IGUAL, T_DIFERENTE,
+    T_MENOR, T_MENOR_IGUAL, T_MAIOR, T_MAIOR_IGUAL, T_LCOLCHETE, T_RCOLCHETE,
+    T_ENQUANTO, T_PARA,
+)
 
 # --- Nós da Árvore de Sintaxe Abstrata (AST) ---
+# Todos os nós usam __slots__ e guardam a posição no código (linha, coluna)
+# como inteiros, em vez de manter os Tokens de onde vieram.
 
 class AST:
     """Classe base para todos os nós da AST."""
-    pass
+    __slots__ = ('linha', 'coluna')
 
 class Bloco(AST):
-    def __init__(self, declaracoes):
+    __slots__ = ('declaracoes', 'resolvido')
+
+    def __init__(self, declaracoes, linha=None, coluna=None):
         self.declaracoes = declaracoes
+        self.resolvido = False # Marcado pelo Resolvedor no bloco raiz
+        self.linha = linha
+        self.coluna = coluna
 
 class AtribuicaoVar(AST):
-    def __init__(self, var, valor):
+    __slots__ = ('var', 'valor')
+
+    def __init__(self, var, valor, linha, coluna):
         self.var = var
         self.valor = valor
+        self.linha = linha
+        self.coluna = coluna
 
 class AcessoVar(AST):
-    def __init__(self, var):
-        self.var = var
+    __slots__ = ('nome', 'profundidade', 'slot', 'alternativas')
+
+    def __init__(self, nome, linha, coluna):
+        self.nome = nome
+        # Endereço preenchido pelo Resolvedor (profundidade None = variável global)
+        self.profundidade = None
+        self.slot = None
+        self.alternativas = ()
+        self.linha = linha
+        self.coluna = coluna
 
 class OperacaoBinaria(AST):
-    def __init__(self, esq, op, dir):
+    __slots__ = ('esq', 'op', 'dir')
+
+    def __init__(self, esq, op, dir, linha, coluna):
         self.esq = esq
-        self.op = op
+        self.op = op # Tipo do token do operador (T_MAIS, T_MENOR, ...)
         self.dir = dir
+        self.linha = linha
+        self.coluna = coluna
 
 class Numero(AST):
-    def __init__(self, token):
-        self.token = token
-        self.valor = token.valor
+    __slots__ = ('valor',)
+
+    def __init__(self, valor, linha, coluna):
+        self.valor = valor
+        self.linha = linha
+        self.coluna = coluna
 
 class String(AST):
-    def __init__(self, token):
-        self.token = token
-        self.valor = token.valor
+    __slots__ = ('valor',)
+
+    def __init__(self, valor, linha, coluna):
+        self.valor = valor
+        self.linha = linha
+        self.coluna = coluna
 
 class FString(AST):
-    def __init__(self, token, expressoes):
-        self.token = token
-        self.valor = token.valor
+    __slots__ = ('segmentos', 'expressoes')
+
+    def __init__(self, segmentos, expressoes, linha, coluna):
+        # Trechos literais intercalados com as expressões:
+        # segmentos[0] expressoes[0] segmentos[1] ... segmentos[-1]
+        self.segmentos = segmentos
         self.expressoes = expressoes
+        self.linha = linha
+        self.coluna = coluna
+
+class ListaLiteral(AST):
+    __slots__ = ('elementos',)
+
+    def __init__(self, elementos, linha, coluna):
+        self.elementos = elementos
+        self.linha = linha
+        self.coluna = coluna
+
+class AcessoIndice(AST):
+    __slots__ = ('alvo', 'indice')
+
+    def __init__(self, alvo, indice, linha, coluna):
+        self.alvo = alvo
+        self.indice = indice
+        # Posição do '[', usada nos erros de índice
+        self.linha = linha
+        self.coluna = coluna
 
 class ChamadaExibir(AST):
-    def __init__(self, no):
+    __slots__ = ('no',)
+
+    def __init__(self, no, linha, coluna):
         self.no = no
+        self.linha = linha
+        self.coluna = coluna
 
 class ChamadaDigitar(AST):
-    def __init__(self, no_prompt):
+    __slots__ = ('no_prompt',)
+
+    def __init__(self, no_prompt, linha, coluna):
         self.no_prompt = no_prompt
+        self.linha = linha
+        self.coluna = coluna
 
 class DeclaracaoSe(AST):
-    def __init__(self, condicao, bloco_se, blocos_senaose, bloco_senao):
+    __slots__ = ('condicao', 'bloco_se', 'blocos_senaose', 'bloco_senao')
+
+    def __init__(self, condicao, bloco_se, blocos_senaose, bloco_senao, linha, coluna):
         self.condicao = condicao
         self.bloco_se = bloco_se
         self.blocos_senaose = blocos_senaose # lista de (condicao, bloco)
         self.bloco_senao = bloco_senao
+        self.linha = linha
+        self.coluna = coluna
+
+class DeclaracaoEnquanto(AST):
+    __slots__ = ('condicao', 'corpo')
+
+    def __init__(self, condicao, corpo, linha, coluna):
+        self.condicao = condicao
+        self.corpo = corpo
+        self.linha = linha
+        self.coluna = coluna
+
+class DeclaracaoPara(AST):
+    __slots__ = ('var', 'inicio', 'fim', 'corpo')
+
+    def __init__(self, var, inicio, fim, corpo, linha, coluna):
+        self.var = var # AcessoVar da variável do laço, definida como em uma atribuição
+        self.inicio = inicio
+        self.fim = fim # Incluído no laço
+        self.corpo = corpo
+        self.linha = linha
+        self.coluna = coluna
 
 class DeclaracaoFunc(AST):
-    def __init__(self, nome_func, parametros, corpo):
+    __slots__ = ('nome_func', 'parametros', 'corpo', 'profundidade', 'slot', 'num_slots', 'pura')
+
+    def __init__(self, nome_func, parametros, corpo, linha, coluna):
         self.nome_func = nome_func
         self.parametros = parametros
         self.corpo = corpo
+        # Preenchidos pelo Resolvedor: onde o nome da função é definido e o tamanho do quadro
+        self.profundidade = None
+        self.slot = None
+        self.num_slots = 0
+        # Marcado pelo AnalisadorPureza: o resultado depende apenas dos argumentos
+        self.pura = False
+        # Posição do nome da função, usada nos erros de chamada
+        self.linha = linha
+        self.coluna = coluna
 
 class ChamadaFunc(AST):
-    def __init__(self, nome_func, args):
+    __slots__ = ('nome_func', 'args', 'profundidade', 'slot', 'alternativas')
+
+    def __init__(self, nome_func, args, linha, coluna):
         self.nome_func = nome_func
         self.args = args
+        # Endereço do nome da função, preenchido pelo Resolvedor
+        self.profundidade = None
+        self.slot = None
+        self.alternativas = ()
+        self.linha = linha
+        self.coluna = coluna
 
 class DeclaracaoRetornar(AST):
-    def __init__(self, valor):
+    __slots__ = ('valor',)
+
+    def __init__(self, valor, linha, coluna):
         self.valor = valor
+        self.linha = linha
+        self.coluna = coluna
 
 class NoVazio(AST):
-    pass
+    __slots__ = ()
 
 # --- Parser ---
 
+# Operadores binários: tipo do token -> precedência (maior liga mais forte).
+# Todos associam à esquerda. Um operador novo só precisa de uma entrada aqui
+# e da sua operação nos motores.
+PRECEDENCIAS = {
+    T_IGUAL_IGUAL: 1, T_DIFERENTE: 1, T_MENOR: 1, T_MENOR_IGUAL: 1, T_MAIOR: 1, T_MAIOR_IGUAL: 1,
+    T_MAIS: 2, T_MENOS: 2,
+    T_MULT: 3, T_DIV: 3,
+}
+
+# Tokens que podem começar uma declaração, onde a recuperação de erros retoma a análise
+_INICIO_DECLARACAO = frozenset((T_EXIBIR, T_SE, T_FUNC, T_ENQUANTO, T_PARA, T_RETORNAR, T_ID))
+
+# Partes de um template de f-string: chaves escapadas ou uma expressão entre {}.
+# Dentro da expressão, '}' entre aspas não encerra o trecho.
+_PADRAO_FSTRING = re.compile(r"""\{\{|\}\}|\{(?P<EXPRESSAO>(?:[^}"']|"[^"]*"|'[^']*')*)\}""")
+
+
+def mensagem_esperava(tipo_token, token):
+    """Mensagem do erro de quando o Parser esperava um tipo de token e encontrou outro."""
+    return f"Esperava token do tipo '{NOMES_TIPOS[tipo_token]}', mas encontrou '{token.nome_tipo}' com valor '{token.valor}'"
+
+
+class AnaliseInterrompida(Exception):
+    """
+    Levantada quando Parser.interromper pede para parar no token atual. Não é um
+    erro de sintaxe: atravessa a recuperação de erros até quem chamou o Parser.
+    'descartando' diz se o Parser descartava tokens depois de um erro dentro de
+    { } (ver _sincronizar); 'em_bloco', se estava dentro de um bloco de declarações.
+    """
+    def __init__(self, descartando):
+        super().__init__()
+        self.descartando = descartando
+        self.em_bloco = False
+
 class Parser:
     """
-    O Parser constrói a AST a partir da lista de tokens.
-    Implementa um parser de descida recursiva.
+    O Parser constrói a AST a partir dos tokens.
+    Implementa um parser de descida recursiva para as declarações e o método de
+    Pratt (precedência de operadores, ver PRECEDENCIAS) para as expressões.
+
+    Os tokens podem vir de uma lista ou de um gerador (ex.: Lexer.gerar_tokens);
+    o Parser só precisa do token atual e de um token de antecipação.
+
+    Com uma lista em 'erros' (a mesma passada ao Lexer), o Parser se recupera dos
+    erros de sintaxe: cada erro é guardado e a análise continua na próxima
+    declaração. No final, parse() levanta um StrixErrosSintaxe com todos eles.
+
+    'interromper' pode receber uma função chamada com o token atual no começo de
+    cada declaração de um bloco e a cada token descartado dentro de { }; se ela
+    retornar verdadeiro, a análise para com AnaliseInterrompida (ver incremental.py).
     """
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(self, tokens, nome_arquivo=None, erros=None):
+        self._fonte = iter(tokens)
+        self._proximo = None # Token de antecipação, lido sob demanda
         self.pos = 0
-        self.token_atual = self.tokens[self.pos]
+        self.token_atual = next(self._fonte)
+        self.nome_arquivo = nome_arquivo
+        self.erros = erros
+        self.interromper = None
 
     def _erro(self, mensagem):
         tk = self.token_atual
-        raise StrixSintaxeError(mensagem, tk.linha, tk.coluna, None)
+        raise StrixSintaxeError(mensagem, tk.linha, tk.coluna, self.nome_arquivo)
+
+    def _registrar(self, erro):
+        """Guarda um erro no modo de recuperação (ou o levanta, fora dele)."""
+        if self.erros is None or isinstance(erro, StrixErrosSintaxe):
+            raise erro
+        self.erros.append(erro)
+        if len(self.erros) >= MAXIMO_ERROS_SINTAXE:
+            raise StrixErrosSintaxe(self.erros)
+
+    def _sincronizar(self, linha):
+        """
+        Descarta tokens até o provável início da próxima declaração: um token que
+        possa começar uma declaração em uma linha depois de 'linha', ou o '}' que
+        fecha o bloco atual. Blocos entre { } no caminho são descartados inteiros.
+        """
+        profundidade = 0
+        while True:
+            token = self.token_atual
+            tipo = token.tipo
+            if tipo == T_EOF:
+                return
+            if profundidade == 0:
+                if tipo == T_RCHAVE or (token.linha > linha and tipo in _INICIO_DECLARACAO):
+                    return
+            elif self.interromper is not None and self.interromper(token):
+                raise AnaliseInterrompida(True)
+            if tipo == T_LCHAVE:
+                profundidade += 1
+            elif tipo == T_RCHAVE:
+                profundidade -= 1
+            self._avancar()
+
+    def _espiar(self):
+        """Retorna o token seguinte ao atual sem consumi-lo."""
+        if self._proximo is None:
+            self._proximo = next(self._fonte, self.token_atual)
+        return self._proximo
 
     def _avancar(self):
+        if self.token_atual.tipo == T_EOF:
+            return
         self.pos += 1
-        if self.pos < len(self.tokens):
-            self.token_atual = self.tokens[self.pos]
+        if self._proximo is not None:
+            self.token_atual = self._proximo
+            self._proximo = None
+        else:
+            self.token_atual = next(self._fonte, self.token_atual)
 
     def _consumir(self, tipo_token):
         if self.token_atual.tipo == tipo_token:
@@ -103,192 +312,306 @@ class Parser:
             self._avancar()
             return token
         else:
-            self._erro(f"Esperava token do tipo '{tipo_token}', mas encontrou '{self.token_atual.tipo}' com valor '{self.token_atual.valor}'")
+            self._erro(mensagem_esperava(tipo_token, self.token_atual))
 
     def parse(self):
-        if self.token_atual.tipo == 'EOF':
-            return None
-        arvore = self.bloco()
-        if self.token_atual.tipo != 'EOF':
-            self._erro("Código inesperado após o final do programa.")
+        arvore = None
+        if self.token_atual.tipo != T_EOF:
+            arvore = self.bloco()
+            while self.token_atual.tipo != T_EOF:
+                # Um '}' sem par: na recuperação, o programa continua depois dele
+                self._chave_sem_par()
+                arvore.declaracoes.extend(self.bloco().declaracoes)
+        if self.erros:
+            raise StrixErrosSintaxe(self.erros)
         return arvore
 
+    def _chave_sem_par(self):
+        try:
+            self._erro("Código inesperado após o final do programa.")
+        except StrixSintaxeError as erro:
+            self._registrar(erro)
+        self._avancar()
+
+    def declaracao_raiz(self):
+        """
+        Analisa a próxima declaração do nível superior, para quem analisa o programa
+        aos poucos (ver incremental.py). No modo de recuperação, retorna None se a
+        declaração tinha um erro de sintaxe ou era um '}' sem par.
+        """
+        inicio = self.token_atual
+        if inicio.tipo == T_RCHAVE:
+            self._chave_sem_par()
+            return None
+        try:
+            return self.declaracao()
+        except StrixSintaxeError as erro:
+            self._registrar(erro)
+            self._sincronizar(inicio.linha)
+            return None
+
     def bloco(self):
+        token = self.token_atual
         declaracoes = []
-        while self.token_atual.tipo not in ('EOF', 'RCHAVE'):
-            declaracoes.append(self.declaracao())
-        return Bloco(declaracoes)
+        try:
+            while self.token_atual.tipo not in (T_EOF, T_RCHAVE):
+                inicio = self.token_atual
+                if self.interromper is not None and self.interromper(inicio):
+                    raise AnaliseInterrompida(False)
+                try:
+                    declaracoes.append(self.declaracao())
+                except StrixSintaxeError as erro:
+                    self._registrar(erro)
+                    self._sincronizar(inicio.linha)
+        except AnaliseInterrompida as interrupcao:
+            interrupcao.em_bloco = True
+            raise
+        return Bloco(declaracoes, token.linha, token.coluna)
 
     def declaracao(self):
-        if self.token_atual.tipo == 'EXIBIR':
+        if self.token_atual.tipo == T_EXIBIR:
             return self.declaracao_exibir()
-        if self.token_atual.tipo == 'SE':
+        if self.token_atual.tipo == T_SE:
             return self.declaracao_se()
-        if self.token_atual.tipo == 'FUNC':
+        if self.token_atual.tipo == T_FUNC:
             return self.declaracao_func()
-        if self.token_atual.tipo == 'RETORNAR':
+        if self.token_atual.tipo == T_ENQUANTO:
+            return self.declaracao_enquanto()
+        if self.token_atual.tipo == T_PARA:
+            return self.declaracao_para()
+        if self.token_atual.tipo == T_RETORNAR:
             return self.declaracao_retornar()
-        if self.token_atual.tipo == 'ID' and self.tokens[self.pos + 1].tipo == 'IGUAL':
+        if self.token_atual.tipo == T_ID and self._espiar().tipo == T_IGUAL:
             return self.declaracao_atribuicao()
         return self.expressao()
 
     def declaracao_atribuicao(self):
-        var = AcessoVar(self._consumir('ID'))
-        self._consumir('IGUAL')
+        token = self._consumir(T_ID)
+        var = AcessoVar(token.valor, token.linha, token.coluna)
+        self._consumir(T_IGUAL)
         valor = self.expressao()
-        return AtribuicaoVar(var, valor)
+        return AtribuicaoVar(var, valor, token.linha, token.coluna)
 
     def declaracao_exibir(self):
-        self._consumir('EXIBIR')
-        self._consumir('LPAREN')
+        token = self._consumir(T_EXIBIR)
+        self._consumir(T_LPAREN)
         no = self.expressao()
-        self._consumir('RPAREN')
-        return ChamadaExibir(no)
+        self._consumir(T_RPAREN)
+        return ChamadaExibir(no, token.linha, token.coluna)
 
     def declaracao_retornar(self):
-        self._consumir('RETORNAR')
+        token = self._consumir(T_RETORNAR)
         valor = self.expressao()
-        return DeclaracaoRetornar(valor)
+        return DeclaracaoRetornar(valor, token.linha, token.coluna)
     
     def declaracao_func(self):
-        self._consumir('FUNC')
-        nome_func = self._consumir('ID')
-        self._consumir('LPAREN')
+        self._consumir(T_FUNC)
+        nome_func = self._consumir(T_ID)
+        self._consumir(T_LPAREN)
         parametros = []
-        if self.token_atual.tipo == 'ID':
-            parametros.append(AcessoVar(self._consumir('ID')))
-            while self.token_atual.tipo == 'VIRGULA':
-                self._consumir('VIRGULA')
-                parametros.append(AcessoVar(self._consumir('ID')))
-        self._consumir('RPAREN')
-        self._consumir('DOISPONTOS')
-        
-        # A Strix não usará indentação, mas blocos explícitos com { } ou fim de linha
-        # Para simplificar, um bloco de função é apenas uma lista de declarações até o próximo nível
-        # (Isso é uma simplificação. Uma linguagem real usaria indentação ou chaves)
-        # Vamos assumir que o corpo da função é uma única declaração ou um bloco implícito
+        if self.token_atual.tipo == T_ID:
+            parametros.append(self.acesso_var())
+            while self.token_atual.tipo == T_VIRGULA:
+                self._consumir(T_VIRGULA)
+                parametros.append(self.acesso_var())
+        self._consumir(T_RPAREN)
+        self._consumir(T_DOISPONTOS)
         corpo = self.bloco_de_codigo()
-        return DeclaracaoFunc(nome_func, parametros, corpo)
+        return DeclaracaoFunc(nome_func.valor, parametros, corpo, nome_func.linha, nome_func.coluna)
 
     def bloco_de_codigo(self):
-        # Simplificação: O "bloco" é apenas a próxima declaração
-        # Uma implementação mais robusta usaria indentação ou chaves {}
-        declaracoes = []
-        # Vamos usar um modelo simplificado onde as funções não são aninhadas facilmente
-        # e o corpo termina no fim do arquivo ou em outra declaração de nível superior.
-        # Isto é uma limitação deste interpretador simples.
-        # Para este exemplo, vamos considerar que um bloco é uma única declaração.
-        # O ideal seria usar indentação ou chaves {}.
-        # Por simplicidade, faremos com que o corpo seja a próxima declaração.
-        declaracoes.append(self.declaracao())
-        return Bloco(declaracoes)
+        """
+        Corpo de uma função, 'se' ou laço: várias declarações entre { }, ou apenas
+        a próxima declaração. A Strix não usa indentação para delimitar blocos.
+        """
+        token = self.token_atual
+        if token.tipo == T_LCHAVE:
+            self._consumir(T_LCHAVE)
+            bloco = self.bloco()
+            self._consumir(T_RCHAVE)
+            return bloco
+        return Bloco([self.declaracao()], token.linha, token.coluna)
+
+    def _consumir_palavra(self, *palavras):
+        """Consome um identificador usado como palavra da sintaxe (ex.: 'de' em 'para')."""
+        if self.token_atual.tipo != T_ID or self.token_atual.valor not in palavras:
+            self._erro(f"Esperava '{palavras[0]}', mas encontrou '{self.token_atual.valor}'")
+        self._avancar()
+
+    def declaracao_enquanto(self):
+        token = self._consumir(T_ENQUANTO)
+        condicao = self.expressao()
+        self._consumir(T_DOISPONTOS)
+        corpo = self.bloco_de_codigo()
+        return DeclaracaoEnquanto(condicao, corpo, token.linha, token.coluna)
+
+    def declaracao_para(self):
+        # para i de 1 ate 10: ...
+        # 'de' e 'ate' não são palavras reservadas, para não tirar esses nomes dos programas
+        token = self._consumir(T_PARA)
+        var = self.acesso_var()
+        self._consumir_palavra('de')
+        inicio = self.expressao()
+        self._consumir_palavra('ate', 'até')
+        fim = self.expressao()
+        self._consumir(T_DOISPONTOS)
+        corpo = self.bloco_de_codigo()
+        return DeclaracaoPara(var, inicio, fim, corpo, token.linha, token.coluna)
 
     def declaracao_se(self):
-        self._consumir('SE')
+        token = self._consumir(T_SE)
         condicao = self.expressao()
-        self._consumir('DOISPONTOS')
+        self._consumir(T_DOISPONTOS)
         bloco_se = self.bloco_de_codigo()
         
         blocos_senaose = []
-        while self.token_atual.tipo == 'SENAOSE':
-            self._consumir('SENAOSE')
+        while self.token_atual.tipo == T_SENAOSE:
+            self._consumir(T_SENAOSE)
             cond_senaose = self.expressao()
-            self._consumir('DOISPONTOS')
+            self._consumir(T_DOISPONTOS)
             bloco_senaose = self.bloco_de_codigo()
             blocos_senaose.append((cond_senaose, bloco_senaose))
 
         bloco_senao = None
-        if self.token_atual.tipo == 'SENAO':
-            self._consumir('SENAO')
-            self._consumir('DOISPONTOS')
+        if self.token_atual.tipo == T_SENAO:
+            self._consumir(T_SENAO)
+            self._consumir(T_DOISPONTOS)
             bloco_senao = self.bloco_de_codigo()
 
-        return DeclaracaoSe(condicao, bloco_se, blocos_senaose, bloco_senao)
-
+        return DeclaracaoSe(condicao, bloco_se, blocos_senaose, bloco_senao, token.linha, token.coluna)
 
-    def expressao(self):
-        return self.comparacao()
 
-    def comparacao(self):
-        no = self.termo_aditivo()
-        while self.token_atual.tipo in ('IGUAL_IGUAL', 'DIFERENTE', 'MENOR', 'MENOR_IGUAL', 'MAIOR', 'MAIOR_IGUAL'):
+    def expressao(self, precedencia_minima=1):
+        """
+        Analisa um operando seguido dos operadores binários com precedência de pelo
+        menos 'precedencia_minima'. O lado direito de cada operador é analisado com
+        a precedência seguinte, o que faz os operadores associarem à esquerda.
+        """
+        token = self.token_atual
+        prefixo = _PREFIXOS.get(token.tipo)
+        if prefixo is None:
+            self._erro(f"Elemento de expressão inválido. Não esperava um token do tipo '{token.nome_tipo}'.")
+        self._avancar()
+        no = prefixo(self, token)
+        while self.token_atual.tipo == T_LCOLCHETE:
+            no = self.acesso_indice(no)
+
+        op = self.token_atual
+        precedencia = PRECEDENCIAS.get(op.tipo, 0)
+        while precedencia >= precedencia_minima:
+            self._avancar()
+            no = OperacaoBinaria(no, op.tipo, self.expressao(precedencia + 1), op.linha, op.coluna)
             op = self.token_atual
-            self._consumir(op.tipo)
-            no = OperacaoBinaria(esq=no, op=op, dir=self.termo_aditivo())
+            precedencia = PRECEDENCIAS.get(op.tipo, 0)
         return no
 
-    def termo_aditivo(self):
-        no = self.termo_multiplicativo()
-        while self.token_atual.tipo in ('MAIS', 'MENOS'):
-            op = self.token_atual
-            self._consumir(op.tipo)
-            no = OperacaoBinaria(esq=no, op=op, dir=self.termo_multiplicativo())
-        return no
+    # --- Operandos ---
+    # Cada um recebe o seu primeiro token, já consumido (ver _PREFIXOS)
 
-    def termo_multiplicativo(self):
-        no = self.fator()
-        while self.token_atual.tipo in ('MULT', 'DIV'):
-            op = self.token_atual
-            self._consumir(op.tipo)
-            no = OperacaoBinaria(esq=no, op=op, dir=self.fator())
+    def numero(self, token):
+        return Numero(token.valor, token.linha, token.coluna)
+
+    def string(self, token):
+        return String(token.valor, token.linha, token.coluna)
+
+    def identificador(self, token):
+        if self.token_atual.tipo == T_LPAREN:
+            return self.chamada_func(token)
+        return AcessoVar(token.valor, token.linha, token.coluna)
+
+    def parenteses(self, token):
+        no = self.expressao()
+        self._consumir(T_RPAREN)
         return no
 
-    def fator(self):
-        token = self.token_atual
-        if token.tipo == 'NUMERO_INT':
-            self._consumir('NUMERO_INT')
-            return Numero(token)
-        if token.tipo == 'NUMERO_FLOAT':
-            self._consumir('NUMERO_FLOAT')
-            return Numero(token)
-        if token.tipo == 'STRING':
-            self._consumir('STRING')
-            return String(token)
-        if token.tipo == 'FSTRING':
-            self._consumir('FSTRING')
-            # Extrair expressões dentro de {}
-            import re
-            expressoes_str = re.findall(r'\{(.*?)\}', token.valor)
-            expressoes_nos = []
-            # Este é um HACK. Uma solução real precisaria de um sub-parser.
-            # Aqui, apenas criamos nós de acesso a variáveis para as expressões.
-            for expr in expressoes_str:
-                # Simplificação: apenas consideramos acesso a variáveis
-                expressoes_nos.append(AcessoVar(Token('ID', expr.strip(), token.linha, token.coluna)))
-            return FString(token, expressoes_nos)
-        
-        if token.tipo == 'ID':
-            if self.tokens[self.pos + 1].tipo == 'LPAREN':
-                return self.chamada_func()
-            return self.acesso_var()
-
-        if token.tipo == 'LPAREN':
-            self._consumir('LPAREN')
-            no = self.expressao()
-            self._consumir('RPAREN')
-            return no
-        
-        if token.tipo == 'DIGITAR':
-            self._consumir('DIGITAR')
-            self._consumir('LPAREN')
-            prompt = self.expressao()
-            self._consumir('RPAREN')
-            return ChamadaDigitar(prompt)
+    def digitar(self, token):
+        self._consumir(T_LPAREN)
+        prompt = self.expressao()
+        self._consumir(T_RPAREN)
+        return ChamadaDigitar(prompt, token.linha, token.coluna)
+
+    def lista_literal(self, token):
+        elementos = []
+        if self.token_atual.tipo != T_RCOLCHETE:
+            elementos.append(self.expressao())
+            while self.token_atual.tipo == T_VIRGULA:
+                self._consumir(T_VIRGULA)
+                elementos.append(self.expressao())
+        self._consumir(T_RCOLCHETE)
+        return ListaLiteral(elementos, token.linha, token.coluna)
+
+    def acesso_indice(self, alvo):
+        token = self._consumir(T_LCOLCHETE)
+        indice = self.expressao()
+        self._consumir(T_RCOLCHETE)
+        return AcessoIndice(alvo, indice, token.linha, token.coluna)
+
+    def fstring(self, token):
+        """
+        Separa o template de uma f-string em trechos literais e expressões.
+        Cada expressão entre {} é analisada uma única vez por um sub-parser;
+        '{{' e '}}' produzem chaves literais.
+        """
+        texto = token.valor
+        segmentos = []
+        expressoes = []
+        literal = []
+        inicio = 0
+        for m in _PADRAO_FSTRING.finditer(texto):
+            literal.append(texto[inicio:m.start()])
+            inicio = m.end()
+            if m.group('EXPRESSAO') is None:
+                literal.append(m.group()[0])
+                continue
+            segmentos.append(''.join(literal))
+            literal = []
+            expressoes.append(self._expressao_fstring(token, m.start('EXPRESSAO'), m.group('EXPRESSAO')))
+        literal.append(texto[inicio:])
+        segmentos.append(''.join(literal))
+        return FString(segmentos, expressoes, token.linha, token.coluna)
+
+    def _expressao_fstring(self, token, deslocamento, codigo):
+        # Posição da expressão no arquivo: o conteúdo começa depois de 'f"', mesmo
+        # quando o 'f' é o fim de um identificador colado (ver Lexer.gerar_tokens)
+        texto = token.valor
+        quebras = texto.count('\n', 0, deslocamento)
+        if quebras:
+            linha = token.linha + quebras
+            coluna = deslocamento - texto.rindex('\n', 0, deslocamento)
+        else:
+            linha = token.linha
+            coluna = token.coluna + 2 + deslocamento
 
-        self._erro(f"Elemento de expressão inválido. Não esperava um token do tipo '{token.tipo}'.")
+        sub_parser = Parser(Lexer(codigo, self.nome_arquivo, linha, coluna).gerar_tokens(), self.nome_arquivo)
+        no = sub_parser.expressao()
+        if sub_parser.token_atual.tipo != T_EOF:
+            sub_parser._erro("Esperava '}' ao final da expressão da f-string.")
+        return no
 
     def acesso_var(self):
-        token = self._consumir('ID')
-        return AcessoVar(token)
+        token = self._consumir(T_ID)
+        return AcessoVar(token.valor, token.linha, token.coluna)
         
-    def chamada_func(self):
-        nome_func = self._consumir('ID')
-        self._consumir('LPAREN')
+    def chamada_func(self, nome_func):
+        self._consumir(T_LPAREN)
         args = []
-        if self.token_atual.tipo != 'RPAREN':
+        if self.token_atual.tipo != T_RPAREN:
             args.append(self.expressao())
-            while self.token_atual.tipo == 'VIRGULA':
-                self._consumir('VIRGULA')
+            while self.token_atual.tipo == T_VIRGULA:
+                self._consumir(T_VIRGULA)
                 args.append(self.expressao())
-        self._consumir('RPAREN')
-        return ChamadaFunc(nome_func, args)
+        self._consumir(T_RPAREN)
+        return ChamadaFunc(nome_func.valor, args, nome_func.linha, nome_func.coluna)
+
+
+# Análise de cada token que pode começar um operando: tipo do token -> método do Parser
+_PREFIXOS = {
+    T_NUMERO_INT: Parser.numero,
+    T_NUMERO_FLOAT: Parser.numero,
+    T_STRING: Parser.string,
+    T_FSTRING: Parser.fstring,
+    T_ID: Parser.identificador,
+    T_LPAREN: Parser.parenteses,
+    T_DIGITAR: Parser.digitar,
+    T_LCOLCHETE: Parser.lista_literal,
+}
@@ -0,0 +1,152 @@
+# perfilador.py
+
+from time import perf_counter
+
+from interpreter import Interpreter, Funcao, FuncaoNativa, _SEM_RETORNO
+
+# Nome do quadro raiz nas pilhas do perfil
+NOME_PROGRAMA = '<programa>'
+
+
+class Medicao:
+    """Contadores de uma função ou linha: execuções, tempo inclusivo e tempo exclusivo (s)."""
+    __slots__ = ('execucoes', 'total', 'proprio')
+
+    def __init__(self):
+        self.execucoes = 0
+        self.total = 0.0
+        self.proprio = 0.0
+
+
+class Cronometro:
+    """
+    Mede intervalos aninhados (funções ou linhas) a partir de uma pilha de entradas.
+    Em chamadas recursivas, o tempo inclusivo só é somado na ativação mais externa.
+    Com 'com_pilhas', também soma o tempo exclusivo de cada pilha completa de chaves.
+    """
+    def __init__(self, com_pilhas=False):
+        self.medicoes = {}
+        self.pilha = [] # Entradas [chave, inicio, tempo dos filhos]
+        self._ativos = {}
+        # Tempo exclusivo por pilha completa de chaves, para o formato "collapsed stacks"
+        self.com_pilhas = com_pilhas
+        self.pilhas = {}
+
+    def entrar(self, chave):
+        self._ativos[chave] = self._ativos.get(chave, 0) + 1
+        self.pilha.append([chave, perf_counter(), 0.0])
+
+    def sair(self):
+        fim = perf_counter()
+        if self.com_pilhas:
+            chaves = tuple(entrada[0] for entrada in self.pilha)
+        chave, inicio, filhos = self.pilha.pop()
+        duracao = fim - inicio
+
+        medicao = self.medicoes.get(chave)
+        if medicao is None:
+            medicao = self.medicoes[chave] = Medicao()
+        medicao.execucoes += 1
+        medicao.proprio += duracao - filhos
+        self._ativos[chave] -= 1
+        if not self._ativos[chave]:
+            medicao.total += duracao
+
+        if self.com_pilhas:
+            self.pilhas[chaves] = self.pilhas.get(chaves, 0.0) + duracao - filhos
+        if self.pilha:
+            self.pilha[-1][2] += duracao
+
+
+class InterpretadorPerfilado(Interpreter):
+    """
+    Interpreter que mede, enquanto executa, o tempo gasto em cada função Strix e em
+    cada linha do código. É usado no lugar do Interpreter apenas com --profile, então
+    a execução normal não paga nenhum custo pela medição.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Só as funções formam as pilhas exportadas (ver exportar_pilhas)
+        self.funcoes = Cronometro(com_pilhas=True)
+        self.linhas = Cronometro()
+
+    def interpret(self, arvore):
+        self.funcoes.entrar(NOME_PROGRAMA)
+        try:
+            return super().interpret(arvore)
+        finally:
+            self.funcoes.sair()
+
+    def _executar_declaracoes(self, declaracoes):
+        linhas = self.linhas
+        for declaracao in declaracoes:
+            linhas.entrar(declaracao.linha)
+            try:
+                self.executar(declaracao)
+            finally:
+                linhas.sair()
+            if self.retorno is not _SEM_RETORNO:
+                break
+
+    def executar_bloco(self, bloco, quadro):
+        quadro_anterior = self.quadro
+        self.quadro = quadro
+        try:
+            self._executar_declaracoes(bloco.declaracoes)
+        finally:
+            self.quadro = quadro_anterior
+
+    def visitar_Bloco(self, no):
+        self._executar_declaracoes(no.declaracoes)
+
+    def visitar_ChamadaFunc(self, no):
+        funcao = self._obter(no, no.nome_func)
+        if not isinstance(funcao, (Funcao, FuncaoNativa)):
+            # Deixa o Interpreter gerar o erro
+            return super().visitar_ChamadaFunc(no)
+
+        argumentos = [self.executar(arg) for arg in no.args]
+        nativa = type(funcao) is FuncaoNativa
+        self.funcoes.entrar(funcao.nome if nativa else funcao.declaracao.nome_func)
+        try:
+            if nativa:
+                return funcao.chamar(argumentos, no)
+            return funcao.chamar(self, argumentos)
+        finally:
+            self.funcoes.sair()
+
+    # --- Relatórios ---
+
+    def relatorio(self, nome_arquivo=None, limite=20):
+        """Texto com as funções e as linhas mais custosas, ordenadas pelo tempo exclusivo."""
+        saida = ["Perfil por função (tempos em ms):"]
+        saida.append(f"  {'chamadas':>10} {'inclusivo':>12} {'exclusivo':>12}  função")
+        for nome, medicao in _ordenar(self.funcoes.medicoes)[:limite]:
+            saida.append(
+                f"  {medicao.execucoes:>10} {medicao.total * 1000:>12.3f} "
+                f"{medicao.proprio * 1000:>12.3f}  {nome}"
+            )
+
+        saida.append("")
+        saida.append("Perfil por linha (tempos em ms):")
+        saida.append(f"  {'execuções':>10} {'inclusivo':>12} {'exclusivo':>12}  linha")
+        prefixo = f"{nome_arquivo}:" if nome_arquivo else "linha "
+        for linha, medicao in _ordenar(self.linhas.medicoes)[:limite]:
+            saida.append(
+                f"  {medicao.execucoes:>10} {medicao.total * 1000:>12.3f} "
+                f"{medicao.proprio * 1000:>12.3f}  {prefixo}{linha}"
+            )
+        return '\n'.join(saida)
+
+    def exportar_pilhas(self, arquivo):
+        """
+        Grava as pilhas de chamadas no formato "collapsed stacks" (uma pilha por linha,
+        funções separadas por ';' e o tempo exclusivo em microssegundos), aceito por
+        ferramentas de flamegraph.
+        """
+        for pilha, tempo in sorted(self.funcoes.pilhas.items()):
+            arquivo.write(f"{';'.join(pilha)} {round(tempo * 1_000_000)}\n")
+
+
+def _ordenar(medicoes):
+    return sorted(medicoes.items(), key=lambda item: item[1].proprio, reverse=True)
@@ -0,0 +1,173 @@
+# resolvedor.py
+
+from lexer import StrixError
+from parser_strix import (
+    Bloco, AtribuicaoVar, DeclaracaoSe, DeclaracaoFunc, DeclaracaoEnquanto, DeclaracaoPara,
+)
+
+
+class StrixResolucaoError(StrixError):
+    """Erro para nomes que não podem ser resolvidos antes da execução."""
+    def __init__(self, mensagem, origem):
+        super().__init__(f"Erro de Resolução: {mensagem}", origem.linha, origem.coluna, None)
+
+
+class Resolvedor:
+    """
+    Percorre a AST após o Parser e atribui a cada variável local um endereço
+    (profundidade, slot). Variáveis do nível superior continuam no Ambiente global.
+
+    A profundidade conta quantos quadros de função devem ser subidos a partir do
+    quadro atual; o slot é o índice no vetor de valores daquele quadro.
+    """
+    def __init__(self, globais=None):
+        self.globais = globais # Ambiente global, para nomes pré-definidos
+        self.nomes_globais = set()
+        self.escopos = [] # Um dicionário nome -> slot por função aninhada
+
+    def resolver(self, arvore):
+        if arvore is None:
+            return None
+        nomes = {}
+        self._coletar_nomes(arvore, nomes)
+        self.nomes_globais = set(nomes)
+        if self.globais is not None:
+            self.nomes_globais.update(self.globais.valores)
+        self.resolver_no(arvore)
+        arvore.resolvido = True
+        return arvore
+
+    def _coletar_nomes(self, bloco, nomes):
+        """Registra os nomes definidos diretamente em um escopo (sem entrar em funções aninhadas)."""
+        for declaracao in bloco.declaracoes:
+            if isinstance(declaracao, AtribuicaoVar):
+                nomes.setdefault(declaracao.var.nome, len(nomes))
+            elif isinstance(declaracao, DeclaracaoFunc):
+                nomes.setdefault(declaracao.nome_func, len(nomes))
+            elif isinstance(declaracao, DeclaracaoSe):
+                self._coletar_nomes(declaracao.bloco_se, nomes)
+                for _, bloco_senaose in declaracao.blocos_senaose:
+                    self._coletar_nomes(bloco_senaose, nomes)
+                if declaracao.bloco_senao:
+                    self._coletar_nomes(declaracao.bloco_senao, nomes)
+            elif isinstance(declaracao, DeclaracaoEnquanto):
+                self._coletar_nomes(declaracao.corpo, nomes)
+            elif isinstance(declaracao, DeclaracaoPara):
+                nomes.setdefault(declaracao.var.nome, len(nomes))
+                self._coletar_nomes(declaracao.corpo, nomes)
+            elif isinstance(declaracao, Bloco):
+                self._coletar_nomes(declaracao, nomes)
+
+    def _definir(self, no, nome):
+        if self.escopos:
+            no.profundidade = 0
+            no.slot = self.escopos[-1][nome]
+        else:
+            no.profundidade = None
+            no.slot = None
+
+    def _resolver_nome(self, no, nome):
+        enderecos = [
+            (profundidade, escopo[nome])
+            for profundidade, escopo in enumerate(reversed(self.escopos))
+            if nome in escopo
+        ]
+        if enderecos:
+            no.profundidade, no.slot = enderecos[0]
+            # Se o slot ainda não foi preenchido em tempo de execução, a busca
+            # continua pelos escopos externos, como fazia a cadeia de Ambientes.
+            no.alternativas = tuple(enderecos[1:])
+            return
+        if nome not in self.nomes_globais:
+            raise StrixResolucaoError(f"Variável '{nome}' não foi definida.", no)
+        no.profundidade = None
+        no.slot = None
+        no.alternativas = ()
+
+    # --- Visitantes ---
+
+    def resolver_no(self, no):
+        nome_metodo = f'resolver_{type(no).__name__}'
+        visitante = getattr(self, nome_metodo, self.resolvedor_generico)
+        visitante(no)
+
+    def resolvedor_generico(self, no):
+        # Literais e nós sem variáveis não precisam de resolução
+        pass
+
+    def resolver_Bloco(self, no):
+        for declaracao in no.declaracoes:
+            self.resolver_no(declaracao)
+
+    def resolver_AtribuicaoVar(self, no):
+        self.resolver_no(no.valor)
+        self._definir(no.var, no.var.nome)
+
+    def resolver_AcessoVar(self, no):
+        self._resolver_nome(no, no.nome)
+
+    def resolver_OperacaoBinaria(self, no):
+        self.resolver_no(no.esq)
+        self.resolver_no(no.dir)
+
+    def resolver_ListaLiteral(self, no):
+        for elemento in no.elementos:
+            self.resolver_no(elemento)
+
+    def resolver_AcessoIndice(self, no):
+        self.resolver_no(no.alvo)
+        self.resolver_no(no.indice)
+
+    def resolver_FString(self, no):
+        for expr_no in no.expressoes:
+            self.resolver_no(expr_no)
+
+    def resolver_ChamadaExibir(self, no):
+        self.resolver_no(no.no)
+
+    def resolver_ChamadaDigitar(self, no):
+        self.resolver_no(no.no_prompt)
+
+    def resolver_DeclaracaoSe(self, no):
+        self.resolver_no(no.condicao)
+        self.resolver_no(no.bloco_se)
+        for cond_senaose, bloco_senaose in no.blocos_senaose:
+            self.resolver_no(cond_senaose)
+            self.resolver_no(bloco_senaose)
+        if no.bloco_senao:
+            self.resolver_no(no.bloco_senao)
+
+    def resolver_DeclaracaoEnquanto(self, no):
+        self.resolver_no(no.condicao)
+        self.resolver_no(no.corpo)
+
+    def resolver_DeclaracaoPara(self, no):
+        self.resolver_no(no.inicio)
+        self.resolver_no(no.fim)
+        self._definir(no.var, no.var.nome)
+        self.resolver_no(no.corpo)
+
+    def resolver_DeclaracaoFunc(self, no):
+        self._definir(no, no.nome_func)
+
+        escopo = {}
+        for param_no in no.parametros:
+            escopo.setdefault(param_no.nome, len(escopo))
+            param_no.profundidade = 0
+            param_no.slot = escopo[param_no.nome]
+        self._coletar_nomes(no.corpo, escopo)
+
+        self.escopos.append(escopo)
+        try:
+            self.resolver_no(no.corpo)
+        finally:
+            self.escopos.pop()
+        no.num_slots = len(escopo)
+
+    def resolver_ChamadaFunc(self, no):
+        self._resolver_nome(no, no.nome_func)
+        for arg in no.args:
+            self.resolver_no(arg)
+
+    def resolver_DeclaracaoRetornar(self, no):
+        self.resolver_no(no.valor)
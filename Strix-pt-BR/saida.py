@@ -0,0 +1,51 @@
+# saida.py
+
+import sys
+
+# Caracteres acumulados antes de uma escrita no destino
+TAMANHO_BUFFER = 64 * 1024
+
+
+class Saida:
+    """
+    Camada de saída usada por 'exibir': acumula as linhas em memória e as escreve
+    no destino de uma só vez quando o buffer enche, antes de um 'digitar', ao final
+    da execução e em caso de erro (o Interpreter chama 'descarregar').
+
+    'destino' pode ser qualquer objeto com write(), como um io.StringIO; sem destino,
+    usa o sys.stdout do momento da escrita. Em um terminal, cada linha é escrita logo
+    (modo por linha), a menos que 'por_linha' seja informado.
+    """
+    def __init__(self, destino=None, tamanho_buffer=TAMANHO_BUFFER, por_linha=None):
+        self.destino = destino
+        if por_linha is None:
+            por_linha = eh_terminal(destino if destino is not None else sys.stdout)
+        # No modo por linha, o buffer nunca guarda mais que uma linha
+        self.tamanho_buffer = 0 if por_linha else tamanho_buffer
+        self._partes = []
+        self._tamanho = 0
+
+    def escrever(self, valor, fim='\n'):
+        """Acrescenta 'valor' seguido de 'fim', como print()."""
+        texto = str(valor) + fim
+        self._partes.append(texto)
+        self._tamanho += len(texto)
+        if self._tamanho >= self.tamanho_buffer:
+            self.descarregar()
+
+    def descarregar(self):
+        """Escreve no destino tudo o que está no buffer."""
+        destino = self.destino if self.destino is not None else sys.stdout
+        if self._partes:
+            texto = ''.join(self._partes)
+            self._partes = []
+            self._tamanho = 0
+            destino.write(texto)
+        destino.flush()
+
+
+def eh_terminal(destino):
+    try:
+        return destino.isatty()
+    except (AttributeError, ValueError):
+        return False
@@ -0,0 +1,190 @@
+# servidor.py
+
+import argparse
+import ctypes
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+
+from strix import executar
+from cliente import SOCKET_PADRAO, enviar_mensagem
+from cache_programas import MemoriaProgramas, PROGRAMAS_EM_MEMORIA
+from lote import TempoEsgotado
+
+
+class _Canal:
+    """Fluxo de texto que envia o que é escrito ao cliente, como {"saida": ...} ou {"erro": ...}."""
+    def __init__(self, tratador, tipo, terminal):
+        self.tratador = tratador
+        self.tipo = tipo
+        self.terminal = terminal
+
+    def write(self, texto):
+        if texto:
+            self.tratador.enviar({self.tipo: texto})
+        return len(texto)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        # Se a saída do cliente é um terminal, a Saida escreve cada linha logo
+        return self.terminal
+
+
+class _EntradaRemota:
+    """Origem de 'digitar' que pede ao cliente, bloco a bloco, os dados do stdin dele."""
+    def __init__(self, tratador):
+        self.tratador = tratador
+
+    def read(self, tamanho):
+        self.tratador.enviar({'ler': tamanho})
+        resposta = self.tratador.receber()
+        return resposta.get('entrada', '') if resposta else ''
+
+
+class _Alarme:
+    """
+    Interrompe a thread que o criou, levantando nela TempoEsgotado, se não for
+    desarmado em 'segundos'. Threads não recebem sinais, então a exceção é
+    entregue pelo próprio laço do Python, entre duas instruções do script.
+    """
+    def __init__(self, segundos):
+        self.thread = threading.get_ident()
+        self.trava = threading.Lock()
+        self.armado = True
+        self.temporizador = threading.Timer(segundos, self._disparar)
+        self.temporizador.daemon = True
+        self.temporizador.start()
+
+    def _disparar(self):
+        with self.trava:
+            if self.armado:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self.thread), ctypes.py_object(TempoEsgotado))
+
+    def desarmar(self):
+        # Depois de desarmado, o alarme não levanta mais nada na thread
+        with self.trava:
+            self.armado = False
+        self.temporizador.cancel()
+
+
+class _Tratador(socketserver.StreamRequestHandler):
+    """Atende um cliente: executa o script pedido em um interpretador novo e devolve o resultado."""
+
+    def handle(self):
+        try:
+            pedido = self.receber()
+            if pedido is None:
+                return
+            tempo_limite = self.server.tempo_limite
+            try:
+                alarme = _Alarme(tempo_limite) if tempo_limite else None
+                try:
+                    codigo_saida = self._executar(pedido)
+                finally:
+                    # Desarmado ainda dentro do try: se disparar antes disso, conta como tempo esgotado
+                    if alarme is not None:
+                        alarme.desarmar()
+            except TempoEsgotado:
+                self.enviar({'erro': f"Erro: tempo limite de {tempo_limite:g} s excedido.\n"})
+                codigo_saida = 1
+            self.enviar({'fim': codigo_saida if isinstance(codigo_saida, int) else 1})
+        except (OSError, ValueError):
+            # O cliente desconectou ou enviou uma mensagem inválida
+            pass
+
+    def _executar(self, pedido):
+        terminal = bool(pedido.get('terminal'))
+        return executar(
+            [str(argumento) for argumento in pedido.get('argv', ())],
+            saida=_Canal(self, 'saida', terminal),
+            erro=_Canal(self, 'erro', terminal),
+            entrada=_EntradaRemota(self),
+            diretorio=pedido.get('diretorio'),
+            programas=self.server.programas,
+            codigo=pedido.get('codigo'),
+        )
+
+    def enviar(self, mensagem):
+        enviar_mensagem(self.connection, mensagem)
+
+    def receber(self):
+        linha = self.rfile.readline()
+        return json.loads(linha) if linha else None
+
+
+class ServidorStrix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Processo residente que executa scripts Strix pedidos por 'strix --cliente', sem pagar
+    a inicialização do Python e dos módulos do interpretador a cada execução.
+
+    Cada pedido roda em sua própria thread, com um interpretador (e um Ambiente global)
+    novo; o que é compartilhado entre as execuções é só a AST já analisada de cada
+    script, guardada em uma MemoriaProgramas. Com 'tempo_limite' (s), scripts que
+    demorarem mais que isso são interrompidos e terminam com código 1.
+    """
+    daemon_threads = True
+
+    def __init__(self, caminho_socket, tamanho_memoria=PROGRAMAS_EM_MEMORIA, tempo_limite=None):
+        self.programas = MemoriaProgramas(tamanho_memoria)
+        self.tempo_limite = tempo_limite
+        # O socket só pode ser usado pelo dono: quem se conecta executa código como ele
+        umask_anterior = os.umask(0o177)
+        try:
+            super().__init__(caminho_socket, _Tratador)
+        finally:
+            os.umask(umask_anterior)
+
+
+def _socket_em_uso(caminho):
+    """Retorna True se já há um servidor ouvindo em 'caminho'; remove sockets abandonados."""
+    if not os.path.exists(caminho):
+        return False
+    teste = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        teste.connect(caminho)
+        return True
+    except ConnectionRefusedError:
+        os.unlink(caminho)
+        return False
+    finally:
+        teste.close()
+
+
+def main(argv=None):
+    analisador = argparse.ArgumentParser(
+        prog='strix --servidor',
+        description='Mantém um interpretador Strix residente, que executa os scripts pedidos por strix --cliente.',
+    )
+    analisador.add_argument('--socket', default=SOCKET_PADRAO, metavar='CAMINHO', help=f'socket Unix (padrão: {SOCKET_PADRAO})')
+    analisador.add_argument(
+        '--programas', type=int, default=PROGRAMAS_EM_MEMORIA, metavar='N',
+        help=f'número de programas analisados mantidos em memória (padrão: {PROGRAMAS_EM_MEMORIA})',
+    )
+    analisador.add_argument(
+        '--tempo-limite', type=float, metavar='SEGUNDOS',
+        help='interrompe cada script que demorar mais que isso (padrão: sem limite)',
+    )
+    argumentos = analisador.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if _socket_em_uso(argumentos.socket):
+        print(f"Erro: já há um servidor Strix ouvindo em '{argumentos.socket}'.", file=sys.stderr)
+        return 1
+
+    # Encerra com 'kill' da mesma forma que com Ctrl+C, removendo o socket
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    with ServidorStrix(argumentos.socket, argumentos.programas, argumentos.tempo_limite) as servidor:
+        print(f"Servidor Strix ouvindo em {argumentos.socket}", file=sys.stderr)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(argumentos.socket)
+    return 0
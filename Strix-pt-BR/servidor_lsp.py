@@ -0,0 +1,218 @@
+# servidor_lsp.py
+
+# Servidor de linguagem (Language Server Protocol) da Strix para editores:
+# 'strix --lsp' conversa pelo stdin/stdout em JSON-RPC. Oferece os erros de
+# sintaxe do arquivo (diagnostics), ir para a definição e a descrição de um
+# nome ao passar o mouse (hover). Cada documento aberto é um
+# DocumentoIncremental, reanalisado só em volta de cada edição.
+
+import json
+import sys
+from urllib.parse import unquote, urlparse
+
+from incremental import DocumentoIncremental
+from interpreter import VERSAO
+
+# Códigos de erro do JSON-RPC
+_METODO_DESCONHECIDO = -32601
+_ERRO_INTERNO = -32603
+
+
+def _caminho(uri):
+    # Usado como nome do arquivo nas mensagens de erro
+    partes = urlparse(uri)
+    return unquote(partes.path) if partes.scheme == 'file' else uri
+
+
+def _coluna(texto, caractere):
+    """Converte uma posição do LSP (unidades UTF-16 a partir de 0) em coluna da Strix."""
+    if texto.isascii():
+        return caractere + 1
+    unidades = 0
+    for indice, char in enumerate(texto):
+        if unidades >= caractere:
+            return indice + 1
+        unidades += 2 if ord(char) > 0xFFFF else 1
+    return len(texto) + 1
+
+
+def _ponto(linhas, posicao):
+    """Linha e coluna da Strix de uma posição do LSP, limitadas ao documento."""
+    # Como pede o protocolo, uma posição além do fim da linha vale o fim da linha;
+    # uma além da última linha vale o fim do documento
+    indice = max(posicao['line'], 0)
+    if indice >= len(linhas):
+        return len(linhas), len(linhas[-1]) + 1
+    texto = linhas[indice]
+    return indice + 1, min(_coluna(texto, max(posicao['character'], 0)), len(texto) + 1)
+
+
+def _caractere(texto, coluna):
+    """Converte uma coluna da Strix em posição do LSP (unidades UTF-16 a partir de 0)."""
+    anteriores = texto[:coluna - 1]
+    if anteriores.isascii():
+        return coluna - 1
+    return sum(2 if ord(char) > 0xFFFF else 1 for char in anteriores)
+
+
+class ServidorLSP:
+    """Atende as mensagens de um editor, uma por vez, e mantém os documentos abertos."""
+
+    def __init__(self, entrada, saida):
+        self.entrada = entrada # Fluxos binários
+        self.saida = saida
+        self.documentos = {} # uri -> DocumentoIncremental
+        self.encerrado = False # Recebeu 'shutdown'
+
+    # --- Transporte: cabeçalho Content-Length seguido do JSON ---
+
+    def receber(self):
+        tamanho = None
+        while True:
+            linha = self.entrada.readline()
+            if not linha:
+                return None
+            linha = linha.strip()
+            if not linha:
+                break
+            nome, _, valor = linha.decode('ascii').partition(':')
+            if nome.lower() == 'content-length':
+                tamanho = int(valor)
+        if tamanho is None:
+            return None
+        return json.loads(self.entrada.read(tamanho).decode('utf-8'))
+
+    def enviar(self, mensagem):
+        corpo = json.dumps(mensagem, ensure_ascii=False).encode('utf-8')
+        self.saida.write(f"Content-Length: {len(corpo)}\r\n\r\n".encode('ascii') + corpo)
+        self.saida.flush()
+
+    def notificar(self, metodo, parametros):
+        self.enviar({'jsonrpc': '2.0', 'method': metodo, 'params': parametros})
+
+    def executar(self):
+        """Atende mensagens até 'exit' ou o fim da entrada. Retorna o código de saída."""
+        while True:
+            mensagem = self.receber()
+            if mensagem is None or mensagem.get('method') == 'exit':
+                return 0 if self.encerrado else 1
+            self.atender(mensagem)
+
+    def atender(self, mensagem):
+        metodo = mensagem.get('method')
+        tratador = getattr(self, 'tratar_' + metodo.replace('/', '_').replace('$', '_'), None) if metodo else None
+        if 'id' not in mensagem:
+            # Notificação: não tem resposta
+            if tratador is not None:
+                try:
+                    tratador(mensagem.get('params') or {})
+                except Exception as erro:
+                    # Não há a quem responder: registra o erro e segue atendendo
+                    print(f"strix --lsp: erro ao tratar {metodo}: {erro!r}", file=sys.stderr)
+            return
+        resposta = {'jsonrpc': '2.0', 'id': mensagem['id']}
+        if tratador is None:
+            resposta['error'] = {'code': _METODO_DESCONHECIDO, 'message': f"Método desconhecido: {metodo}"}
+        else:
+            try:
+                resposta['result'] = tratador(mensagem.get('params') or {})
+            except Exception as erro:
+                resposta['error'] = {'code': _ERRO_INTERNO, 'message': str(erro)}
+        self.enviar(resposta)
+
+    # --- Ciclo de vida ---
+
+    def tratar_initialize(self, parametros):
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': 2}, # 2 = edições incrementais
+                'definitionProvider': True,
+                'hoverProvider': True,
+            },
+            'serverInfo': {'name': 'strix', 'version': VERSAO},
+        }
+
+    def tratar_shutdown(self, parametros):
+        self.encerrado = True
+        return None
+
+    # --- Documentos ---
+
+    def tratar_textDocument_didOpen(self, parametros):
+        item = parametros['textDocument']
+        documento = DocumentoIncremental(item['text'], _caminho(item['uri']))
+        self.documentos[item['uri']] = documento
+        self._publicar_erros(item['uri'], documento)
+
+    def tratar_textDocument_didChange(self, parametros):
+        uri = parametros['textDocument']['uri']
+        documento = self.documentos.get(uri)
+        if documento is None:
+            return
+        for mudanca in parametros['contentChanges']:
+            intervalo = mudanca.get('range')
+            if intervalo is None:
+                documento.substituir(mudanca['text'])
+                continue
+            inicio = _ponto(documento.linhas, intervalo['start'])
+            fim = _ponto(documento.linhas, intervalo['end'])
+            documento.editar(*min(inicio, fim), *max(inicio, fim), mudanca['text'])
+        self._publicar_erros(uri, documento)
+
+    def tratar_textDocument_didClose(self, parametros):
+        uri = parametros['textDocument']['uri']
+        if self.documentos.pop(uri, None) is not None:
+            self.notificar('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+
+    def _publicar_erros(self, uri, documento):
+        diagnosticos = []
+        for linha, coluna, mensagem in documento.erros():
+            texto = documento.linhas[linha - 1] if linha <= len(documento.linhas) else ''
+            caractere = _caractere(texto, coluna)
+            diagnosticos.append({
+                'range': {
+                    'start': {'line': linha - 1, 'character': caractere},
+                    'end': {'line': linha - 1, 'character': caractere + 1},
+                },
+                'severity': 1, # Erro
+                'source': 'strix',
+                'message': mensagem,
+            })
+        self.notificar('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': diagnosticos})
+
+    # --- Consultas ---
+
+    def _posicao(self, parametros):
+        """Documento, linha e coluna (da Strix) de uma consulta, ou None."""
+        documento = self.documentos.get(parametros['textDocument']['uri'])
+        posicao = parametros['position']
+        if documento is None or not 0 <= posicao['line'] < len(documento.linhas):
+            return None
+        return (documento, *_ponto(documento.linhas, posicao))
+
+    def tratar_textDocument_definition(self, parametros):
+        consulta = self._posicao(parametros)
+        if consulta is None:
+            return None
+        documento, linha, coluna = consulta
+        definicao = documento.definicao(linha, coluna)
+        if definicao is None:
+            return None
+        linha, coluna = definicao
+        caractere = _caractere(documento.linhas[linha - 1], coluna)
+        posicao = {'line': linha - 1, 'character': caractere}
+        return {'uri': parametros['textDocument']['uri'], 'range': {'start': posicao, 'end': posicao}}
+
+    def tratar_textDocument_hover(self, parametros):
+        consulta = self._posicao(parametros)
+        if consulta is None:
+            return None
+        descricao = consulta[0].descricao(consulta[1], consulta[2])
+        if descricao is None:
+            return None
+        return {'contents': {'kind': 'markdown', 'value': f"```\n{descricao}\n```"}}
+
+
+def main(argv=None):
+    """'strix --lsp': atende um editor pelo stdin/stdout até receber 'exit'."""
+    return ServidorLSP(sys.stdin.buffer, sys.stdout.buffer).executar()
@@ -1,63 +1,353 @@
 # strix.py
 
 import sys
-from lexer import Lexer
+
+if __name__ == '__main__' and sys.argv[1:2] == ['--cliente']:
+    # 'strix --cliente': o cliente do servidor não importa o lexer, o parser nem os
+    # motores, para que cada execução não pague esse custo (ver cliente.py)
+    from cliente import main as executar_cliente
+    sys.exit(executar_cliente(sys.argv[2:]))
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import tracemalloc
+from lexer import Lexer, ler_blocos
 from parser_strix import Parser
+from resolvedor import Resolvedor
 from interpreter import Interpreter, StrixError
+from memoizacao import TAMANHO_MEMO
+from otimizador import Otimizador, NIVEL_PADRAO
+from estatisticas import contar_nos, contar_tokens
+from cache_programas import CacheProgramas, DIRETORIO_PADRAO, chave_programa
+from maquina_virtual import MaquinaVirtual, PROFUNDIDADE_MAXIMA
+from perfilador import InterpretadorPerfilado
+from saida import Saida, TAMANHO_BUFFER
+from entrada import Entrada
+from cliente import main as executar_cliente
+
+MOTORES = {
+    'arvore': Interpreter,
+    'vm': MaquinaVirtual,
+}
+
+class _Analisador(argparse.ArgumentParser):
+    """ArgumentParser que escreve a ajuda e os erros em 'saida' e 'erro' em vez de sys.stdout e sys.stderr."""
+    def __init__(self, *args, saida=None, erro=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.saida = saida
+        self.erro = erro
+
+    def _print_message(self, message, file=None):
+        if file is sys.stdout and self.saida is not None:
+            file = self.saida
+        elif file is sys.stderr and self.erro is not None:
+            file = self.erro
+        super()._print_message(message, file)
+
+def _analisar_argumentos(argv, saida=None, erro=None):
+    analisador = _Analisador(
+        saida=saida,
+        erro=erro,
+        prog='strix',
+        usage=(
+            'strix [opções] <nome_do_arquivo.tx>\n       strix bench [opções]\n'
+            '       strix --servidor [opções]\n       strix --cliente [opções] <nome_do_arquivo.tx>\n'
+            '       strix --lote [opções] <diretório>... [-- opções de cada script]\n'
+            '       strix --lsp'
+        ),
+        description='Interpretador da linguagem Strix.',
+    )
+    analisador.add_argument('arquivo', help='arquivo de código fonte (.tx)')
+    analisador.add_argument(
+        '--engine', choices=sorted(MOTORES), default='arvore',
+        help="motor de execução: 'arvore' percorre a AST, 'vm' compila para bytecode (padrão: arvore)",
+    )
+    analisador.add_argument(
+        '--profundidade', type=int, default=PROFUNDIDADE_MAXIMA, metavar='N',
+        help=f'número máximo de chamadas aninhadas no motor vm (padrão: {PROFUNDIDADE_MAXIMA})',
+    )
+    analisador.add_argument(
+        '--memo', type=int, nargs='?', const=TAMANHO_MEMO, metavar='TAMANHO',
+        help=f'guarda os resultados de funções puras, até TAMANHO por função (padrão: {TAMANHO_MEMO})',
+    )
+    analisador.add_argument(
+        '--memo-relatorio', action='store_true',
+        help='com --memo, exibe os acertos e falhas do cache de cada função ao final (em stderr)',
+    )
+    analisador.add_argument(
+        '--profile', action='store_true',
+        help='mede o tempo por função e por linha e exibe o relatório ao final (em stderr; motor arvore)',
+    )
+    analisador.add_argument(
+        '--profile-saida', metavar='ARQUIVO',
+        help='com --profile, grava as pilhas de chamadas no formato "collapsed stacks" (flamegraph)',
+    )
+    analisador.add_argument(
+        '--stats', action='store_true',
+        help='exibe em stderr, em JSON, o tempo e o pico de memória de cada fase, '
+             'tokens, nós da AST, chamadas e profundidade máxima (o tracemalloc deixa a execução mais lenta)',
+    )
+    analisador.add_argument(
+        '--stats-saida', metavar='ARQUIVO',
+        help='com --stats, grava o JSON neste arquivo em vez de stderr',
+    )
+    analisador.add_argument(
+        '--buffer-saida', type=int, default=TAMANHO_BUFFER, metavar='N',
+        help=f"caracteres acumulados antes de escrever a saída de 'exibir'; 0 escreve cada linha "
+             f"(padrão: {TAMANHO_BUFFER}; em um terminal, a saída é sempre escrita por linha)",
+    )
+    analisador.add_argument(
+        '--entrada', metavar='ARQUIVO',
+        help="lê as respostas de 'digitar' deste arquivo, em blocos (o mesmo acontece se o stdin não for um terminal)",
+    )
+    analisador.add_argument(
+        '--sem-prompt', action='store_true',
+        help="não exibe o texto passado para 'digitar'",
+    )
+    analisador.add_argument(
+        '--fluxo', action='store_true',
+        help='lê o arquivo em blocos e gera os tokens sob demanda (memória constante na análise)',
+    )
+    analisador.add_argument(
+        '-O', dest='otimizacao', type=int, choices=(0, 1), default=NIVEL_PADRAO, metavar='NIVEL',
+        help='nível de otimização da AST: -O0 desliga, -O1 dobra constantes e remove código morto (padrão: 1)',
+    )
+    analisador.add_argument(
+        '--sem-cache', action='store_true',
+        help='não lê nem grava o cache de programas analisados (.txc)',
+    )
+    analisador.add_argument(
+        '--dir-cache', metavar='DIR',
+        help=f"diretório do cache .txc (padrão: {DIRETORIO_PADRAO} ao lado de cada script)",
+    )
+    argumentos = analisador.parse_args(argv)
+    if argumentos.profile and argumentos.engine != 'arvore':
+        analisador.error("--profile só está disponível com --engine=arvore")
+    return argumentos
+
+def _criar_interpretador(argumentos, saida=None, origem_entrada=None):
+    opcoes = {
+        'saida': Saida(saida, tamanho_buffer=argumentos.buffer_saida),
+        'entrada': Entrada(origem_entrada, exibir_prompt=not argumentos.sem_prompt),
+    }
+    if argumentos.memo is not None:
+        opcoes.update(memoizar=True, tamanho_memo=argumentos.memo)
+    if argumentos.engine == 'vm':
+        return MaquinaVirtual(argumentos.profundidade, **opcoes)
+    if argumentos.profile:
+        return InterpretadorPerfilado(**opcoes)
+    return MOTORES[argumentos.engine](**opcoes)
+
+def _exibir_relatorio_memo(interpretador, erro):
+    for nome, dados in sorted(interpretador.estatisticas_memo().items()):
+        print(
+            f"memo {nome}: {dados['acertos']} acertos, {dados['falhas']} falhas, "
+            f"{dados['tamanho']} resultados guardados",
+            file=erro,
+        )
+
+def _exibir_perfil(interpretador, argumentos, erro, caminho):
+    print(interpretador.relatorio(argumentos.arquivo), file=erro)
+    if argumentos.profile_saida:
+        with open(caminho(argumentos.profile_saida), 'w', encoding='utf-8') as saida:
+            interpretador.exportar_pilhas(saida)
 
-def main():
+def _exibir_estatisticas(interpretador, argumentos, erro, caminho):
+    dados = interpretador.estatisticas.como_json()
+    if argumentos.stats_saida:
+        with open(caminho(argumentos.stats_saida), 'w', encoding='utf-8') as saida:
+            saida.write(dados + '\n')
+    else:
+        print(dados, file=erro)
+
+def _analisar_codigo(codigo, caminho_arquivo, estatisticas):
+    # Lexer e Parser guardam os erros de sintaxe na mesma lista e os relatam
+    # todos juntos ao final da análise
+    erros = []
+
+    # 1. Lexer: Transforma o código em uma lista de tokens
+    with estatisticas.fase('lexer'):
+        tokens = Lexer(codigo, caminho_arquivo, erros=erros).tokenize()
+    estatisticas.tokens = len(tokens)
+
+    # 2. Parser: Constrói uma Árvore de Sintaxe Abstrata (AST) a partir dos tokens
+    with estatisticas.fase('parser'):
+        parser = Parser(tokens, caminho_arquivo, erros)
+        return parser.parse()
+
+def _analisar_fluxo(arquivo, caminho_arquivo, estatisticas, contar=False):
+    # 1 e 2. Lexer e Parser em fluxo: o arquivo é lido em blocos e cada
+    # token é gerado apenas quando o Parser precisa dele
+    with estatisticas.fase('lexer+parser'):
+        erros = []
+        lexer = Lexer.de_blocos(_blocos_do_arquivo(arquivo), caminho_arquivo, erros)
+        tokens = lexer.gerar_tokens()
+        if contar:
+            tokens = contar_tokens(tokens, estatisticas)
+        parser = Parser(tokens, caminho_arquivo, erros)
+        return parser.parse()
+
+def _blocos_do_arquivo(arquivo):
+    # Adiciona uma nova linha no final, como no modo de leitura completa
+    return itertools.chain(ler_blocos(arquivo), ('\n',))
+
+def executar(argv, saida=None, erro=None, entrada=None, diretorio=None, programas=None, codigo=None):
     """
-    Ponto de entrada principal para o interpretador Strix.
-    Executa o processo: Leitura -> Lexer -> Parser -> Interpreter.
+    Executa um script com as opções de linha de comando em 'argv' e retorna o código de saída.
+    Executa o processo: Leitura -> Lexer -> Parser -> Resolvedor -> Otimizador -> Interpreter.
+    A AST resolvida é guardada em cache (.txc) e reaproveitada enquanto o código não mudar.
+
+    Os demais parâmetros permitem rodar vários scripts no mesmo processo (ver servidor.py):
+    'saida' e 'erro' substituem sys.stdout e sys.stderr, 'entrada' é a origem de 'digitar'
+    quando não há --entrada, 'diretorio' é a base dos caminhos relativos, 'programas' é uma
+    MemoriaProgramas e 'codigo' é o código do script, que então não é lido do arquivo.
     """
-    if len(sys.argv) != 2:
-        print("Uso: strix <nome_do_arquivo.tx>")
-        sys.exit(1)
+    erro = erro if erro is not None else sys.stderr
+    try:
+        argumentos = _analisar_argumentos(argv, saida, erro)
+    except SystemExit as e:
+        return e.code
+
+    def caminho(nome):
+        return os.path.join(diretorio, nome) if diretorio and nome else nome
 
-    caminho_arquivo = sys.argv[1]
+    caminho_arquivo = argumentos.arquivo
     if not caminho_arquivo.endswith('.tx'):
-        print("Erro: O arquivo de código fonte deve ter a extensão '.tx'")
-        sys.exit(1)
+        print("Erro: O arquivo de código fonte deve ter a extensão '.tx'", file=saida)
+        return 1
 
-    try:
-        with open(caminho_arquivo, 'r', encoding='utf-8') as f:
-            codigo = f.read()
-    except FileNotFoundError:
-        print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado.")
-        sys.exit(1)
-
-    if not codigo.strip():
-        # Arquivo vazio, não faz nada
-        return
-
-    # Adiciona uma nova linha no final para garantir que o último token seja processado
-    codigo += '\n'
-    
-    try:
-        # 1. Lexer: Transforma o código em uma lista de tokens
-        lexer = Lexer(codigo, caminho_arquivo)
-        tokens = lexer.tokenize()
-
-        # 2. Parser: Constrói uma Árvore de Sintaxe Abstrata (AST) a partir dos tokens
-        parser = Parser(tokens)
-        arvore = parser.parse()
-        
-        # Se a árvore for nula (código com apenas comentários/espaços), não executa
-        if arvore is None:
-            return
-
-        # 3. Interpreter: Executa as instruções da AST
-        interpretador = Interpreter()
-        interpretador.interpret(arvore)
-
-    except StrixError as e:
-        # Captura erros personalizados da linguagem e os exibe
-        print(e, file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        # Captura outros erros inesperados do Python
-        print(f"Erro inesperado no interpretador: {e}", file=sys.stderr)
-        sys.exit(1)
+    if argumentos.sem_cache:
+        cache = programas = None
+    else:
+        # Código recebido diretamente não tem um diretório onde guardar o .txc
+        cache = CacheProgramas(caminho(argumentos.dir_cache)) if codigo is None else None
+
+    # O script e o arquivo de --entrada são fechados ao final, em qualquer caso
+    with contextlib.ExitStack() as arquivos:
+        if codigo is not None:
+            arquivo = io.StringIO(codigo)
+        else:
+            try:
+                arquivo = arquivos.enter_context(open(caminho(caminho_arquivo), 'r', encoding='utf-8'))
+            except FileNotFoundError:
+                print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado.", file=saida)
+                return 1
+
+        if argumentos.entrada:
+            try:
+                entrada = arquivos.enter_context(open(caminho(argumentos.entrada), 'r', encoding='utf-8'))
+            except FileNotFoundError:
+                print(f"Erro: Arquivo de entrada '{argumentos.entrada}' não encontrado.", file=saida)
+                return 1
+
+        rastreando = argumentos.stats and not tracemalloc.is_tracing()
+        if rastreando:
+            tracemalloc.start()
+
+        interpretador = None
+        try:
+            interpretador = _criar_interpretador(argumentos, saida, entrada)
+            estatisticas = interpretador.estatisticas
+
+            with estatisticas.fase('leitura'):
+                if argumentos.fluxo:
+                    # A chave do cache é calculada lendo o arquivo em blocos, sem carregá-lo inteiro
+                    chave = chave_programa(_blocos_do_arquivo(arquivo), argumentos.otimizacao) if cache or programas else None
+                    arquivo.seek(0)
+                else:
+                    codigo = arquivo.read()
+                    # Adiciona uma nova linha no final para garantir que o último token seja processado
+                    codigo += '\n'
+                    chave = chave_programa((codigo,), argumentos.otimizacao) if cache or programas else None
+
+            if not argumentos.fluxo and not codigo.strip():
+                # Arquivo vazio, não faz nada
+                return 0
+
+            arvore = None
+            if programas:
+                arvore = programas.carregar(caminho(caminho_arquivo), chave)
+            if cache and arvore is None:
+                with estatisticas.fase('cache'):
+                    arvore = cache.carregar(caminho(caminho_arquivo), chave)
+                if arvore is not None and programas:
+                    programas.salvar(caminho(caminho_arquivo), chave, arvore)
+
+            if arvore is None:
+                if argumentos.fluxo:
+                    arvore = _analisar_fluxo(arquivo, caminho_arquivo, estatisticas, argumentos.stats)
+                else:
+                    arvore = _analisar_codigo(codigo, caminho_arquivo, estatisticas)
+
+                # Se a árvore for nula (código com apenas comentários/espaços), não executa
+                if arvore is None:
+                    return 0
+
+                # 3. Resolvedor: Atribui endereços às variáveis antes de guardar a árvore
+                with estatisticas.fase('resolvedor'):
+                    Resolvedor(interpretador.globais).resolver(arvore)
+
+                # 4. Otimizador: Dobra constantes e remove código morto (-O1)
+                with estatisticas.fase('otimizador'):
+                    Otimizador(argumentos.otimizacao).otimizar(arvore)
+                if cache:
+                    with estatisticas.fase('cache'):
+                        cache.salvar(caminho(caminho_arquivo), chave, arvore)
+                if programas:
+                    programas.salvar(caminho(caminho_arquivo), chave, arvore)
+
+            if argumentos.stats:
+                estatisticas.nos = contar_nos(arvore)
+
+            # 5. Interpreter: Executa as instruções da AST (ou o bytecode, com --engine=vm)
+            try:
+                interpretador.interpret(arvore)
+            finally:
+                if argumentos.memo_relatorio:
+                    _exibir_relatorio_memo(interpretador, erro)
+                if argumentos.profile:
+                    _exibir_perfil(interpretador, argumentos, erro, caminho)
+
+        except StrixError as e:
+            # Captura erros personalizados da linguagem e os exibe
+            print(e, file=erro)
+            return 1
+        except Exception as e:
+            # Captura outros erros inesperados do Python
+            print(f"Erro inesperado no interpretador: {e}", file=erro)
+            return 1
+        finally:
+            if argumentos.stats and interpretador is not None:
+                _exibir_estatisticas(interpretador, argumentos, erro, caminho)
+            if rastreando:
+                tracemalloc.stop()
+        return 0
+
+def main(argv=None):
+    """Ponto de entrada principal para o interpretador Strix."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['bench']:
+        # 'strix bench [opções]': suíte de benchmarks (ver benchmarks/)
+        from benchmarks.executor import main as executar_benchmarks
+        sys.exit(executar_benchmarks(argv[1:]))
+    if argv[:1] == ['--servidor']:
+        # 'strix --servidor [opções]': processo residente que executa scripts (ver servidor.py)
+        from servidor import main as executar_servidor
+        sys.exit(executar_servidor(argv[1:]))
+    if argv[:1] == ['--lote']:
+        # 'strix --lote dir/ -j N': executa muitos scripts em paralelo (ver lote.py)
+        from lote import main as executar_lote
+        sys.exit(executar_lote(argv[1:]))
+    if argv[:1] == ['--lsp']:
+        # 'strix --lsp': servidor de linguagem para editores, pelo stdin/stdout (ver servidor_lsp.py)
+        from servidor_lsp import main as executar_lsp
+        sys.exit(executar_lsp(argv[1:]))
+    if argv[:1] == ['--cliente']:
+        sys.exit(executar_cliente(argv[1:]))
+    sys.exit(executar(argv))
 
 if __name__ == '__main__':
     main()
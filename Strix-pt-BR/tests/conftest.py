@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Os módulos da Strix ficam soltos na pasta acima desta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,82 @@
+# tests/test_cache_programas.py
+
+import io
+import os
+import types
+
+import cache_programas
+import strix
+from cache_programas import CacheProgramas, chave_programa
+from lexer import Lexer
+from parser_strix import Parser
+
+
+def test_chave_muda_com_o_codigo_dos_modulos(tmp_path, monkeypatch):
+    fonte = tmp_path / 'modulo.py'
+    fonte.write_text('x = 1\n', encoding='utf-8')
+    monkeypatch.setattr(cache_programas, 'MODULOS_DA_ARVORE', (types.SimpleNamespace(__file__=str(fonte)),))
+
+    monkeypatch.setattr(cache_programas, '_versao_arvore', None)
+    antes = chave_programa(('exibir(1)\n',), 1)
+    assert chave_programa(('exibir(1)\n',), 1) == antes
+
+    fonte.write_text('x = 2\n', encoding='utf-8')
+    monkeypatch.setattr(cache_programas, '_versao_arvore', None)
+    assert chave_programa(('exibir(1)\n',), 1) != antes
+
+
+def _rodar(caminho, *opcoes):
+    saida = io.StringIO()
+    erro = io.StringIO()
+    codigo_saida = strix.executar(list(opcoes) + [str(caminho)], saida, erro, entrada=io.StringIO())
+    return codigo_saida, saida.getvalue(), erro.getvalue()
+
+
+def test_arvore_do_txc_roda_igual_a_analisada(tmp_path, monkeypatch):
+    analises = []
+    analisar_codigo = strix._analisar_codigo
+
+    def contar_analise(*argumentos):
+        analises.append(argumentos)
+        return analisar_codigo(*argumentos)
+
+    monkeypatch.setattr(strix, '_analisar_codigo', contar_analise)
+    script = tmp_path / 'p.tx'
+    script.write_text(
+        'func fib(n): se n < 2: retornar n senao: retornar fib(n - 1) + fib(n - 2)\n'
+        'x = [fib(10), 2.5, "a"]\nexibir(f"{x} {fib(x[0] - 50)}")\n',
+        encoding='utf-8',
+    )
+    esperado = _rodar(script)
+    assert esperado == (0, "[55, 2.5, 'a'] 5\n", '')
+    assert os.path.exists(CacheProgramas().caminho_para(str(script)))
+    assert len(analises) == 1
+
+    # Com o .txc válido, os dois motores rodam a árvore guardada sem analisar o código
+    assert _rodar(script) == esperado
+    assert _rodar(script, '--engine', 'vm') == esperado
+    assert len(analises) == 1
+
+    # Outro nível de otimização ou outro código não usam o .txc anterior
+    assert _rodar(script, '-O0') == esperado
+    assert len(analises) == 2
+    script.write_text('exibir(1 + 1)\n', encoding='utf-8')
+    assert _rodar(script) == (0, '2\n', '')
+    assert len(analises) == 3
+
+
+def test_txc_invalido_e_ignorado(tmp_path):
+    cache = CacheProgramas(str(tmp_path / 'cache'))
+    fonte = str(tmp_path / 'p.tx')
+    chave = chave_programa(('exibir(1)\n',), 1)
+    arvore = Parser(Lexer('exibir(1)\n', 'p.tx').tokenize()).parse()
+    assert cache.salvar(fonte, chave, arvore)
+    assert type(cache.carregar(fonte, chave)) is type(arvore)
+    assert cache.carregar(fonte, chave_programa(('exibir(2)\n',), 1)) is None
+
+    caminho = cache.caminho_para(fonte)
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    with open(caminho, 'wb') as f:
+        f.write(dados[:len(dados) // 2])
+    assert cache.carregar(fonte, chave) is None
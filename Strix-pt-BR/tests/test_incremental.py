@@ -0,0 +1,185 @@
+# tests/test_incremental.py
+
+import random
+import time
+from operator import itemgetter
+
+import pytest
+
+from incremental import DocumentoIncremental
+from lexer import Lexer, StrixErrosSintaxe, primeiro_por_linha
+from parser_strix import AST, Parser
+
+# Tempo máximo de uma edição num documento grande: a reanálise fica em volta dela
+LIMITE_EDICAO = 0.025
+
+
+def erros_completos(texto):
+    """Erros da análise do arquivo inteiro, no formato de DocumentoIncremental.erros."""
+    erros = []
+    try:
+        Parser(Lexer(texto, 't.tx', erros=erros).tokenize(), 't.tx', erros).parse()
+    except StrixErrosSintaxe:
+        pass
+    return primeiro_por_linha([(erro.linha, erro.coluna, erro.mensagem) for erro in erros], itemgetter(0, 1))
+
+
+def despejar(no, deslocamento=0):
+    """A árvore de 'no' como tuplas comparáveis, com as linhas somadas a 'deslocamento'."""
+    if isinstance(no, (list, tuple)):
+        return tuple(despejar(item, deslocamento) for item in no)
+    if not isinstance(no, AST):
+        return no
+    campos = [type(no).__name__]
+    for classe in type(no).__mro__:
+        for nome in getattr(classe, '__slots__', ()):
+            valor = getattr(no, nome, None)
+            if nome == 'linha' and valor is not None:
+                valor += deslocamento
+            elif nome == 'resolvido':
+                continue
+            campos.append(despejar(valor, deslocamento))
+    return tuple(campos)
+
+
+def despejar_documento(documento):
+    return tuple(
+        declaracao
+        for trecho in documento.trechos()
+        for declaracao in despejar(trecho.declaracoes, trecho.deslocamento)
+    )
+
+
+def programa_grande(funcoes=3000):
+    linhas = []
+    for i in range(funcoes):
+        linhas.append(f"func f{i}(a, b): {{")
+        linhas.extend(f"    v{j} = a * {j} + b" for j in range(7))
+        linhas.append("    retornar v3")
+        linhas.append("}")
+    return '\n'.join(linhas) + '\n'
+
+
+@pytest.fixture(scope='module')
+def documento_grande():
+    return DocumentoIncremental(programa_grande(), 't.tx')
+
+
+def cronometrar(funcao):
+    # O menor de alguns tempos, para não medir pausas da máquina
+    tempos = []
+    for _ in range(3):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+@pytest.mark.parametrize('texto', ['"', '{', 'se x > 1: {', 'x = {', '}'])
+def test_edicao_que_abre_ou_fecha_no_topo_e_rapida(documento_grande, texto):
+    documento = documento_grande
+    original = documento.texto
+    fim = 5 + len(texto)
+
+    def abrir():
+        documento.editar(3, 5, 3, 5, texto)
+        documento.erros()
+        documento.editar(3, 5, 3, fim, '')
+        documento.erros()
+
+    assert cronometrar(abrir) < 2 * LIMITE_EDICAO
+
+    documento.editar(3, 5, 3, 5, texto)
+    try:
+        assert documento.erros() == erros_completos(documento.texto)
+    finally:
+        documento.editar(3, 5, 3, fim, '')
+    assert documento.texto == original
+    assert documento.erros() == []
+
+
+def test_digitar_dentro_de_bloco_aberto_e_rapido(documento_grande):
+    documento = documento_grande
+    linha, coluna = 3, 1
+    tempos = []
+    for caractere in 'se x > 1: {\n    y = "abc" + f(x)\n':
+        inicio = time.perf_counter()
+        documento.editar(linha, coluna, linha, coluna, caractere)
+        documento.erros()
+        tempos.append(time.perf_counter() - inicio)
+        if caractere == '\n':
+            linha, coluna = linha + 1, 1
+        else:
+            coluna += 1
+    assert documento.erros() == erros_completos(documento.texto)
+    documento.editar(3, 1, linha, coluna, '')
+    assert documento.erros() == []
+    tempos.sort()
+    assert tempos[len(tempos) // 2] < LIMITE_EDICAO
+
+
+def test_erro_no_eof_fica_na_ultima_linha():
+    for texto in ('x = (', 'x = (\n', 'se x: {\n  y = 1', 's = "abc\nt = 1'):
+        documento = DocumentoIncremental(texto, 't.tx')
+        assert documento.erros() == erros_completos(texto)
+        assert documento.erros()[-1][0] == len(documento.linhas)
+
+
+def test_fechar_bloco_aberto_longe_reanalisa_o_meio():
+    texto = programa_grande(20)
+    documento = DocumentoIncremental(texto, 't.tx')
+    documento.editar(3, 1, 3, 1, 'se x: {\n')
+    documento.editar(100, 1, 100, 1, '}\n')
+    assert documento.erros() == erros_completos(documento.texto)
+    documento.editar(100, 1, 101, 1, '')
+    documento.editar(3, 1, 4, 1, '')
+    assert documento.texto == texto
+    assert documento.erros() == []
+
+
+def test_aspa_em_trecho_em_espera_fecha_a_string():
+    texto = programa_grande(20)
+    documento = DocumentoIncremental(texto, 't.tx')
+    documento.editar(1, 1, 1, 1, 'y = "')
+    assert documento.erros() == erros_completos(documento.texto)
+    # 'func f18' fica dentro da string até a aspa que a fecha
+    assert documento.definicao(181, 6) is None
+    documento.editar(141, 1, 141, 1, '"\n')
+    assert documento.erros() == erros_completos(documento.texto) == []
+    assert documento.definicao(182, 6) == (182, 6)
+
+
+# Linhas das quais são montados os documentos e as edições: declarações, blocos
+# e strings abertos e fechados, erros de sintaxe e linhas vazias
+LINHAS = [
+    'x = 1', 'y = x + 2 * 3', 'exibir(y)', 'func f(a, b): {', '    c = a + b', '    retornar c', '}',
+    'se x > 1: exibir("a")', 'senao: exibir("b")', 'para i de 1 ate 3: {', 'enquanto x < 3: x = x + 1',
+    '+ 4', 'z = [1, 2,', '3]', 's = "abc', 'def"', 'x = $ 2', ')', '{', 'f(1, 2)', '# comentario', '',
+    'v = f"{x + 1} e {y}"', 'func g(n): retornar n * 2', 'x = (', 'exibir(g(3)) exibir(4)',
+]
+TRECHOS_EDITADOS = ['', '+', '(', ')', '"', '{', '}', 'x', ' ', '\n', ':', '1']
+
+
+@pytest.mark.parametrize('semente', range(4))
+def test_edicoes_dao_a_mesma_analise_que_o_arquivo_inteiro(semente):
+    sorteio = random.Random(semente)
+
+    def posicao(documento):
+        linha = sorteio.randrange(len(documento.linhas))
+        return linha + 1, sorteio.randrange(len(documento.linhas[linha]) + 1) + 1
+
+    for _ in range(15):
+        documento = DocumentoIncremental('\n'.join(sorteio.choices(LINHAS, k=sorteio.randrange(1, 40))), 't.tx')
+        for _ in range(20):
+            inicio, fim = sorted([posicao(documento), posicao(documento)])
+            if sorteio.random() < 0.5:
+                texto = '\n'.join(sorteio.choices(LINHAS, k=sorteio.randrange(0, 4)))
+            else:
+                texto = sorteio.choice(TRECHOS_EDITADOS)
+            documento.editar(*inicio, *fim, texto)
+
+            assert documento.erros() == erros_completos(documento.texto)
+            assert despejar_documento(documento) == despejar_documento(DocumentoIncremental(documento.texto, 't.tx'))
+            if not documento.erros():
+                arvore = Parser(Lexer(documento.texto + '\n', 't.tx').tokenize()).parse()
+                assert despejar_documento(documento) == despejar(arvore.declaracoes if arvore else [])
@@ -0,0 +1,44 @@
+# tests/test_lexer.py
+
+import random
+
+import pytest
+
+from benchmarks.corpus import CORPUS
+from lexer import Lexer, StrixSintaxeError
+
+# Pedaços dos quais são sorteados os códigos: tokens, quebras, strings de várias
+# linhas, aspas sem par e caracteres inválidos, para que os cortes entre blocos
+# caiam em qualquer lugar
+PEDACOS = list('abfxz_09 .\n\t#"\'+-*/(){}:,=!<>é@$;٣\r') + [
+    'se ', 'func ', 'f"', "f'", '1.5', '==', '!=', 'abf"', 'exibir', '"x\ny"', '\n   ', 'ação', 'f"{x + 1}"',
+]
+
+
+def tokens(lexer, erros):
+    try:
+        resultado = [(t.tipo, t.valor, t.linha, t.coluna) for t in lexer.tokenize()]
+    except StrixSintaxeError as erro:
+        resultado = ('erro', erro.mensagem, erro.linha, erro.coluna)
+    return resultado, [(e.mensagem, e.linha, e.coluna) for e in erros or ()]
+
+
+def comparar(codigo, tamanho_bloco, recuperar, linha=1):
+    blocos = [codigo[i:i + tamanho_bloco] for i in range(0, len(codigo), tamanho_bloco)]
+    erros_inteiro = [] if recuperar else None
+    erros_blocos = [] if recuperar else None
+    inteiro = tokens(Lexer(codigo, 't.tx', linha, erros=erros_inteiro), erros_inteiro)
+    assert tokens(Lexer.de_blocos(blocos, 't.tx', erros_blocos, linha), erros_blocos) == inteiro
+
+
+@pytest.mark.parametrize('semente', range(5))
+def test_lexer_em_blocos_da_os_mesmos_tokens_que_o_codigo_inteiro(semente):
+    sorteio = random.Random(semente)
+    for _ in range(300):
+        codigo = ''.join(sorteio.choice(PEDACOS) for _ in range(sorteio.randint(0, 60)))
+        comparar(codigo, sorteio.choice([1, 2, 3, 8, 20]), sorteio.random() < 0.5, sorteio.choice([1, 7]))
+
+
+@pytest.mark.parametrize('programa', CORPUS, ids=lambda p: p.nome)
+def test_lexer_em_blocos_no_corpus(programa):
+    comparar(programa.gerar(1), 4096, False)
@@ -0,0 +1,37 @@
+# tests/test_lote.py
+
+from lote import executar_lote, executar_script, main
+
+INFINITO = 'exibir("antes")\nenquanto 1 == 1: {\n    x = 1\n}\n'
+
+
+def scripts(diretorio):
+    (diretorio / 'a_ok.tx').write_text('exibir(1 + 1)\n', encoding='utf-8')
+    (diretorio / 'b_infinito.tx').write_text(INFINITO, encoding='utf-8')
+    (diretorio / 'c_erro.tx').write_text('exibir(1 / 0)\n', encoding='utf-8')
+    return [str(diretorio / nome) for nome in ('a_ok.tx', 'b_infinito.tx', 'c_erro.tx')]
+
+
+def test_script_que_passa_do_tempo_limite_e_interrompido(tmp_path):
+    ok, infinito, erro = scripts(tmp_path)
+    for opcoes in ([], ['--engine', 'vm']):
+        resultado = executar_script(infinito, opcoes, tempo_limite=0.3)
+        assert resultado.esgotado and not resultado.ok
+        assert resultado.codigo_saida == 1
+        assert resultado.tempo < 5
+
+    # Sem estourar o tempo, o alarme não afeta o script nem o processo
+    resultado = executar_script(ok, tempo_limite=5)
+    assert resultado.ok and resultado.saida == '2\n'
+
+
+def test_lote_separa_tempo_esgotado_dos_erros(tmp_path, capsys):
+    caminhos = scripts(tmp_path)
+    resultados = list(executar_lote(caminhos, ['--sem-cache'], processos=2, tempo_limite=0.3))
+    assert [resultado.caminho for resultado in resultados] == caminhos
+    assert [(resultado.ok, resultado.esgotado) for resultado in resultados] == [(True, False), (False, True), (False, False)]
+
+    assert main([str(tmp_path), '-j', '2', '-q', '--tempo-limite', '0.3', '--', '--engine', 'vm']) == 1
+    resumo = capsys.readouterr().out
+    assert 'Resumo: 3 scripts, 1 ok, 1 com erro, 1 com tempo esgotado' in resumo
+    assert f'{caminhos[1]}: tempo limite de 0.3 s excedido' in resumo
@@ -0,0 +1,31 @@
+# tests/test_maquina_virtual.py
+
+import io
+
+import pytest
+
+from compilador import Compilador
+from interpreter import StrixRuntimeError
+from lexer import Lexer
+from maquina_virtual import MaquinaVirtual
+from parser_strix import Parser
+from resolvedor import Resolvedor
+from saida import Saida
+
+
+def test_chamada_que_perde_e_recupera_a_funcao_reaproveita_o_cache():
+    # O mesmo código compilado roda de novo com o nome ora função, ora número
+    arvore = Parser(Lexer('exibir(h("abc"))\n', 't.tx').tokenize()).parse()
+    codigo = None
+    for volta in range(20):
+        maquina = MaquinaVirtual(saida=Saida(io.StringIO()))
+        maquina.globais.definir('h', maquina.globais.obter('tamanho', None) if volta % 2 == 0 else 5)
+        if codigo is None:
+            Resolvedor(maquina.globais).resolver(arvore)
+            codigo = Compilador().compilar(arvore)
+        if volta % 2 == 0:
+            maquina.executar_codigo(codigo)
+        else:
+            with pytest.raises(StrixRuntimeError):
+                maquina.executar_codigo(codigo)
+    assert len(codigo.caches) == 1
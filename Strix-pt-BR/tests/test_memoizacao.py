@@ -0,0 +1,76 @@
+# tests/test_memoizacao.py
+
+import io
+
+import pytest
+
+from interpreter import Interpreter
+from lexer import Lexer
+from memoizacao import AnalisadorPureza
+from parser_strix import DeclaracaoFunc, Parser
+from resolvedor import Resolvedor
+from strix import executar
+
+PROGRAMA = '''
+func fib(n): se n < 2: retornar n senao: retornar fib(n - 1) + fib(n - 2)
+func hip(a, b): retornar raiz(a * a + b * b)
+func usa_fib(n): retornar fib(n) + hip(3, 4)
+func local(n): {
+    t = 0
+    para i de 1 ate n: t = t + i
+    retornar t
+}
+func mostra(x): exibir(x)
+func usa_mostra(x): retornar mostra(x)
+func le(x): retornar digitar(x)
+k = 10
+func com_global(x): retornar x + k
+func fabrica(k): func interna(v): retornar v * k
+func duas_vezes(x): retornar x
+func duas_vezes(x): retornar x * 2
+func tamanho(x): {
+    exibir(x)
+    retornar 0
+}
+func usa_tamanho(x): retornar tamanho(x)
+'''
+
+PURAS = {'fib', 'hip', 'usa_fib', 'local'}
+
+
+def funcoes_puras(codigo):
+    interpretador = Interpreter()
+    arvore = Parser(Lexer(codigo, 't.tx').tokenize()).parse()
+    Resolvedor(interpretador.globais).resolver(arvore)
+    AnalisadorPureza(interpretador.globais.nativas_puras()).analisar(arvore)
+    return {
+        declaracao.nome_func for declaracao in arvore.declaracoes
+        if isinstance(declaracao, DeclaracaoFunc) and declaracao.pura
+    }
+
+
+def test_so_funcoes_sem_efeitos_colaterais_sao_puras():
+    assert funcoes_puras(PROGRAMA) == PURAS
+
+
+def rodar(codigo, *opcoes):
+    saida = io.StringIO()
+    erro = io.StringIO()
+    codigo_saida = executar(list(opcoes) + ['t.tx'], saida, erro, entrada=io.StringIO('a\nb\n'), codigo=codigo)
+    return codigo_saida, saida.getvalue(), erro.getvalue()
+
+
+@pytest.mark.parametrize('engine', ['arvore', 'vm'])
+def test_memo_nao_muda_o_resultado(engine):
+    codigo = PROGRAMA + (
+        'exibir(usa_fib(20))\nexibir(fib(1.0))\nexibir(fib(1 == 1))\nexibir(local(4))\nexibir(local(4))\n'
+        'usa_mostra(5)\nusa_mostra(5)\nexibir(le(1))\nexibir(le(1))\n'
+        'exibir(com_global(1))\nk = 20\nexibir(com_global(1))\n'
+        'exibir(duas_vezes(3))\nexibir(usa_tamanho("abc"))\n'
+    )
+    esperado = rodar(codigo, '--engine', engine)
+    assert esperado[0] == 0
+    assert rodar(codigo, '--memo', '--engine', engine) == esperado
+
+    relatorio = rodar(codigo, '--memo', '--memo-relatorio', '--engine', engine)[2]
+    assert sorted(linha.split(':')[0] for linha in relatorio.splitlines()) == sorted(f'memo {nome}' for nome in PURAS)
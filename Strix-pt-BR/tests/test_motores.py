@@ -0,0 +1,78 @@
+# tests/test_motores.py
+
+import io
+
+import pytest
+
+from benchmarks.corpus import CORPUS
+from strix import executar
+
+# Programas pequenos que exercitam cada parte da linguagem, inclusive os erros de
+# execução: os dois motores precisam dar a mesma saída e apontar a mesma linha
+PROGRAMAS = {
+    'aritmetica': (
+        'x = 10\ny = 3.5\nexibir(x + y)\nexibir(x / 4)\nexibir(x * 2 - 1)\n'
+        'exibir("n=" + x)\nexibir(x == 10)\nexibir(x != 10)\nexibir(x <= 10)\nexibir(x > 1)\n'
+    ),
+    'condicionais': (
+        'x = 10\n'
+        'se x > 100: exibir("grande") senaose x > 5: exibir("medio") senao: exibir("pequeno")\n'
+        'se "": exibir("vazia verdadeira")\n'
+        'se 0: exibir("zero") senao: exibir("zero falso")\n'
+    ),
+    'funcoes': (
+        'func soma(a, b): retornar a + b\nexibir(soma(2, 3))\n'
+        'func nada(): x = 5\nexibir(nada())\n'
+        'func somador(a): func add(b): retornar a + b\n'
+        'base = 100\nfunc usa(v): retornar v + base\nexibir(usa(1))\nbase = 200\nexibir(usa(1))\n'
+        'func rec(n): se n == 0: retornar 0 senao: retornar n + rec(n - 1)\nexibir(rec(50))\n'
+    ),
+    'lacos': (
+        's = 0\npara i de 1 ate 10: s = s + i\nexibir(s)\nexibir(i)\n'
+        'n = 0\nenquanto n < 5: {\n    n = n + 1\n    se n == 3: exibir("tres")\n}\nexibir(n)\n'
+        'func achar(v): {\n    para j de 0 ate 2: se v[j] == 2: retornar j\n    retornar 0\n}\n'
+        'exibir(achar([1, 2, 3]))\npara i de 5 ate 1: exibir("nunca")\n'
+    ),
+    'listas': (
+        'l = [3, 1, 2]\nexibir(l)\nexibir(l[0] + l[0 - 1])\nexibir(soma(l))\nexibir(ordenar(l))\n'
+        'exibir(mapear(l, "*", 2))\nexibir([1, "a", 2.5] + [[1, 2], []])\nexibir([1, 2] == [1.0, 2.0])\n'
+        'm = [[1, 2], [3, 4]]\nexibir(m[1][0])\n'
+    ),
+    'textos': (
+        'nome = "Strix"\nx = 2\nexibir(f"{nome} tem {tamanho(nome)} letras, {{x}} = {x * 2}")\n'
+        's = ""\npara i de 1 ate 200: s = s + "ab" + i\nexibir(tamanho(s))\n'
+        'exibir(substituir("banana", "a", "o"))\nexibir(texto(12) + texto(1.5))\nexibir(numero(" 2.5 ") * 2)\n'
+    ),
+    'erro_divisao': 'exibir(1)\nx = 0\nexibir(5 /\n x)\n',
+    'erro_fstring': 'x = 1\nexibir(f"ok {x}")\nexibir(f"div {x / 0} aqui")\n',
+    'erro_indice': 'l = [1, 2]\nexibir(l[5])\n',
+    'erro_aridade': 'func f(a): retornar a\nexibir(f(1, 2))\n',
+    'erro_nao_funcao': 'x = 1\nexibir(x(2))\n',
+    'erro_em_funcao': 'func f(a): {\n    exibir(a)\n    retornar a / 0\n}\nexibir(f(3))\n',
+}
+
+# Opções que mudam o caminho do código até o motor
+OPCOES = ([], ['-O0'], ['--memo'], ['--fluxo'])
+
+
+def rodar(codigo, opcoes):
+    saida = io.StringIO()
+    erro = io.StringIO()
+    codigo_saida = executar(opcoes + ['t.tx'], saida, erro, entrada=io.StringIO(), codigo=codigo)
+    return codigo_saida, saida.getvalue(), erro.getvalue()
+
+
+@pytest.mark.parametrize('opcoes', OPCOES, ids=' '.join)
+@pytest.mark.parametrize('nome', PROGRAMAS)
+def test_motores_dao_o_mesmo_resultado(nome, opcoes):
+    arvore = rodar(PROGRAMAS[nome], opcoes + ['--engine', 'arvore'])
+    assert rodar(PROGRAMAS[nome], opcoes + ['--engine', 'vm']) == arvore
+    assert arvore[0] == (1 if nome.startswith('erro') else 0)
+
+
+@pytest.mark.parametrize('programa', [p for p in CORPUS if len(p.motores) > 1], ids=lambda p: p.nome)
+def test_motores_dao_o_mesmo_resultado_no_corpus(programa):
+    codigo = programa.gerar(1)
+    arvore = rodar(codigo, ['--engine', 'arvore'])
+    assert arvore[0] == 0
+    assert rodar(codigo, ['--engine', 'vm']) == arvore
@@ -0,0 +1,17 @@
+# tests/test_parser_strix.py
+
+import pytest
+
+from lexer import Lexer, StrixSintaxeError
+from parser_strix import Parser
+
+
+@pytest.mark.parametrize('codigo, coluna', [
+    ('x = f"{1 +}"\n', 11),
+    ('x = abcf"{1 +}"\n', 14),
+    ('x = f"ab\n{1 +}"\n', 5),
+])
+def test_erro_na_expressao_da_fstring_aponta_a_coluna_real(codigo, coluna):
+    with pytest.raises(StrixSintaxeError) as erro:
+        Parser(Lexer(codigo, 't.tx').tokenize(), 't.tx').parse()
+    assert erro.value.coluna == coluna
@@ -0,0 +1,49 @@
+# tests/test_servidor.py
+
+import json
+import socket
+import threading
+
+import pytest
+
+from cliente import enviar_mensagem
+from servidor import ServidorStrix
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    caminho = str(tmp_path / 's.sock')
+    servidor = ServidorStrix(caminho, tempo_limite=0.5)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield caminho, tmp_path
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _pedir(caminho_socket, diretorio, argv):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexao:
+        conexao.connect(caminho_socket)
+        enviar_mensagem(conexao, {'argv': argv, 'diretorio': str(diretorio)})
+        saida, erro = [], []
+        for linha in conexao.makefile('rb'):
+            mensagem = json.loads(linha)
+            saida.append(mensagem.get('saida', ''))
+            erro.append(mensagem.get('erro', ''))
+            if 'fim' in mensagem:
+                return mensagem['fim'], ''.join(saida), ''.join(erro)
+
+
+@pytest.mark.parametrize('engine', ['arvore', 'vm'])
+def test_script_que_nao_termina_e_interrompido_pelo_tempo_limite(servidor, engine):
+    caminho_socket, diretorio = servidor
+    (diretorio / 'infinito.tx').write_text('exibir("antes")\nenquanto 1 == 1: {\n    x = 1\n}\n')
+    (diretorio / 'ok.tx').write_text('exibir("ok")\n')
+
+    codigo, saida, erro = _pedir(caminho_socket, diretorio, ['--engine', engine, 'infinito.tx'])
+    assert codigo == 1
+    assert saida == 'antes\n'
+    assert 'tempo limite de 0.5 s excedido' in erro
+
+    # O servidor continua atendendo depois da interrupção
+    assert _pedir(caminho_socket, diretorio, ['ok.tx']) == (0, 'ok\n', '')